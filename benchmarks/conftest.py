@@ -0,0 +1,25 @@
+import pytest
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--compile-rounds",
+        type=int,
+        default=3,
+        help="number of times each contract is compiled per benchmark",
+    )
+    parser.addoption(
+        "--no-rss",
+        action="store_true",
+        help="skip measuring peak RSS (which compiles each contract once more in a subprocess)",
+    )
+
+
+@pytest.fixture(scope="session")
+def compile_rounds(pytestconfig):
+    return pytestconfig.getoption("compile_rounds")
+
+
+@pytest.fixture(scope="session")
+def measure_rss(pytestconfig):
+    return not pytestconfig.getoption("no_rss")
@@ -0,0 +1,149 @@
+# the contracts which are compiled by the benchmarks: the contracts in
+# `examples/`, plus synthetic contracts which stress parts of the compiler
+# that the examples do not (many functions, deep import graphs, large
+# constants, long branch chains). synthetic contracts are generated so
+# that their size can be tuned in one place.
+
+from dataclasses import dataclass, field
+from pathlib import Path
+
+EXAMPLES_DIR = Path(__file__).parent.parent / "examples"
+
+
+@dataclass
+class Contract:
+    name: str
+    # entry point of the contract, relative to the contract root
+    main: str
+    # source files, keyed by path relative to the contract root
+    sources: dict[str, str] = field(default_factory=dict)
+
+    @property
+    def source_lines(self) -> int:
+        return sum(source.count("\n") + 1 for source in self.sources.values())
+
+    def write(self, root: Path) -> Path:
+        """
+        Write the sources of the contract to `root`, returning the path
+        to its entry point.
+        """
+        for path, source in self.sources.items():
+            file = root / path
+            file.parent.mkdir(parents=True, exist_ok=True)
+            file.write_text(source)
+        return root / self.main
+
+
+def example_contracts() -> list[Contract]:
+    ret = []
+    for file in sorted(EXAMPLES_DIR.rglob("*.vy")):
+        path = file.relative_to(EXAMPLES_DIR).as_posix()
+        name = "examples/" + path.removesuffix(".vy")
+        ret.append(Contract(name, path, {path: file.read_text()}))
+    return ret
+
+
+def many_functions(n: int = 300) -> Contract:
+    # stresses the selector table and function-level codegen
+    lines = ["counter: public(uint256)", "balances: HashMap[address, uint256]", ""]
+    for i in range(n):
+        # vary the signatures so that the dispatcher has to handle
+        # different calldata layouts
+        if i % 3 == 0:
+            lines += [
+                "@external",
+                f"def f{i}(x: uint256) -> uint256:",
+                "    self.counter += x",
+                f"    return self.counter * {i + 1}",
+            ]
+        elif i % 3 == 1:
+            lines += [
+                "@external",
+                f"def f{i}(a: address, x: uint256):",
+                f"    self.balances[a] += x + {i}",
+            ]
+        else:
+            lines += [
+                "@external",
+                "@view",
+                f"def f{i}(a: address) -> (uint256, bool):",
+                f"    return self.balances[a], self.counter > {i}",
+            ]
+        lines.append("")
+
+    return Contract(f"synthetic/many_functions_{n}", "main.vy", {"main.vy": "\n".join(lines)})
+
+
+def deep_imports(depth: int = 40) -> Contract:
+    # a chain of modules, each importing the next one and a shared
+    # module. stresses import resolution and module analysis.
+    sources = {}
+    sources["common.vy"] = "\n".join(
+        [
+            "@internal",
+            "@pure",
+            "def mix(x: uint256, i: uint256) -> uint256:",
+            "    return x ^ i",
+            "",
+        ]
+    )
+
+    for i in range(depth):
+        if i == depth - 1:
+            body = ["import common", ""]
+            ret = f"common.mix(x, {i})"
+        else:
+            body = ["import common", f"import lib{i + 1}", ""]
+            ret = f"common.mix(lib{i + 1}.f(x), {i})"
+        body += ["@internal", "@pure", "def f(x: uint256) -> uint256:", f"    return {ret}", ""]
+        sources[f"lib{i}.vy"] = "\n".join(body)
+
+    sources["main.vy"] = "\n".join(
+        [
+            "import lib0",
+            "",
+            "@external",
+            "@pure",
+            "def foo(x: uint256) -> uint256:",
+            "    return lib0.f(x)",
+            "",
+        ]
+    )
+
+    return Contract(f"synthetic/deep_imports_{depth}", "main.vy", sources)
+
+
+def large_constant_array(n: int = 1000) -> Contract:
+    # stresses constant folding and codegen of large literals
+    values = ", ".join(str((i * 2654435761) % 2**32) for i in range(n))
+    source = "\n".join(
+        [
+            f"DATA: constant(uint256[{n}]) = [{values}]",
+            "",
+            "@external",
+            "@pure",
+            "def get(i: uint256) -> uint256:",
+            "    return DATA[i]",
+            "",
+        ]
+    )
+    return Contract(f"synthetic/large_constant_array_{n}", "main.vy", {"main.vy": source})
+
+
+def long_if_chain(n: int = 300) -> Contract:
+    # stresses branch-heavy function bodies. note these are sequential
+    # `if` statements rather than an `elif` chain, since an `elif` chain
+    # is a chain of nested `If` nodes and hits the recursion limit.
+    lines = ["@external", "@pure", "def classify(x: uint256) -> uint256:"]
+    for i in range(n):
+        lines += [f"    if x == {i * 7}:", f"        return {i}"]
+    lines += ["    return max_value(uint256)", ""]
+    return Contract(f"synthetic/long_if_chain_{n}", "main.vy", {"main.vy": "\n".join(lines)})
+
+
+def synthetic_contracts() -> list[Contract]:
+    return [many_functions(), deep_imports(), large_constant_array(), long_if_chain()]
+
+
+def all_contracts() -> list[Contract]:
+    return example_contracts() + synthetic_contracts()
@@ -0,0 +1,100 @@
+# compile-time benchmarks. each contract in the corpus is compiled with
+# the legacy and the venom pipeline, at each optimization level. besides
+# the timings collected by pytest-benchmark, each benchmark records (in
+# `extra_info`) the throughput, the time spent in each compiler phase,
+# the peak RSS of the compiler process and the size of the bytecode, so
+# that regressions in compile speed, memory use and codesize all show up
+# in `--benchmark-compare`.
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from corpus import all_contracts
+
+import vyper
+from vyper.compiler import compile_from_file_input
+from vyper.compiler.input_bundle import FilesystemInputBundle
+from vyper.compiler.settings import OptimizationLevel, Settings
+
+pytest.importorskip("pytest_benchmark")
+
+PIPELINES = {"legacy": False, "venom": True}
+
+OUTPUT_FORMATS = ["bytecode", "bytecode_runtime", "phase_stats"]
+
+
+def _peak_rss(path: Path, settings: Settings) -> int | None:
+    """
+    Compile `path` in a fresh process and return the peak RSS of that
+    process (in bytes), or None if it cannot be measured on this platform.
+    """
+    if not hasattr(os, "wait4"):
+        return None
+
+    args = [sys.executable, "-m", "vyper", "-f", "bytecode", "-p", str(path.parent)]
+    args += ["-O", str(settings.optimize)]
+    if settings.experimental_codegen:
+        args.append("--venom")
+    args.append(str(path))
+
+    # make sure the subprocess uses the same vyper as the benchmarks
+    env = os.environ.copy()
+    vyper_root = str(Path(vyper.__file__).parent.parent)
+    env["PYTHONPATH"] = os.pathsep.join([vyper_root, env.get("PYTHONPATH", "")])
+
+    proc = subprocess.Popen(args, env=env, stdout=subprocess.DEVNULL)
+    # unlike getrusage(RUSAGE_CHILDREN), wait4 reports the usage of this
+    # child only
+    _, status, rusage = os.wait4(proc.pid, 0)
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    assert proc.returncode == 0, f"compiling {path} failed"
+
+    # ru_maxrss is in kilobytes on linux, and in bytes on macos
+    if sys.platform == "darwin":
+        return rusage.ru_maxrss
+    return rusage.ru_maxrss * 1024
+
+
+@pytest.mark.parametrize("optimize", list(OptimizationLevel), ids=str)
+@pytest.mark.parametrize("pipeline", PIPELINES.keys())
+@pytest.mark.parametrize("contract", all_contracts(), ids=lambda c: c.name)
+def test_compile(benchmark, tmp_path, compile_rounds, measure_rss, contract, pipeline, optimize):
+    main = contract.write(tmp_path)
+    settings = Settings(optimize=optimize, experimental_codegen=PIPELINES[pipeline])
+
+    benchmark.group = contract.name
+    benchmark.extra_info["pipeline"] = pipeline
+    benchmark.extra_info["optimize"] = str(optimize)
+    benchmark.extra_info["source_lines"] = contract.source_lines
+
+    def setup():
+        # fresh input bundle for each round, so nothing is shared
+        # between rounds
+        input_bundle = FilesystemInputBundle([tmp_path])
+        file_input = input_bundle.load_file(main)
+        return (file_input, input_bundle), {}
+
+    def compile_contract(file_input, input_bundle):
+        return compile_from_file_input(
+            file_input, input_bundle=input_bundle, settings=settings, output_formats=OUTPUT_FORMATS
+        )
+
+    out = benchmark.pedantic(compile_contract, setup=setup, rounds=compile_rounds)
+
+    # size in bytes (the bytecode is a 0x-prefixed hex string)
+    benchmark.extra_info["bytecode_size"] = len(out["bytecode"]) // 2 - 1
+    benchmark.extra_info["bytecode_runtime_size"] = len(out["bytecode_runtime"]) // 2 - 1
+    # phase times of the last round
+    benchmark.extra_info["phase_times"] = {
+        name: stats["wall_time"] for name, stats in out["phase_stats"].items()
+    }
+
+    if benchmark.stats is not None:  # None with --benchmark-disable
+        mean = benchmark.stats.stats.mean
+        benchmark.extra_info["lines_per_second"] = contract.source_lines / mean
+
+    if measure_rss:
+        benchmark.extra_info["peak_rss"] = _peak_rss(main, settings)
@@ -0,0 +1,37 @@
+# micro-benchmarks of AST metadata writes, which are among the most
+# frequent operations during semantic analysis. writes are only journaled
+# during typechecker speculation (for loop iterator type inference), so
+# both cases are measured.
+
+import pytest
+
+from vyper.ast.metadata import NodeMetadata
+
+pytest.importorskip("pytest_benchmark")
+
+N_NODES = 1000
+N_KEYS = 10
+
+
+def _write_metadata(metadata_list):
+    for metadata in metadata_list:
+        for i in range(N_KEYS):
+            metadata[i] = i
+
+
+@pytest.mark.parametrize("speculating", [False, True], ids=["plain", "speculating"])
+def test_metadata_write(benchmark, speculating):
+    metadata_list = [NodeMetadata() for _ in range(N_NODES)]
+
+    benchmark.group = "metadata_write"
+    benchmark.extra_info["writes"] = N_NODES * N_KEYS
+
+    if not speculating:
+        benchmark(_write_metadata, metadata_list)
+        return
+
+    def write_speculating():
+        with NodeMetadata.enter_typechecker_speculation():
+            _write_metadata(metadata_list)
+
+    benchmark(write_speculating)
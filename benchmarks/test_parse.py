@@ -0,0 +1,53 @@
+# parse-throughput benchmarks: source to vyper AST (pre-parsing, python
+# parsing and building the vyper AST), for each source file of each
+# contract in the corpus, plus a ~5k line module. for comparison, also
+# loading the same ASTs from their binary encoding (`vyper.ast.binary`).
+
+import pytest
+from corpus import all_contracts, many_functions
+
+from vyper.ast import binary, parse_to_ast
+
+pytest.importorskip("pytest_benchmark")
+
+CONTRACTS = all_contracts() + [many_functions(1000)]
+
+
+@pytest.mark.parametrize("contract", CONTRACTS, ids=lambda c: c.name)
+def test_parse(benchmark, compile_rounds, contract):
+    sources = list(contract.sources.values())
+
+    benchmark.group = "parse"
+    benchmark.extra_info["source_lines"] = contract.source_lines
+
+    def parse_contract():
+        for source_id, source in enumerate(sources):
+            parse_to_ast(source, source_id=source_id)
+
+    benchmark.pedantic(parse_contract, rounds=compile_rounds)
+
+    if benchmark.stats is not None:  # None with --benchmark-disable
+        mean = benchmark.stats.stats.mean
+        benchmark.extra_info["lines_per_second"] = contract.source_lines / mean
+
+
+@pytest.mark.parametrize("contract", CONTRACTS, ids=lambda c: c.name)
+def test_load_binary(benchmark, compile_rounds, contract):
+    encoded = [
+        binary.dumps(parse_to_ast(source, source_id=source_id))
+        for source_id, source in enumerate(contract.sources.values())
+    ]
+
+    benchmark.group = "load_binary"
+    benchmark.extra_info["source_lines"] = contract.source_lines
+    benchmark.extra_info["encoded_size"] = sum(len(data) for data in encoded)
+
+    def load_contract():
+        for data in encoded:
+            binary.loads(data)
+
+    benchmark.pedantic(load_contract, rounds=compile_rounds)
+
+    if benchmark.stats is not None:  # None with --benchmark-disable
+        mean = benchmark.stats.stats.mean
+        benchmark.extra_info["lines_per_second"] = contract.source_lines / mean
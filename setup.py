@@ -31,10 +31,16 @@ extras_require = {
         "isort==5.13.2",
         "mypy==1.5",
     ],
+    "bench": ["pytest-benchmark>=4.0,<6.0"],
     "dev": ["ipython", "pre-commit", "pyinstaller", "twine"],
 }
 
-extras_require["dev"] = extras_require["dev"] + extras_require["test"] + extras_require["lint"]
+extras_require["dev"] = (
+    extras_require["dev"]
+    + extras_require["test"]
+    + extras_require["lint"]
+    + extras_require["bench"]
+)
 
 with open("README.md", "r", encoding="utf-8") as f:
     long_description = f.read()
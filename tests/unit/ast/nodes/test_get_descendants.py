@@ -1,3 +1,4 @@
+import copy
 from pathlib import Path
 
 from vyper import ast as vy_ast
@@ -69,3 +70,36 @@ def test_order_reversed():
     values = [i.value for i in node.get_descendants(vy_ast.Int, reverse=True)]
 
     assert values == [0, 9, 8, 7, 6, 5, 4, 3, 2, 1]
+
+
+def test_index_matches_tree_walk():
+    # queries by node type are answered by the module index
+    for path in Path(".").glob("examples/**/*.vy"):
+        with path.open() as fp:
+            vyper_ast = vy_ast.parse_to_ast(fp.read())
+
+        node_types = [vy_ast.Name, vy_ast.Call, (vy_ast.Assign, vy_ast.AugAssign), vy_ast.Stmt]
+        for node in vyper_ast.get_descendants(include_self=True):
+            for node_type in node_types:
+                expected = [i for i in node.get_descendants() if isinstance(i, node_type)]
+                assert node.get_descendants(node_type) == expected
+
+                expected = [i for i in node.get_children() if isinstance(i, node_type)]
+                assert node.get_children(node_type) == expected
+
+
+def test_index_set_filter():
+    vyper_ast = vy_ast.parse_to_ast("a = foo()\nb = bar()\nc = baz()")
+    calls = vyper_ast.get_descendants(vy_ast.Call, filters={"func.id": {"foo", "baz"}})
+
+    assert calls == [vyper_ast.body[0].value, vyper_ast.body[2].value]
+
+
+def test_index_of_copied_module():
+    vyper_ast = vy_ast.parse_to_ast("a = foo()\nb = bar()")
+    vyper_ast.get_descendants(vy_ast.Call)
+
+    copied = copy.deepcopy(vyper_ast)
+    calls = copied.get_descendants(vy_ast.Call)
+
+    assert calls == [copied.body[0].value, copied.body[1].value]
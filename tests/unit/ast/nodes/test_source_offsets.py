@@ -0,0 +1,66 @@
+import copy
+
+from vyper import ast as vy_ast
+from vyper.ast.utils import dict_to_ast
+
+SOURCE = """
+@external
+def foo(x: int128) -> int128:
+    return x + -1
+"""
+
+
+def test_nodes_share_source_table():
+    module = vy_ast.parse_to_ast(SOURCE, source_id=3)
+    stmt = module.body[0].body[0]
+
+    for node in module.get_descendants(include_self=True):
+        assert node._source is module._source
+        assert node.full_source_code is SOURCE
+
+    assert module._source.source_id == 3
+    start = SOURCE.index("return")
+    assert stmt.node_source_code == "return x + -1"
+    assert stmt.src == f"{start}:13:3"
+
+
+def test_folded_negative_literal():
+    module = vy_ast.parse_to_ast(SOURCE)
+    literal = module.get_descendants(vy_ast.Int)[0]
+
+    assert literal.value == -1
+    assert literal.node_source_code == "-1"
+    # the source offset is still that of the operand
+    start = SOURCE.index("-1") + 1
+    assert literal.src == f"{start}:1:0"
+
+
+def test_set_source_attributes():
+    node = vy_ast.parse_to_ast(SOURCE).body[0].body[0].value
+
+    node.src = "5:4:7"
+    assert node.src == "5:4:7"
+    assert node.node_source_code == SOURCE[5:9]
+
+    node.node_source_code = "x + y"
+    assert node.node_source_code == "x + y"
+    assert node.src == "5:4:7"
+
+
+def test_copy_preserves_source():
+    module = vy_ast.parse_to_ast(SOURCE, source_id=1)
+    copied = copy.deepcopy(module)
+
+    assert copied.to_dict() == module.to_dict()
+    for a, b in zip(module.get_descendants(), copied.get_descendants()):
+        assert (a.src, a.node_source_code) == (b.src, b.node_source_code)
+        assert b._source is copied._source
+
+
+def test_dict_roundtrip():
+    fn = vy_ast.parse_to_ast(SOURCE, source_id=1).body[0]
+    ast_dict = fn.to_dict()
+
+    assert "node_source_code" not in ast_dict
+    assert ast_dict["src"] == fn.src
+    assert dict_to_ast(ast_dict).to_dict() == ast_dict
@@ -1,6 +1,7 @@
 import ast as python_ast
 
-from vyper.ast.parse import PreParser, annotate_python_ast
+from tests.ast_utils import annotate_python_ast
+from vyper.ast.parse import PreParser
 
 
 class AssertionVisitor(python_ast.NodeVisitor):
@@ -0,0 +1,142 @@
+import io
+from pathlib import Path
+
+import pytest
+
+from vyper import ast as vy_ast
+from vyper.ast import binary
+from vyper.ast.nodes import NODE_SRC_ATTRIBUTES
+from vyper.compiler.phases import CompilerData
+from vyper.semantics import analyze_module
+
+ROOT = Path(__file__).parent.parent.parent.parent
+
+SOURCE_FILES = sorted(
+    [
+        *ROOT.joinpath("examples").rglob("*.vy"),
+        *ROOT.joinpath("vyper/builtins/interfaces").glob("*.vyi"),
+    ]
+)
+
+CODE = """
+# pragma version >0.3.10
+'''
+@title literals
+'''
+X: public(HashMap[address, DynArray[uint256, 3]])
+C: public(constant(int256)) = -100000000000000000000
+D: constant(decimal) = -3.1415
+H: constant(bytes4) = 0x12345678
+B: constant(Bytes[1]) = 0b00000001
+S: constant(String[5]) = "hello"  # non-ascii source: é
+M: constant(uint256) = 1000000000000000000000000000000
+Y: constant(Bytes[2]) = x"abcd"
+Z: constant(bytes32) = keccak256(b"\\x00\\xff")
+
+flag Roles:
+    ADMIN
+    USER
+
+@external
+def foo(a: uint256 = 10**30) -> uint256:
+    b: uint256 = a
+    for i: uint256 in range(10):
+        b += i
+    return b
+"""
+
+
+def _assert_roundtrip(node, decoded):
+    assert decoded.to_dict() == node.to_dict()
+
+    nodes = node.get_descendants(include_self=True)
+    decoded_nodes = decoded.get_descendants(include_self=True)
+    assert len(nodes) == len(decoded_nodes)
+    for a, b in zip(nodes, decoded_nodes):
+        assert type(a) is type(b)
+        assert a.node_id == b.node_id
+        for attr in NODE_SRC_ATTRIBUTES:
+            assert getattr(a, attr) == getattr(b, attr), (attr, a)
+        assert a._depth == b._depth
+        assert [c.node_id for c in a._children] == [c.node_id for c in b._children]
+
+
+@pytest.mark.parametrize("path", SOURCE_FILES, ids=lambda p: p.relative_to(ROOT).as_posix())
+def test_roundtrip_files(path):
+    module = vy_ast.parse_to_ast(path.read_text(), source_id=2, module_path=str(path))
+    _assert_roundtrip(module, binary.loads(binary.dumps(module)))
+
+
+def test_roundtrip_values():
+    module = vy_ast.parse_to_ast(CODE)
+    decoded = binary.loads(binary.dumps(module))
+    _assert_roundtrip(module, decoded)
+
+    # the unwrapped `public(...)` calls are still children
+    var_decl = decoded.body[0]
+    assert var_decl.is_public
+    assert isinstance(var_decl._children[1], vy_ast.Call)
+    assert var_decl.annotation.get_ancestor() is var_decl._children[1]
+
+    # nodes of a module share its source table
+    assert all(n._source is decoded._source for n in decoded.get_descendants())
+
+
+def test_roundtrip_subtree():
+    fn = vy_ast.parse_to_ast(CODE).get_children(vy_ast.FunctionDef)[0]
+    decoded = binary.loads(binary.dumps(fn))
+
+    assert decoded.parent is None
+    assert decoded._depth == 0
+    assert decoded.to_dict() == fn.to_dict()
+
+
+def test_roundtrip_annotated():
+    compiler_data = CompilerData(CODE)
+    module = compiler_data.annotated_vyper_module
+
+    decoded = binary.loads(binary.dumps(module))
+    assert "type" not in decoded._metadata
+    assert decoded.to_dict() == module.to_dict(include_analysis=False)
+
+    # the decoded AST can be analyzed again
+    analyze_module(decoded)
+    assert decoded.to_dict() == module.to_dict()
+
+
+def test_streaming(monkeypatch):
+    monkeypatch.setattr(binary, "_FRAME_SIZE", 64)
+    module = vy_ast.parse_to_ast(CODE)
+
+    fp = io.BytesIO()
+    binary.dump(module, fp)
+    fp.write(b"trailing data")
+    fp.seek(0)
+
+    _assert_roundtrip(module, binary.load(fp))
+    # the stream is consumed exactly up to the end of the AST
+    assert fp.read() == b"trailing data"
+
+
+def test_frame_size(monkeypatch):
+    module = vy_ast.parse_to_ast(CODE)
+    data = binary.dumps(module)
+
+    monkeypatch.setattr(binary, "_FRAME_SIZE", 64)
+    chunked = binary.dumps(module)
+    assert chunked != data
+    assert binary.loads(chunked).to_dict() == binary.loads(data).to_dict()
+
+
+@pytest.mark.parametrize(
+    "mutate,msg",
+    [
+        (lambda data: b"garbage" + data, "not a binary Vyper AST"),
+        (lambda data: data[:6] + b"\xff\xff" + data[8:], "unsupported binary AST format version"),
+        (lambda data: data[:-20], "truncated binary AST"),
+    ],
+)
+def test_invalid_data(mutate, msg):
+    data = binary.dumps(vy_ast.parse_to_ast(CODE))
+    with pytest.raises(ValueError, match=msg):
+        binary.loads(mutate(data))
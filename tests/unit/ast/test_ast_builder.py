@@ -0,0 +1,220 @@
+"""
+Differential tests for `ASTBuilder`: the Vyper AST it builds must be
+identical to annotating the Python AST with `AnnotatingVisitor` and
+converting it with `vy_ast.get_node`.
+"""
+
+import ast as python_ast
+import warnings
+from pathlib import Path
+
+import pytest
+
+from tests.ast_utils import _deepcopy_ast, annotate_python_ast
+from vyper import ast as vy_ast
+from vyper.ast.nodes import NODE_SRC_ATTRIBUTES, get_node
+from vyper.ast.parse import ASTBuilder, PreParser, _parse_python_ast
+from vyper.exceptions import VyperException
+
+ROOT = Path(__file__).parent.parent.parent.parent
+
+SOURCE_FILES = sorted(
+    [
+        *ROOT.joinpath("examples").rglob("*.vy"),
+        *ROOT.joinpath("tests").rglob("*.vy"),
+        *ROOT.joinpath("tests").rglob("*.vyi"),
+        *ROOT.joinpath("vyper/builtins/interfaces").glob("*.vyi"),
+    ]
+)
+
+SOURCES = [
+    "",
+    "\n\n",
+    '"""module docstring"""',
+    """
+# pragma version >0.3.10
+'''
+@title docstrings
+'''
+struct S:
+    a: bool
+    b: int128
+
+flag Roles:
+    ADMIN
+    USER
+
+event Transfer:
+    sender: indexed(address)
+    amount: uint256
+
+interface Foo:
+    def bar(x: uint256) -> uint256: view
+    def baz(): nonpayable
+
+implements: Foo
+
+counter: public(uint256)
+OWNER: immutable(address)
+C: constant(int256) = -(-(-1))
+D: constant(decimal) = -3.1415
+H: constant(bytes4) = 0x12345678
+B: constant(Bytes[1]) = 0b00000001
+X: constant(Bytes[2]) = x"abcd"
+
+@deploy
+def __init__():
+    OWNER = msg.sender
+
+@external
+def bar(x: uint256) -> uint256:
+    '''
+    @notice function docstring
+    '''
+    for i: uint256 in range(10):
+        log Transfer(msg.sender, i)
+    for j: DynArray[
+        uint256, 3
+    ] in [[1, 2, 3]]:
+        pass
+    a: int128 = -1
+    b: bool = not True
+    c: uint256 = extcall Foo(self).bar(staticcall Foo(self).bar(x))
+    log     Transfer(sender=msg.sender, amount=-x)
+    return x
+    """,
+    # deprecated struct instantiation from a dict
+    """
+struct S:
+    a: uint256
+
+event E:
+    s: S
+
+@external
+def foo():
+    log E(S({a: 1}))
+    """,
+    "enum Foo:\n    A\n    B",
+    "for i: uint256 in range(3):\n    pass",
+]
+
+ERROR_SOURCES = [
+    "x: uint256 = 1;",
+    "a: uint256 = 0x123",
+    "a: Bytes[1] = 0b0001",
+    'a: Bytes[1] = x"abc"',
+    "class Foo:\n    pass",
+    "@external\ndef foo():\n    for i in range(10):\n        pass",
+    "@external\ndef foo():\n    for i: uint256 = 1 in range(10):\n        pass",
+    "@external\ndef foo():\n    for i: $ in range(10):\n        pass",
+    "@external\ndef foo():\n    x: uint256 = extcall Foo(self).bar(\n",
+    "@external\ndef foo():\n    log Foo(a b)",
+    "@external\ndef foo():\n    del x",
+    "@external\ndef foo():\n    a: uint256 = b[1:2]",
+    "@external\ndef foo():\n    a: int128 = +1",
+    "x: int128 = 1j",
+]
+
+
+class _UnshareOperators(python_ast.NodeTransformer):
+    # python reuses operator node instances (e.g. all `Add` nodes of a module
+    # are the same object). the pickle roundtrip in `_deepcopy_ast` preserves
+    # that sharing, so `AnnotatingVisitor` gives all of them the location and
+    # node id of the last one it visits. `ASTBuilder` annotates each of them
+    # separately, so give the reference implementation distinct instances.
+    def generic_visit(self, node):
+        if not node._fields and not node._attributes:
+            return type(node)()
+        return super().generic_visit(node)
+
+
+def _legacy_parse(source_code, source_id=0, add_fn_node=None):
+    pre_parser = PreParser()
+    pre_parser.parse(source_code)
+    py_ast = _parse_python_ast(source_code, pre_parser)
+    py_ast = _UnshareOperators().visit(_deepcopy_ast(py_ast))
+
+    if add_fn_node:
+        fn_node = python_ast.FunctionDef(add_fn_node, py_ast.body, [], [])
+        fn_node.body = py_ast.body
+        fn_node.args = python_ast.arguments(defaults=[])
+        py_ast.body = [fn_node]
+
+    annotate_python_ast(py_ast, source_code, pre_parser, source_id=source_id)
+    module = get_node(py_ast)
+    module.is_interface = False
+    return module
+
+
+def _new_parse(source_code, source_id=0, add_fn_node=None):
+    return vy_ast.parse_to_ast(source_code, source_id=source_id, add_fn_node=add_fn_node)
+
+
+def _run(fn, *args, **kwargs):
+    with warnings.catch_warnings(record=True) as w:
+        warnings.simplefilter("always")
+        try:
+            ret = fn(*args, **kwargs)
+        except VyperException as e:
+            ret = e
+    return ret, [(type(i.message), str(i.message)) for i in w]
+
+
+def _assert_same_ast(legacy, new):
+    assert legacy.to_dict() == new.to_dict()
+
+    legacy_nodes = legacy.get_descendants(include_self=True)
+    new_nodes = new.get_descendants(include_self=True)
+    assert len(legacy_nodes) == len(new_nodes)
+    for a, b in zip(legacy_nodes, new_nodes):
+        assert type(a) is type(b)
+        assert a.node_id == b.node_id
+        for attr in NODE_SRC_ATTRIBUTES:
+            assert getattr(a, attr) == getattr(b, attr), (attr, a)
+        assert getattr(a.parent, "node_id", None) == getattr(b.parent, "node_id", None)
+        assert [c.node_id for c in a._children] == [c.node_id for c in b._children]
+
+
+def _assert_same(legacy, new):
+    legacy, legacy_warnings = legacy
+    new, new_warnings = new
+    assert legacy_warnings == new_warnings
+
+    if isinstance(legacy, VyperException):
+        assert type(new) is type(legacy)
+        assert str(new) == str(legacy)
+        assert (new.lineno, new.col_offset) == (legacy.lineno, legacy.col_offset)
+        return
+
+    _assert_same_ast(legacy, new)
+
+
+@pytest.mark.parametrize("path", SOURCE_FILES, ids=lambda p: p.relative_to(ROOT).as_posix())
+def test_builder_matches_annotating_visitor_files(path):
+    source_code = path.read_text()
+    _assert_same(_run(_legacy_parse, source_code, 1), _run(_new_parse, source_code, 1))
+
+
+@pytest.mark.parametrize("source_code", SOURCES + ERROR_SOURCES)
+def test_builder_matches_annotating_visitor(source_code):
+    _assert_same(_run(_legacy_parse, source_code), _run(_new_parse, source_code))
+
+
+@pytest.mark.parametrize("source_code", ["x: uint256 = 1\ny: int128 = -x", "log Foo(-1)"])
+def test_builder_matches_annotating_visitor_fn_node(source_code):
+    legacy = _run(_legacy_parse, source_code, add_fn_node="dummy_fn")
+    new = _run(_new_parse, source_code, add_fn_node="dummy_fn")
+    _assert_same(legacy, new)
+
+
+def test_builder_does_not_modify_python_ast():
+    source_code = SOURCES[3]
+    pre_parser = PreParser()
+    pre_parser.parse(source_code)
+    py_ast = _parse_python_ast(source_code, pre_parser)
+    before = python_ast.dump(py_ast, include_attributes=True)
+
+    ASTBuilder(source_code, pre_parser, source_id=0).build(py_ast)
+
+    assert python_ast.dump(py_ast, include_attributes=True) == before
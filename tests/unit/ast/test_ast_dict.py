@@ -6,6 +6,8 @@ from vyper import compiler
 from vyper.ast.nodes import NODE_SRC_ATTRIBUTES
 from vyper.ast.parse import parse_to_ast
 from vyper.ast.utils import ast_to_dict, dict_to_ast
+from vyper.compiler.phases import CompilerData
+from vyper.utils import LazyJSON
 
 
 def get_node_ids(ast_struct, ids=None):
@@ -1829,3 +1831,72 @@ def foo():
     for key in keys:
         assert lib1_ast[key] == lib1_import_ast[key]
         assert lib2_ast[key] == lib2_import_ast[key]
+
+
+def test_ast_dict_unaffected_by_analysis(make_input_bundle):
+    # the raw and the annotated AST are the same tree, but `-f ast` output
+    # must not depend on whether analysis has run.
+    sources = {
+        "main.vy": """
+import lib1
+
+x: public(HashMap[address, uint256])
+
+@external
+def foo(a: uint256) -> uint256:
+    self.x[msg.sender] = lib1.bar(a)
+    return self.x[msg.sender]
+    """,
+        "lib1.vy": """
+def bar(a: uint256) -> uint256:
+    return a + 1
+    """,
+    }
+    input_bundle = make_input_bundle(sources)
+
+    def compile_main(output_formats):
+        file = input_bundle.load_file("main.vy")
+        return compiler.compile_from_file_input(
+            file, input_bundle=input_bundle, output_formats=output_formats
+        )
+
+    ast_only = compile_main(["ast_dict"])
+    with_analysis = compile_main(["annotated_ast_dict", "bytecode", "ast_dict"])
+
+    assert ast_only["ast_dict"] == with_analysis["ast_dict"]
+    assert ast_only["ast_dict"]["ast"] != with_analysis["annotated_ast_dict"]["ast"]
+
+
+def test_ast_to_dict_include_analysis():
+    code = """
+@external
+def foo() -> uint256:
+    return 1
+    """
+    compiler_data = CompilerData(code)
+    before = ast_to_dict(compiler_data.vyper_module)
+
+    # the analyzed module is not a copy of the parsed one
+    module = compiler_data.annotated_vyper_module
+    assert module is compiler_data.vyper_module
+
+    assert "type" in ast_to_dict(module)
+    assert ast_to_dict(module, include_analysis=False) == before
+
+
+def test_ast_to_dict_lazy():
+    code = """
+@external
+def foo(x: uint256) -> uint256:
+    return x + 1
+    """
+    module = CompilerData(code).annotated_vyper_module
+    for include_analysis in (True, False):
+        lazy = ast_to_dict(module, include_analysis, lazy=True)
+        assert isinstance(lazy, LazyJSON)
+
+        # child nodes are only converted on demand
+        ast_dict = module.to_dict(include_analysis, lazy=True)
+        assert all(isinstance(node, LazyJSON) for node in ast_dict["body"])
+
+        assert lazy.materialize() == ast_to_dict(module, include_analysis)
@@ -80,3 +80,31 @@ def test_metadata_journal_rollback_outer():
         pass
 
     assert m["x"] == 1
+
+
+def test_metadata_journal_only_while_speculating():
+    m = NodeMetadata()
+
+    # outside of speculation, writes are plain dict stores
+    assert NodeMetadata.__setitem__ is dict.__setitem__
+
+    with m.enter_typechecker_speculation():
+        assert NodeMetadata.__setitem__ is not dict.__setitem__
+        try:
+            with m.enter_typechecker_speculation():
+                raise VyperException("dummy exception")
+        except VyperException:
+            pass
+
+        # still journaling in the outer frame
+        assert NodeMetadata.__setitem__ is not dict.__setitem__
+
+    assert NodeMetadata.__setitem__ is dict.__setitem__
+
+    try:
+        with m.enter_typechecker_speculation():
+            raise VyperException("dummy exception")
+    except VyperException:
+        pass
+
+    assert NodeMetadata.__setitem__ is dict.__setitem__
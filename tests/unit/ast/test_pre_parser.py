@@ -304,3 +304,25 @@ def bar():
     assert annotation.lineno == 2
     assert annotation.col_offset == 0
     assert annotation.full_source_code == lib
+
+
+reformat_examples = [
+    ("interface Foo:\n    def bar(): view\n", "class Foo:\n    def bar(): view\n"),
+    ("x: uint256 = staticcall Foo(self).bar()\n", "x: uint256 = await Foo(self).bar()\n"),
+    ('log Foo(x"abcd")\n', 'yield Foo( "abcd")\n'),
+    ("for i: uint256 in range(3):\n    pass\n", "for i          in range(3):\n    pass\n"),
+    # multi-line annotations are replaced with line continuations
+    (
+        "for i: DynArray[\n    uint256, 3\n] in x:\n    pass\n",
+        "for i           \\\n              \\\n  in x:\n    pass\n",
+    ),
+]
+
+
+@pytest.mark.parametrize("code, expected", reformat_examples)
+def test_reformatted_code(code, expected):
+    pre_parser = PreParser()
+    pre_parser.parse(code)
+
+    # the other tokens keep their line and column
+    assert pre_parser.reformatted_code == expected
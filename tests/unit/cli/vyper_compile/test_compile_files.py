@@ -1,4 +1,5 @@
 import contextlib
+import io
 import json
 import sys
 import warnings
@@ -8,13 +9,15 @@ from pathlib import Path
 import pytest
 
 from vyper.cli.compile_archive import compiler_data_from_zip
-from vyper.cli.vyper_compile import compile_files
+from vyper.cli.vyper_compile import _cli_helper, compile_files
 from vyper.cli.vyper_json import compile_from_input_dict, compile_json
 from vyper.compiler import INTERFACE_OUTPUT_FORMATS, OUTPUT_FORMATS
 from vyper.compiler.input_bundle import FilesystemInputBundle
 from vyper.compiler.output_bundle import OutputBundle
 from vyper.compiler.phases import CompilerData
-from vyper.utils import sha256sum
+from vyper.exceptions import TypeMismatch
+from vyper.utils import LazyJSON, sha256sum
+from vyper.warnings import VyperWarning
 
 TAMPERED_INTEGRITY_SUM = sha256sum("tampered integrity sum")
 
@@ -619,3 +622,92 @@ def baz() -> uint8:
             continue
         with pytest.raises(ValueError):
             compile_files([file], [f])
+
+
+PARALLEL_LIB = """
+counter: uint256
+
+@internal
+def bump():
+    self.counter += 1
+"""
+
+PARALLEL_CONTRACT = """
+import lib
+initializes: lib
+
+@external
+def foo{i}():
+    lib.bump()
+"""
+
+
+@pytest.mark.parametrize(
+    "formats",
+    [
+        ["bytecode", "abi", "source_map", "metadata", "annotated_ast_dict", "ir"],
+        # does not load the imports
+        ["ast_dict"],
+    ],
+)
+def test_compile_files_parallel(chdir_tmp_path, make_file, formats):
+    make_file("lib.vy", PARALLEL_LIB)
+    files = [make_file(f"c{i}.vy", PARALLEL_CONTRACT.format(i=i)) for i in range(4)]
+
+    serial = compile_files(files, formats)
+    parallel = compile_files(files, formats, jobs=2)
+
+    # ordering and outputs (including source ids) are the same as
+    # a serial run
+    assert list(parallel.keys()) == list(serial.keys())
+    for k, v in serial.items():
+        assert {f: str(x) for f, x in parallel[k].items()} == {f: str(x) for f, x in v.items()}
+
+
+def test_compile_files_parallel_exception(chdir_tmp_path, make_file, capsys):
+    make_file("lib.vy", PARALLEL_LIB)
+    files = [make_file(f"c{i}.vy", PARALLEL_CONTRACT.format(i=i)) for i in range(3)]
+    bad = make_file("bad.vy", "@external\ndef foo() -> uint256:\n    return -1\n")
+    files.insert(1, bad)
+
+    with pytest.raises(TypeMismatch):
+        compile_files(files, ["bytecode"], jobs=2)
+
+    assert capsys.readouterr().out == f"Error compiling: {bad}\n"
+
+
+def test_compile_files_parallel_warnings(chdir_tmp_path, make_file):
+    files = [make_file(f"c{i}.vy", f"enum Foo{i}:\n    BAR\n") for i in range(3)]
+
+    with warnings.catch_warnings(record=True) as w:
+        warnings.simplefilter("always")
+        compile_files(files, ["bytecode"], jobs=2)
+
+    # one warning per contract, in input order
+    assert len(w) == 3
+    assert all("enum will be deprecated" in str(x.message) for x in w)
+
+    with pytest.raises(VyperWarning):
+        compile_files(files, ["bytecode"], warnings_control="error", jobs=2)
+
+
+def test_compile_files_lazy_json(chdir_tmp_path, make_file):
+    make_file("lib.vy", PARALLEL_LIB)
+    files = [make_file(f"c{i}.vy", PARALLEL_CONTRACT.format(i=i)) for i in range(2)]
+    formats = ("ast", "annotated_ast", "ir_json")
+
+    def write_output(compiled):
+        f = io.StringIO()
+        _cli_helper(f, formats, compiled)
+        return f.getvalue()
+
+    # generate IR first, so that the annotated AST is in the same state
+    # as when the lazy outputs are written out
+    eager = compile_files(files, ("ir",) + formats)
+    for contract_data in eager.values():
+        del contract_data["ir"]
+    lazy = compile_files(files, formats, lazy_json=True)
+
+    # the AST and IR outputs are streamed to the output file
+    assert isinstance(lazy[Path(files[0])]["ast_dict"]["ast"], LazyJSON)
+    assert write_output(lazy) == write_output(eager)
@@ -0,0 +1,114 @@
+import functools
+from pathlib import Path
+
+import pytest
+
+from vyper.cli.vyper_compile import _parse_args, compile_files
+from vyper.cli.watch import Watcher
+
+LIB_CODE = """
+@internal
+@pure
+def f() -> uint256:
+    return {n}
+"""
+
+A_CODE = """
+import lib
+
+@external
+def foo() -> uint256:
+    return lib.f()
+"""
+
+B_CODE = """
+@external
+def bar() -> uint256:
+    return 1
+"""
+
+
+def _make_watcher(make_file):
+    make_file("lib.vy", LIB_CODE.format(n=1))
+    a = make_file("a.vy", A_CODE)
+    b = make_file("b.vy", B_CODE)
+
+    compile_fn = functools.partial(compile_files, output_formats=("bytecode",))
+    return Watcher(compile_fn, [str(a), str(b)]), a, b
+
+
+def test_watch_rebuild(make_file, tmp_path):
+    watcher, a, b = _make_watcher(make_file)
+
+    assert watcher.rebuild()
+    compiled = watcher.compiled()
+    assert set(compiled.keys()) == {Path(a), Path(b)}
+    assert watcher.watched_files() == {tmp_path / "a.vy", tmp_path / "b.vy", tmp_path / "lib.vy"}
+
+    # nothing changed
+    assert watcher.stale_files() == set()
+
+    lib = make_file("lib.vy", LIB_CODE.format(n=2))
+    assert watcher.stale_files() == {lib}
+    # only the contract which imports lib needs to be recompiled
+    dirty = watcher.dirty_files({lib})
+    assert dirty == [str(a)]
+
+    assert watcher.rebuild()
+    new_compiled = watcher.compiled()
+    assert new_compiled[Path(a)] != compiled[Path(a)]
+    assert new_compiled[Path(b)] == compiled[Path(b)]
+    # b is reused from the session
+    assert watcher.session.stats() == {"compiled": 3, "reused": 1}
+
+
+def test_watch_error_recovery(make_file, capsys):
+    watcher, a, b = _make_watcher(make_file)
+    assert watcher.rebuild()
+
+    make_file("lib.vy", LIB_CODE.format(n="True"))
+    assert not watcher.rebuild()
+    assert "TypeMismatch" in capsys.readouterr().err
+    # after a failure, everything is rebuilt on the next change
+    assert watcher.dirty_files(set()) == [str(a), str(b)]
+
+    make_file("lib.vy", LIB_CODE.format(n=1))
+    assert watcher.rebuild()
+    assert not watcher.failed
+
+
+def test_watch_source_ids(make_file):
+    # source ids are the same as when compiling the files together
+    watcher, a, b = _make_watcher(make_file)
+    output_formats = ("source_map",)
+    watcher.compile_fn = functools.partial(compile_files, output_formats=output_formats)
+    assert watcher.rebuild()
+
+    expected = compile_files([a, b], output_formats)
+    assert watcher.compiled() == expected
+
+
+@pytest.mark.parametrize("flag", [["--cache-dir", "cache"], ["-j", "2"], ["--profile-phases"]])
+def test_watch_incompatible_flags(make_file, flag):
+    a = make_file("a.vy", B_CODE)
+    with pytest.raises(ValueError) as e:
+        _parse_args([str(a), "--watch", *flag])
+    assert "Cannot use `--watch`" in str(e.value)
+
+
+def test_watch_storage_layout(make_file):
+    # the storage layout overrides apply to every rebuild
+    code = "x: public(uint256)\n\n@external\ndef foo() -> uint256:\n    return {n}\n"
+    a = make_file("a.vy", code.format(n=1))
+    layout = make_file("layout.json", '{"x": {"type": "uint256", "n_slots": 1, "slot": 7}}')
+
+    compile_fn = functools.partial(compile_files, output_formats=("layout",))
+    watcher = Watcher(compile_fn, [str(a)], [str(layout)])
+
+    assert watcher.rebuild()
+    assert watcher.compiled()[Path(a)]["layout"]["storage_layout"]["x"]["slot"] == 7
+
+    make_file("a.vy", code.format(n=2))
+    assert watcher.rebuild()
+    assert watcher.compiled()[Path(a)]["layout"]["storage_layout"]["x"]["slot"] == 7
+    assert watcher.storage_layout_paths == [str(layout)]
@@ -14,6 +14,7 @@ from vyper.cli.vyper_json import (
 from vyper.compiler import OUTPUT_FORMATS, compile_code, compile_from_file_input
 from vyper.compiler.input_bundle import JSONInputBundle
 from vyper.exceptions import JSONError, SyntaxException, TypeMismatch
+from vyper.utils import LazyJSON, iterencode_json
 
 FOO_CODE = """
 import contracts.ibar as IBar
@@ -401,3 +402,61 @@ def test_compile_json_with_both_venom_aliases():
     with pytest.raises(JSONError) as e:
         get_settings(code)
     assert e.value.args[0] == "both experimentalCodegen and venom cannot be set"
+
+
+def test_compile_json_parallel(input_json):
+    serial = compile_json(input_json)
+    parallel = compile_json(input_json, jobs=2)
+
+    assert json.dumps(parallel, default=str) == json.dumps(serial, default=str)
+
+
+def test_compile_json_parallel_source_ids():
+    input_json = {
+        "language": "Vyper",
+        "sources": {
+            "lib.vy": {"content": "@internal\ndef foo() -> uint256:\n    return 1\n"},
+            "a.vy": {
+                "content": "import lib\n\n@external\ndef bar() -> uint256:\n    return lib.foo()\n"
+            },
+            "b.vy": {"content": "@external\ndef baz() -> uint256:\n    return 2\n"},
+        },
+        # -f ast does not load the imports
+        "settings": {"outputSelection": {"a.vy": ["ast"], "b.vy": ["ast"]}},
+    }
+    serial = compile_json(input_json)
+    parallel = compile_json(input_json, jobs=2)
+
+    assert serial["sources"]["b.vy"]["id"] == 1
+    assert json.dumps(parallel, default=str) == json.dumps(serial, default=str)
+
+
+def test_exc_handler_to_dict_compiler_parallel(input_json):
+    input_json["sources"]["badcode.vy"] = {"content": BAD_COMPILER_CODE}
+    result = compile_json(input_json, exc_handler_to_dict, jobs=2)
+    assert result == compile_json(input_json, exc_handler_to_dict)
+
+    with pytest.raises(TypeMismatch):
+        compile_json(input_json, jobs=2)
+
+
+def test_compile_json_parallel_warnings(input_json):
+    input_json["sources"]["contracts/enum.vy"] = {"content": "enum Foo:\n    BAR\n"}
+    result = compile_json(input_json, jobs=2)
+
+    (warning,) = result["errors"]
+    assert warning["severity"] == "warning"
+    assert warning["sourceLocation"] == {"file": PurePath("contracts/enum.vy")}
+    assert "enum will be deprecated" in str(warning["message"])
+
+
+def test_compile_json_lazy(input_json):
+    input_json["settings"]["outputSelection"] = {"*": ["ir", "ast", "annotated_ast"]}
+    json_kwargs = dict(sort_keys=True, default=str)
+
+    expected = json.dumps(compile_json(input_json), **json_kwargs)
+    output_dict = compile_json(input_json, lazy_json=True)
+
+    source = output_dict["sources"]["contracts/foo.vy"]
+    assert isinstance(source["annotated_ast"], LazyJSON)
+    assert "".join(iterencode_json(output_dict, **json_kwargs)) == expected
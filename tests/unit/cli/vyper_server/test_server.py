@@ -0,0 +1,224 @@
+import io
+import json
+import socket
+import threading
+import time
+
+import pytest
+
+import vyper.semantics.analysis.imports as imports
+from vyper.cli.vyper_json import compile_json, exc_handler_to_dict
+from vyper.cli.vyper_server import INVALID_PARAMS, METHOD_NOT_FOUND, PARSE_ERROR, CompilerServer
+
+LIB_CODE = """
+counter: uint256
+
+@internal
+def bump():
+    self.counter += 1
+
+@external
+@nonreentrant
+def get_counter() -> uint256:
+    return self.counter
+"""
+
+# initializes lib at a different storage offset than BAR_CODE
+FOO_CODE = """
+import lib
+
+initializes: lib
+exports: lib.get_counter
+
+x: uint256
+
+@external
+def foo():
+    lib.bump()
+"""
+
+BAR_CODE = """
+import lib
+
+y: uint256
+z: uint256
+
+initializes: lib
+
+@external
+def bar():
+    lib.bump()
+    lib.bump()
+"""
+
+
+def _input_json(lib_code=LIB_CODE):
+    return {
+        "language": "Vyper",
+        "sources": {
+            "lib.vy": {"content": lib_code},
+            "foo.vy": {"content": FOO_CODE},
+            "bar.vy": {"content": BAR_CODE},
+        },
+        "settings": {"outputSelection": {"foo.vy": ["*"], "bar.vy": ["*"]}},
+    }
+
+
+def _request(method, params=None, request_id=1):
+    return json.dumps({"jsonrpc": "2.0", "id": request_id, "method": method, "params": params})
+
+
+def _expected(input_json):
+    # roundtrip through json, the same as the server output
+    output = compile_json(input_json, exc_handler_to_dict)
+    return json.loads(json.dumps(output, sort_keys=True, default=str))
+
+
+def _compile(server, input_json):
+    response = server.handle_message(_request("compile", input_json))
+    response = json.loads(json.dumps(response, sort_keys=True, default=str))
+    return response["result"]
+
+
+@pytest.fixture
+def count_parses(monkeypatch):
+    calls = []
+    parse_ast = imports._parse_ast
+
+    def _parse_ast(file):
+        calls.append(str(file.path))
+        return parse_ast(file)
+
+    monkeypatch.setattr(imports, "_parse_ast", _parse_ast)
+    return calls
+
+
+def test_compile_warm(count_parses):
+    server = CompilerServer()
+    input_json = _input_json()
+
+    cold = _compile(server, input_json)
+    # lib.vy is shared between both targets
+    assert count_parses == ["lib.vy"]
+
+    warm = _compile(server, input_json)
+    assert count_parses == ["lib.vy"]
+    assert server.module_cache.stats()["hits"] == 3
+
+    expected = _expected(input_json)
+    assert cold["output"] == warm["output"] == expected
+    assert set(warm["timings"].keys()) >= {"compile", "phases", "total"}
+    # phase stats are not part of the output
+    assert "phase_stats" not in warm["output"]
+
+    phases = warm["timings"]["phases"]
+    # both targets were compiled to bytecode
+    assert phases["_resolve_imports"]["calls"] == 2
+    assert phases["bytecode"]["calls"] == 2
+    assert all(p["wall_time"] >= 0 for p in phases.values())
+
+
+def test_compile_invalidated(count_parses):
+    server = CompilerServer()
+    _compile(server, _input_json())
+
+    lib_code = LIB_CODE + "\nw: public(uint256)\n"
+    result = _compile(server, _input_json(lib_code))
+    assert count_parses == ["lib.vy", "lib.vy"]
+
+    assert result["output"] == _expected(_input_json(lib_code))
+
+
+def test_compile_error_recovers():
+    server = CompilerServer()
+
+    bad_lib_code = LIB_CODE + "\n@internal\ndef bad() -> uint256:\n    return self\n"
+    result = _compile(server, _input_json(bad_lib_code))
+    assert result["output"]["errors"][0]["type"] == "TypeMismatch"
+
+    result = _compile(server, _input_json())
+    assert result["output"] == _expected(_input_json())
+
+
+def test_invalid_requests():
+    server = CompilerServer()
+
+    response = server.handle_message("{not json")
+    assert response["error"]["code"] == PARSE_ERROR
+
+    response = server.handle_message(_request("frobnicate"))
+    assert response["error"]["code"] == METHOD_NOT_FOUND
+    assert response["id"] == 1
+
+    response = server.handle_message(_request("compile", ["foo.vy"]))
+    assert response["error"]["code"] == INVALID_PARAMS
+
+    # notifications don't get a response
+    assert server.handle_message(json.dumps({"jsonrpc": "2.0", "method": "stats"})) is None
+
+
+def test_serve():
+    server = CompilerServer()
+    messages = [
+        _request("compile", _input_json(), request_id=1),
+        _request("shutdown", request_id=2),
+        _request("stats", request_id=3),
+    ]
+    rfile = io.StringIO("\n".join(messages) + "\n")
+    wfile = io.StringIO()
+
+    server.serve(rfile, wfile)
+
+    responses = [json.loads(line) for line in wfile.getvalue().splitlines()]
+    # the server stops after the shutdown request
+    assert [r["id"] for r in responses] == [1, 2]
+    assert responses[0]["result"]["output"] == _expected(_input_json())
+    assert not server.running
+
+
+def _serve_in_thread(server, path):
+    thread = threading.Thread(target=server.serve_unix_socket, args=(path,))
+    thread.start()
+    return thread
+
+
+def _shutdown(path):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+        conn.connect(path)
+        conn.sendall((_request("shutdown") + "\n").encode())
+        return json.loads(conn.makefile("r").readline())
+
+
+def test_serve_unix_socket_stale(tmp_path):
+    path = str(tmp_path / "vyper.sock")
+    # socket file left behind by a server which was killed
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(path)
+    stale.close()
+
+    server = CompilerServer()
+    thread = _serve_in_thread(server, path)
+    # wait for the server to start listening
+    for _ in range(500):
+        try:
+            response = _shutdown(path)
+            break
+        except (ConnectionRefusedError, FileNotFoundError):
+            time.sleep(0.01)
+    else:
+        pytest.fail("server did not start")
+    thread.join()
+
+    assert response["id"] == 1
+    assert not (tmp_path / "vyper.sock").exists()
+
+
+def test_serve_unix_socket_in_use(tmp_path):
+    path = str(tmp_path / "vyper.sock")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as other:
+        other.bind(path)
+        other.listen()
+
+        with pytest.raises(ValueError) as e:
+            CompilerServer().serve_unix_socket(path)
+        assert "Another server is already listening" in str(e.value)
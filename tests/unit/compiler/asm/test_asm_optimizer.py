@@ -3,7 +3,7 @@ import pytest
 from vyper.compiler import compile_code
 from vyper.compiler.phases import CompilerData
 from vyper.compiler.settings import OptimizationLevel, Settings
-from vyper.ir.compile_ir import _merge_jumpdests
+from vyper.ir.compile_ir import _merge_jumpdests, optimize_assembly
 
 codes = [
     """
@@ -82,8 +82,8 @@ def test_dead_code_eliminator(code):
     c = CompilerData(code, settings=Settings(optimize=OptimizationLevel.NONE))
 
     # get the labels
-    initcode_asm = [i for i in c.assembly if isinstance(i, str)]
-    runtime_asm = [i for i in c.assembly_runtime if isinstance(i, str)]
+    initcode_asm = [i for i in c.assembly.decode() if isinstance(i, str)]
+    runtime_asm = [i for i in c.assembly_runtime.decode() if isinstance(i, str)]
 
     ctor_only = "ctor_only()"
     runtime_only = "runtime_only()"
@@ -132,3 +132,47 @@ def test_merge_jumpdests():
     asm = ["_sym_label_0", "JUMP", "PUSH0", "_sym_label_0", "JUMPDEST", "_sym_label_0", "JUMPDEST"]
 
     assert _merge_jumpdests(asm) is False, "should not return True as no changes were made"
+
+
+peephole_cases = [
+    (
+        # jump threading
+        ["PUSH1", 1, "_sym_x", "JUMPI", "_sym_y", "JUMP", "_sym_x", "JUMPDEST"]
+        + ["PUSH1", 2, "_sym_y", "JUMPDEST", "STOP"],
+        ["PUSH1", 1, "ISZERO", "_sym_y", "JUMPI", "PUSH1", 2, "_sym_y", "JUMPDEST", "STOP"],
+    ),
+    (
+        # overlapping stack rewrites
+        ["CALLVALUE", "DUP1", "SWAP2", "SWAP1", "DUP1", "SWAP1", "POP", "SWAP1", "POP", "POP"]
+        + ["STOP"],
+        ["CALLVALUE", "SWAP1", "DUP2", "POP", "POP", "STOP"],
+    ),
+    (
+        ["CALLVALUE", "CALLER", "LT", "ISZERO", "ISZERO", "ISZERO", "ISZERO", "_sym_z", "JUMPI"]
+        + ["SWAP1", "ADD", "STOP", "_sym_z", "JUMPDEST", "STOP"],
+        [
+            "CALLVALUE",
+            "CALLER",
+            "LT",
+            "_sym_z",
+            "JUMPI",
+            "ADD",
+            "STOP",
+            "_sym_z",
+            "JUMPDEST",
+            "STOP",
+        ],
+    ),
+    (
+        # chains of jumpdests
+        ["_sym_a", "JUMP", "_sym_a", "JUMPDEST", "_sym_b", "JUMPDEST", "_sym_c", "JUMP"]
+        + ["_sym_c", "JUMPDEST", "STOP", "_sym_b", "JUMP"],
+        ["STOP"],
+    ),
+]
+
+
+@pytest.mark.parametrize("asm,expected", peephole_cases)
+def test_peephole_opts(asm, expected):
+    optimize_assembly(asm)
+    assert asm == expected
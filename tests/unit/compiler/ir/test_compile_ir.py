@@ -1,6 +1,7 @@
 import pytest
 
 from vyper.codegen.ir_node import IRnode
+from vyper.compiler.settings import OptimizationLevel
 from vyper.evm.opcodes import version_check
 from vyper.ir import compile_ir
 from vyper.ir.s_expressions import parse_s_exp
@@ -75,3 +76,77 @@ def test_pc_debugger():
         offset = 5
 
     assert line_number_map["pc_breakpoints"][0] == offset
+
+
+def test_instructions_tagged_with_innermost_node():
+    assert_node = IRnode.from_list(["assert", ["mload", 0]], error_msg="assert failed")
+    assert_node.args[0].error_msg = "mload"
+    ir = IRnode.from_list(["seq", ["mstore", 0, 1], assert_node])
+
+    asm = compile_ir.compile_to_assembly(ir, optimize=OptimizationLevel.NONE)
+    error_msgs = {str(i): i.error_msg for i in asm if isinstance(i, compile_ir.Instruction)}
+
+    assert error_msgs["MSTORE"] is None
+    assert error_msgs["MLOAD"] == "mload"
+    assert error_msgs["ISZERO"] == "assert failed"
+    assert error_msgs["JUMPI"] == "assert failed"
+
+
+def test_assemble_symbols_and_offsets():
+    asm = [
+        "_sym_foo",
+        "JUMP",
+        "push1",
+        0x20,
+        "_sym_foo",
+        "JUMPDEST",
+        "_OFST",
+        "_sym_foo",
+        3,
+        "DEBUG",
+        "STOP",
+    ]
+    bytecode, line_number_map, symbol_map = compile_ir.assembly_to_evm_with_symbol_map(asm)
+
+    assert symbol_map["_sym_foo"] == 6
+    assert bytecode == bytes.fromhex("61000656" "6020" "5b" "610009" "00")
+    assert line_number_map["pc_jump_map"] == {0: "-", 3: "-", 6: "-"}
+
+
+def test_gas_estimate_is_lazy():
+    ir = IRnode.from_list(["seq", ["mstore", 0, 1], ["if", ["mload", 0], ["sstore", 0, 2]]])
+    mstore, if_ = ir.args
+    assert ir._gas is None and mstore._gas is None and if_._gas is None
+
+    gas = ir.gas
+    assert gas == mstore.gas + if_.gas + 30
+    assert if_.gas == if_.args[0].gas + if_.args[1].gas + 17
+    # non-zero sstore
+    assert if_.args[1].gas > 15000
+
+    ir.add_gas_estimate = 100
+    assert ir.gas == gas + 100
+
+
+def test_encode_assembly_roundtrip():
+    runtime = [
+        compile_ir.RuntimeHeader("_sym_runtime", 0, 0),
+        "PREVRANDAO",
+        "DIFFICULTY",
+        "push1",
+        0x20,
+        "_sym_table",
+        "POP",
+        "_sym_bar",
+        "JUMPDEST",
+        "STOP",
+        [compile_ir.DataHeader("_sym_table"), "_sym_bar", b"\x01\x02"],
+    ]
+    asm = ["_sym_foo", "JUMP", "_sym_foo", "JUMPDEST", "_OFST", "_sym_foo", 3, "DEBUG", runtime]
+
+    encoded = compile_ir.encode_assembly(asm)
+    # the textual assembly is rendered back exactly
+    assert encoded.decode() == asm
+    assert len(encoded) == len(asm) - 2  # the _OFST triple is one item
+
+    assert compile_ir.assemble(encoded) == compile_ir.assemble(asm)
@@ -0,0 +1,133 @@
+import warnings
+
+import pytest
+
+import vyper.compiler.phases as phases
+from vyper.cli.vyper_compile import compile_files
+from vyper.compiler.cache import CompilationCache
+from vyper.compiler.settings import OptimizationLevel, Settings
+
+LIB_CODE = """
+counter: uint256
+
+@internal
+def bump():
+    self.counter += 1
+"""
+
+MAIN_CODE = """
+import lib
+initializes: lib
+
+@external
+def foo():
+    lib.bump()
+"""
+
+FORMATS = ["bytecode", "abi", "source_map", "metadata", "annotated_ast_dict"]
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return CompilationCache(tmp_path / "cache")
+
+
+@pytest.fixture
+def count_analysis(monkeypatch):
+    calls = []
+    analyze_module = phases.analyze_module
+
+    def _analyze_module(module_ast):
+        calls.append(module_ast.path)
+        return analyze_module(module_ast)
+
+    monkeypatch.setattr(phases, "analyze_module", _analyze_module)
+    return calls
+
+
+def test_cache_hit(chdir_tmp_path, make_file, cache, count_analysis):
+    make_file("lib.vy", LIB_CODE)
+    make_file("main.vy", MAIN_CODE)
+
+    cold = compile_files(["main.vy"], FORMATS, cache=cache)
+    assert cache.stats() == {"hits": 0, "misses": 1}
+    assert len(count_analysis) == 1
+
+    warm = compile_files(["main.vy"], FORMATS, cache=cache)
+    assert cache.stats() == {"hits": 1, "misses": 1}
+    # semantic analysis was skipped
+    assert len(count_analysis) == 1
+
+    assert warm == cold
+
+
+def test_cache_invalidated_by_import(chdir_tmp_path, make_file, cache):
+    make_file("lib.vy", LIB_CODE)
+    make_file("main.vy", MAIN_CODE)
+
+    out1 = compile_files(["main.vy"], ["bytecode"], cache=cache)
+
+    make_file("lib.vy", LIB_CODE + "\nx: public(uint256)\n")
+    out2 = compile_files(["main.vy"], ["bytecode"], cache=cache)
+
+    assert cache.stats() == {"hits": 0, "misses": 2}
+    assert out1 != out2
+
+
+def test_cache_keyed_on_settings(chdir_tmp_path, make_file, cache):
+    make_file("lib.vy", LIB_CODE)
+    make_file("main.vy", MAIN_CODE)
+
+    for level in (OptimizationLevel.GAS, OptimizationLevel.CODESIZE, OptimizationLevel.GAS):
+        settings = Settings(optimize=level)
+        compile_files(["main.vy"], ["bytecode"], settings=settings, cache=cache)
+
+    assert cache.stats() == {"hits": 1, "misses": 2}
+
+
+def test_cache_replays_warnings(chdir_tmp_path, make_file, cache):
+    # enum usage is deprecated and emits a warning
+    make_file("foo.vy", "enum Foo:\n    BAR\n")
+
+    for _ in range(2):
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter("always")
+            compile_files(["foo.vy"], ["bytecode"], cache=cache)
+        assert len(w) == 1
+        assert "enum will be deprecated" in str(w[0].message)
+
+    assert cache.stats() == {"hits": 1, "misses": 1}
+
+
+def test_uncacheable_formats(chdir_tmp_path, make_file, cache):
+    make_file("lib.vy", LIB_CODE)
+    make_file("main.vy", MAIN_CODE)
+
+    for _ in range(2):
+        compile_files(["main.vy"], ["ir"], cache=cache)
+
+    assert cache.stats() == {"hits": 0, "misses": 0}
+
+
+def test_cache_eviction(chdir_tmp_path, make_file, tmp_path):
+    make_file("lib.vy", LIB_CODE)
+    make_file("main.vy", MAIN_CODE)
+
+    cache = CompilationCache(tmp_path / "cache", max_size=0)
+    compile_files(["main.vy"], ["bytecode"], cache=cache)
+
+    assert list(cache.cache_dir.iterdir()) == []
+
+
+def test_corrupted_entry(chdir_tmp_path, make_file, cache):
+    make_file("lib.vy", LIB_CODE)
+    make_file("main.vy", MAIN_CODE)
+
+    out1 = compile_files(["main.vy"], ["bytecode"], cache=cache)
+    (entry,) = cache.cache_dir.iterdir()
+    entry.write_bytes(b"garbage")
+
+    out2 = compile_files(["main.vy"], ["bytecode"], cache=cache)
+
+    assert cache.stats() == {"hits": 0, "misses": 2}
+    assert out1 == out2
@@ -0,0 +1,131 @@
+from pathlib import Path
+
+import pytest
+
+from vyper.compiler import compile_from_file_input
+from vyper.compiler.session import CompilationSession
+from vyper.exceptions import TypeMismatch
+from vyper.semantics.analysis.module import ModuleAnalyzer
+
+LEAF_CODE = """
+@internal
+@pure
+def f(x: uint256) -> uint256:
+    return x + {n}
+"""
+
+MIDDLE_CODE = """
+import leaf
+
+@internal
+@pure
+def g(x: uint256) -> uint256:
+    return leaf.f(x) * 2
+"""
+
+A_CODE = """
+import middle
+
+@external
+def foo(x: uint256) -> uint256:
+    return middle.g(x)
+"""
+
+B_CODE = """
+@external
+def bar() -> uint256:
+    return 1
+"""
+
+
+@pytest.fixture
+def analyzed_modules(monkeypatch):
+    # count analyses of each module
+    ret = []
+    analyze_module_body = ModuleAnalyzer.analyze_module_body
+
+    def wrapper(self):
+        ret.append(Path(self.ast.path).name)
+        return analyze_module_body(self)
+
+    monkeypatch.setattr(ModuleAnalyzer, "analyze_module_body", wrapper)
+    return ret
+
+
+@pytest.fixture
+def project(make_input_bundle, make_file):
+    input_bundle = make_input_bundle(
+        {"leaf.vy": LEAF_CODE.format(n=1), "middle.vy": MIDDLE_CODE, "a.vy": A_CODE, "b.vy": B_CODE}
+    )
+    session = CompilationSession()
+
+    def compile_target(path):
+        return compile_from_file_input(
+            input_bundle.load_file(path),
+            input_bundle=input_bundle,
+            output_formats=["bytecode"],
+            cache=session,
+            module_cache=session.module_cache,
+        )
+
+    return session, compile_target
+
+
+def test_unchanged_targets_are_reused(project, analyzed_modules):
+    session, compile_target = project
+
+    out_a = compile_target("a.vy")
+    out_b = compile_target("b.vy")
+    assert session.stats() == {"compiled": 2, "reused": 0}
+    assert sorted(analyzed_modules) == ["a.vy", "b.vy", "leaf.vy", "middle.vy"]
+
+    analyzed_modules.clear()
+    assert compile_target("a.vy") == out_a
+    assert compile_target("b.vy") == out_b
+    assert session.stats() == {"compiled": 2, "reused": 2}
+    assert analyzed_modules == []
+
+
+def test_leaf_change(project, make_file, analyzed_modules, tmp_path):
+    session, compile_target = project
+
+    out_a = compile_target("a.vy")
+    compile_target("b.vy")
+
+    leaf_path = make_file("leaf.vy", LEAF_CODE.format(n=2))
+    assert session.affected_targets([leaf_path]) == [tmp_path / "a.vy"]
+
+    analyzed_modules.clear()
+    new_out_a = compile_target("a.vy")
+    compile_target("b.vy")
+
+    assert new_out_a != out_a
+    assert session.stats() == {"compiled": 3, "reused": 1}
+    # only the changed closure is re-analyzed
+    assert sorted(analyzed_modules) == ["a.vy", "leaf.vy", "middle.vy"]
+
+
+def test_dependencies(project, tmp_path):
+    session, compile_target = project
+
+    compile_target("a.vy")
+
+    expected = {tmp_path / "a.vy", tmp_path / "middle.vy", tmp_path / "leaf.vy"}
+    assert set(session.dependencies(tmp_path / "a.vy").keys()) == expected
+    assert session.watched_files() == expected
+    assert session.dependencies(tmp_path / "b.vy") == {}
+
+
+def test_failed_compilation_is_retried(project, make_file, tmp_path):
+    session, compile_target = project
+
+    good_out = compile_target("a.vy")
+
+    make_file("leaf.vy", LEAF_CODE.format(n="True"))
+    with pytest.raises(TypeMismatch):
+        compile_target("a.vy")
+    # still tracks the dependencies of the target
+    assert tmp_path / "leaf.vy" in session.dependencies(tmp_path / "a.vy")
+
+    make_file("leaf.vy", LEAF_CODE.format(n=1))
+    assert compile_target("a.vy") == good_out
@@ -0,0 +1,182 @@
+import warnings
+from pathlib import Path
+
+import pytest
+
+import vyper.cli.vyper_compile as vyper_compile
+from vyper.cli.vyper_json import compile_json
+from vyper.compiler import compile_from_file_input
+from vyper.compiler.input_bundle import FilesystemInputBundle
+from vyper.compiler.settings import Settings
+from vyper.semantics.analysis.imports import ModuleCache
+from vyper.semantics.analysis.module import ModuleAnalyzer
+
+MATH_CODE = """
+@internal
+@pure
+def add(x: uint256, y: uint256 = 1) -> uint256:
+    return x + y
+"""
+
+LIB_CODE = """
+import math
+
+counter: uint256
+owner: immutable(address)
+
+@deploy
+def __init__():
+    owner = msg.sender
+
+@internal
+def bump(n: uint256 = 2):
+    self.counter = math.add(self.counter, n)
+
+@external
+@nonreentrant
+def get_counter() -> uint256:
+    return self.counter
+"""
+
+# initializes lib at different storage offsets, and calls the
+# library functions in a different order
+A_CODE = """
+import lib
+import math
+
+initializes: lib
+exports: lib.get_counter
+
+x: uint256
+
+@deploy
+def __init__():
+    lib.__init__()
+
+@external
+def foo():
+    lib.bump()
+    self.x = math.add(self.x)
+"""
+
+B_CODE = """
+import math
+import lib
+
+y: uint256
+z: HashMap[uint256, uint256]
+
+initializes: lib
+
+@deploy
+def __init__():
+    lib.__init__()
+
+@external
+@nonreentrant
+def bar():
+    self.y = math.add(self.y, 7)
+    lib.bump(5)
+"""
+
+FORMATS = [
+    "bytecode",
+    "bytecode_runtime",
+    "abi",
+    "layout",
+    "metadata",
+    "source_map",
+    "annotated_ast_dict",
+    "ir_dict",
+    "method_identifiers",
+    "asm",
+]
+
+
+@pytest.fixture
+def project(chdir_tmp_path, make_file):
+    make_file("math.vy", MATH_CODE)
+    make_file("lib.vy", LIB_CODE)
+    make_file("a.vy", A_CODE)
+    make_file("b.vy", B_CODE)
+
+
+@pytest.fixture
+def count_analysis(monkeypatch):
+    calls = []
+    analyze_module_body = ModuleAnalyzer.analyze_module_body
+
+    def _analyze_module_body(self):
+        calls.append(self.ast.path)
+        return analyze_module_body(self)
+
+    monkeypatch.setattr(ModuleAnalyzer, "analyze_module_body", _analyze_module_body)
+    return calls
+
+
+@pytest.mark.parametrize("venom", [False, True])
+def test_shared_modules_same_output(project, monkeypatch, venom):
+    files = ["a.vy", "b.vy", "lib.vy", "a.vy"]
+    settings = Settings(experimental_codegen=venom)
+
+    shared = vyper_compile.compile_files(files, FORMATS, settings=settings)
+
+    monkeypatch.setattr(vyper_compile, "ModuleCache", lambda: None)
+    cold = vyper_compile.compile_files(files, FORMATS, settings=settings)
+
+    assert list(shared.keys()) == list(cold.keys())
+    for k, v in cold.items():
+        assert {f: str(x) for f, x in shared[k].items()} == {f: str(x) for f, x in v.items()}
+
+
+def test_library_analyzed_once(project, count_analysis):
+    vyper_compile.compile_files(["a.vy", "b.vy"], ["bytecode"])
+
+    assert sorted(count_analysis) == ["a.vy", "b.vy", "lib.vy", "math.vy"]
+
+
+def test_invalidated_by_import(project, make_file, count_analysis):
+    module_cache = ModuleCache()
+    input_bundle = FilesystemInputBundle([Path(".")])
+
+    def _compile(path):
+        file = input_bundle.load_file(Path(path))
+        return compile_from_file_input(
+            file, input_bundle, output_formats=["bytecode"], module_cache=module_cache
+        )
+
+    _compile("a.vy")
+    _compile("b.vy")
+    assert sorted(count_analysis) == ["a.vy", "b.vy", "lib.vy", "math.vy"]
+    count_analysis.clear()
+
+    # lib.vy is unchanged, but one of its imports changed
+    make_file("math.vy", MATH_CODE + "\nX: constant(uint256) = 1\n")
+    out = _compile("a.vy")
+    assert sorted(count_analysis) == ["a.vy", "lib.vy", "math.vy"]
+
+    cold = compile_from_file_input(input_bundle.load_file(Path("a.vy")), input_bundle)
+    assert out == cold
+
+
+def test_warnings_replayed_per_target():
+    # enum usage is deprecated and emits a warning
+    lib_code = "enum Foo:\n    BAR\n\n@internal\ndef foo():\n    pass\n"
+    target_code = "import lib\n\n@external\ndef bar():\n    pass\n"
+    input_json = {
+        "language": "Vyper",
+        "sources": {
+            "lib.vy": {"content": lib_code},
+            "a.vy": {"content": target_code},
+            "b.vy": {"content": target_code},
+        },
+        "settings": {"outputSelection": {"a.vy": ["abi"], "b.vy": ["abi"]}},
+    }
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        output = compile_json(input_json)
+
+    files = [str(e["sourceLocation"]["file"]) for e in output["errors"]]
+    assert files == ["a.vy", "b.vy"]
+    assert all("enum will be deprecated" in str(e["message"]) for e in output["errors"])
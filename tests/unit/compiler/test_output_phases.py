@@ -0,0 +1,68 @@
+import pytest
+
+from vyper.compiler import OUTPUT_FORMAT_PHASES, OUTPUT_FORMATS, outputs_from_compiler_data
+from vyper.compiler.phases import CompilerData
+
+CODE = """
+struct Foo:
+    a: uint256
+
+event Transfer:
+    amount: uint256
+
+counter: public(uint256)
+
+@external
+def foo(x: uint256) -> Foo:
+    \"\"\"
+    @notice Increment the counter
+    \"\"\"
+    self.counter += x
+    log Transfer(amount=x)
+    return Foo(a=self.counter)
+"""
+
+PRE_CODEGEN_PHASES = ("vyper_module", "integrity_sum", "annotated_vyper_module", "storage_layout")
+
+PRE_CODEGEN_FORMATS = [
+    f for f, phase in OUTPUT_FORMAT_PHASES.items() if phase in PRE_CODEGEN_PHASES
+]
+
+
+def test_all_formats_have_a_phase():
+    assert OUTPUT_FORMAT_PHASES.keys() == OUTPUT_FORMATS.keys()
+
+
+def test_cheap_formats():
+    for f in ("abi", "interface", "external_interface", "method_identifiers", "layout"):
+        assert f in PRE_CODEGEN_FORMATS
+    for f in ("devdoc", "userdoc"):
+        assert f in PRE_CODEGEN_FORMATS
+
+
+@pytest.mark.parametrize("output_format", PRE_CODEGEN_FORMATS)
+def test_no_codegen(output_format):
+    compiler_data = CompilerData(CODE)
+    outputs_from_compiler_data(compiler_data, [output_format])
+
+    assert "_ir_output" not in compiler_data.phase_stats
+
+
+def test_abi_without_codegen_matches():
+    compiler_data = CompilerData(CODE)
+    cheap_abi = outputs_from_compiler_data(compiler_data, ["abi"])["abi"]
+    assert "_ir_output" not in compiler_data.phase_stats
+
+    compiler_data = CompilerData(CODE)
+    abi = outputs_from_compiler_data(compiler_data, ["bytecode", "abi"])["abi"]
+
+    assert cheap_abi == abi
+
+
+def test_abi_gas_estimates_codegen():
+    # gas estimates are computed from the IR
+    compiler_data = CompilerData(CODE, show_gas_estimates=True)
+    abi = outputs_from_compiler_data(compiler_data, ["abi"])["abi"]
+
+    assert "_ir_output" in compiler_data.phase_stats
+    assert all("gas" in item for item in abi if item.get("name") == "foo")
@@ -0,0 +1,104 @@
+import json
+import tracemalloc
+
+import pytest
+
+from vyper.cli.vyper_compile import _parse_args
+from vyper.compiler import compile_code
+from vyper.compiler.phases import CompilerData
+from vyper.compiler.profiling import profile_phase
+from vyper.compiler.settings import Settings
+
+CODE = """
+x: uint256
+
+@external
+def foo(a: uint256) -> uint256:
+    self.x = a
+    return self.x + 1
+"""
+
+
+def test_phase_stats():
+    compiler_data = CompilerData(CODE)
+    assert compiler_data.phase_stats == {}
+
+    _ = compiler_data.bytecode
+
+    stats = compiler_data.phase_stats
+    for phase in ("_generate_ast", "_annotate", "_ir_output", "assembly", "bytecode"):
+        assert stats[phase].calls == 1
+        assert stats[phase].wall_time >= 0
+        assert stats[phase].cpu_time >= 0
+        # not tracing
+        assert stats[phase].peak_memory is None
+
+    # cached phases are not re-run
+    _ = compiler_data.bytecode
+    assert compiler_data.phase_stats["bytecode"].calls == 1
+
+
+def test_phase_stats_venom():
+    compiler_data = CompilerData(CODE, settings=Settings(experimental_codegen=True))
+    _ = compiler_data.bytecode
+
+    stats = compiler_data.phase_stats
+    assert "venom.ir_node_to_venom" in stats
+    assert "venom.SCCP" in stats
+    # passes are run on every function
+    assert stats["venom.SCCP"].calls > 1
+
+
+def test_phase_stats_memory():
+    compiler_data = CompilerData(CODE)
+
+    tracemalloc.start()
+    try:
+        _ = compiler_data.bytecode
+    finally:
+        tracemalloc.stop()
+
+    stats = compiler_data.phase_stats
+    assert stats["_annotate"].peak_memory > 0
+    # peak memory of a phase includes nested phases
+    assert stats["bytecode"].peak_memory >= stats["assembly"].peak_memory
+
+
+def test_profile_phase_outside_compiler():
+    # no-op outside of a compiler phase
+    with profile_phase("foo"):
+        pass
+
+
+def test_phase_stats_output_format():
+    out = compile_code(CODE, output_formats=["phase_stats", "abi", "bytecode"])
+    # phase_stats is generated last, so it includes the other outputs
+    assert out["phase_stats"]["bytecode"]["calls"] == 1
+    assert set(out["phase_stats"]["bytecode"].keys()) == {
+        "calls",
+        "wall_time",
+        "cpu_time",
+        "peak_memory",
+    }
+
+
+@pytest.mark.parametrize("requested", [False, True])
+def test_profile_phases_cli(make_file, tmp_path, requested):
+    path = make_file("foo.vy", CODE)
+    profile_path = tmp_path / "phases.json"
+    output_path = tmp_path / "out.txt"
+
+    formats = "abi,phase_stats" if requested else "abi"
+    args = [str(path), "-f", formats, "-o", str(output_path)]
+    _parse_args(args + ["--profile-phases", str(profile_path)])
+
+    with profile_path.open() as f:
+        phase_stats = json.load(f)
+
+    stats = phase_stats[str(path)]
+    assert stats["_annotate"]["calls"] == 1
+    assert stats["_annotate"]["peak_memory"] > 0
+    assert not tracemalloc.is_tracing()
+
+    # phase_stats is only in the regular output if it was requested
+    assert ('"_annotate"' in output_path.read_text()) == requested
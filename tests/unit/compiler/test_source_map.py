@@ -1,7 +1,8 @@
 from collections import namedtuple
 
-from vyper.compiler import compile_code
+from vyper.compiler import compile_code, outputs_from_compiler_data
 from vyper.compiler.output import _compress_source_map
+from vyper.compiler.phases import CompilerData
 from vyper.compiler.settings import OptimizationLevel
 from vyper.compiler.utils import expand_source_map
 
@@ -96,6 +97,37 @@ def test_pos_map_offsets():
             )
 
 
+def test_source_map_reuses_assembled_code():
+    compiler_data = CompilerData(TEST_CODE)
+    formats = ["bytecode", "bytecode_runtime", "source_map", "source_map_runtime"]
+    out = outputs_from_compiler_data(compiler_data, formats)
+
+    assert compiler_data.phase_stats["assembled"].calls == 1
+    assert compiler_data.phase_stats["assembled_runtime"].calls == 1
+
+    # the compiler metadata at the end of the deploy code is not mapped
+    source_map = out["source_map"]["pc_pos_map_compressed"].split(";")
+    assert len(source_map) == compiler_data.assembled.code_len
+    assert len(source_map) < len(compiler_data.bytecode)
+
+    source_map = out["source_map_runtime"]["pc_pos_map_compressed"].split(";")
+    assert len(source_map) == len(compiler_data.bytecode_runtime)
+
+
+def test_source_map_does_not_modify_assembled_code():
+    compiler_data = CompilerData(TEST_CODE)
+    pc_maps = compiler_data.assembled_runtime.pc_maps
+    expected = {k: v.copy() for k, v in pc_maps.items()}
+
+    out = outputs_from_compiler_data(compiler_data, ["source_map_runtime"])["source_map_runtime"]
+    assert pc_maps == expected
+
+    # the outputs are not aliased to the cached pc maps
+    out["pc_jump_map"].clear()
+    out["breakpoints"].clear()
+    assert pc_maps == expected
+
+
 def test_error_map():
     code = """
 foo: uint256
@@ -30,4 +30,4 @@ def test_duplicate_operands():
 
     optimize = OptimizationLevel.GAS
     asm = generate_assembly_experimental(ctx, optimize=optimize)
-    assert asm == ["PUSH1", 10, "DUP1", "DUP2", "ADD", "MUL", "POP", "STOP"]
+    assert asm.decode() == ["PUSH1", 10, "DUP1", "DUP2", "ADD", "MUL", "POP", "STOP"]
@@ -14,4 +14,4 @@ def test_cleanup_stack():
     bb.append_instruction("ret", ret_val)
 
     asm = generate_assembly_experimental(ctx, optimize=OptimizationLevel.GAS)
-    assert asm == ["PUSH1", 10, "DUP1", "ADD", "POP", "JUMP"]
+    assert asm.decode() == ["PUSH1", 10, "DUP1", "ADD", "POP", "JUMP"]
@@ -0,0 +1,115 @@
+import pickle
+from pathlib import Path
+
+import pytest
+
+import vyper.builtins.interfaces
+import vyper.semantics.analysis.imports as imports
+from vyper.ast.utils import ast_to_dict
+from vyper.compiler import compile_code
+
+CODE = """
+from ethereum.ercs import IERC20
+from ethereum.ercs import IERC721
+
+@external
+def foo(token: IERC20, nft: IERC721) -> uint256:
+    return staticcall token.balanceOf(self) + staticcall nft.balanceOf(self)
+"""
+
+
+@pytest.fixture
+def fresh_process(monkeypatch, tmp_path):
+    # simulate a fresh process, with the artifact in tmp_path
+    artifact_path = tmp_path / imports.BUILTINS_ARTIFACT_NAME
+
+    def reset():
+        monkeypatch.setattr(imports, "_builtins_cache", {})
+        monkeypatch.setattr(imports, "_builtins_artifact", None)
+        monkeypatch.setattr(imports, "_builtins_artifact_generated", False)
+
+    monkeypatch.setattr(imports, "_builtins_artifact_path", lambda: artifact_path)
+    reset()
+    return artifact_path, reset
+
+
+def _load(module_str):
+    _, module_ast = imports._load_builtin_import(0, module_str)
+    return module_ast
+
+
+def test_artifact_generated_on_first_use(fresh_process):
+    artifact_path, reset = fresh_process
+    assert not artifact_path.exists()
+
+    parsed = _load("ethereum.ercs.IERC20")
+    assert artifact_path.exists()
+
+    reset()
+    loaded = _load("ethereum.ercs.IERC20")
+    assert loaded is not parsed
+    # the artifact is not regenerated
+    assert not imports._builtins_artifact_generated
+
+    assert ast_to_dict(loaded) == ast_to_dict(parsed)
+    assert loaded.path == parsed.path
+    assert loaded.resolved_path == parsed.resolved_path
+
+
+def test_compile_with_artifact(fresh_process):
+    _, reset = fresh_process
+    formats = ["annotated_ast_dict", "abi", "bytecode"]
+
+    expected = compile_code(CODE, output_formats=formats)
+
+    reset()
+    assert compile_code(CODE, output_formats=formats) == expected
+    assert not imports._builtins_artifact_generated
+
+
+def test_all_interfaces_loaded_from_artifact(fresh_process, monkeypatch):
+    _, reset = fresh_process
+    builtins_dir = Path(vyper.builtins.interfaces.__path__[0])
+    names = sorted(p.stem for p in builtins_dir.glob("*.vyi"))
+    code = "\n".join(f"from ethereum.ercs import {name}" for name in names)
+
+    # generate the artifact
+    compile_code(code, output_formats=["abi"])
+
+    reset()
+
+    def _parse_ast(file):  # pragma: nocover
+        raise AssertionError(f"{file.path} was re-parsed")
+
+    monkeypatch.setattr(imports, "_parse_ast", _parse_ast)
+    compile_code(code, output_formats=["abi"])
+
+    assert len(imports._builtins_cache) == len(names)
+    assert not imports._builtins_artifact_generated
+
+
+def test_stale_artifact(fresh_process):
+    artifact_path, reset = fresh_process
+    _load("ethereum.ercs.IERC20")
+
+    with artifact_path.open("rb") as f:
+        _, modules = pickle.load(f)
+    with artifact_path.open("wb") as f:
+        pickle.dump(("0.0.0", modules), f)
+
+    reset()
+    _load("ethereum.ercs.IERC20")
+    # regenerated
+    assert imports._builtins_artifact_generated
+    with artifact_path.open("rb") as f:
+        version, _ = pickle.load(f)
+    assert version != "0.0.0"
+
+
+def test_corrupted_artifact(fresh_process):
+    artifact_path, _ = fresh_process
+    artifact_path.write_bytes(b"garbage")
+
+    module_ast = _load("ethereum.ercs.IERC20")
+    assert module_ast.resolved_path.endswith("IERC20.vyi")
+    assert imports._builtins_artifact_generated
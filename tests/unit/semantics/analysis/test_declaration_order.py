@@ -0,0 +1,150 @@
+import pytest
+
+from vyper.ast import parse_to_ast
+from vyper.exceptions import NamespaceCollision, StructureException
+from vyper.semantics.analysis import analyze_module
+from vyper.semantics.analysis.module import ModuleAnalyzer
+
+FORWARD_REFERENCES = [
+    """
+struct A:
+    b: B
+    c: DynArray[C, N]
+
+struct B:
+    c: C
+
+flag C:
+    X
+
+N: constant(uint256) = M + 1
+M: constant(uint256) = 2
+    """,
+    """
+event Transfer:
+    sender: indexed(address)
+    value: S
+
+interface I:
+    def foo(s: S) -> J: view
+
+interface J:
+    def bar() -> S: view
+
+struct S:
+    x: uint256
+    """,
+    """
+@external
+def foo(x: uint256 = A) -> S:
+    return S(x=x)
+
+A: constant(uint256) = B * 2
+C: constant(DynArray[uint256, B]) = [1, 2, D]
+B: constant(uint256) = D + 1
+D: constant(uint256) = 3
+
+struct S:
+    x: uint256
+    """,
+    # member names do not refer to other declarations
+    """
+struct A:
+    B: uint256
+
+struct B:
+    A: A
+    """,
+]
+
+
+@pytest.mark.parametrize("code", FORWARD_REFERENCES)
+def test_forward_references(code):
+    analyze_module(parse_to_ast(code))
+
+
+def test_declarations_visited_once(monkeypatch):
+    n = 50
+    # each declaration refers to the next one
+    code = "\n".join(f"struct S{i}:\n    s: S{i + 1}" for i in range(n))
+    code += f"\nstruct S{n}:\n    x: uint256\n"
+    code += "\n".join(f"C{i}: constant(uint256) = C{i + 1} + 1" for i in range(n))
+    code += f"\nC{n}: constant(uint256) = 1\n"
+
+    visited = []
+    visit = ModuleAnalyzer.visit
+
+    def visit_counted(self, node, *args):
+        visited.append(node)
+        return visit(self, node, *args)
+
+    monkeypatch.setattr(ModuleAnalyzer, "visit", visit_counted)
+
+    vyper_module = parse_to_ast(code)
+    analyze_module(vyper_module)
+
+    assert len(visited) == len(vyper_module.body) == 2 * (n + 1)
+    names = [getattr(node, "name", None) for node in visited[: n + 1]]
+    assert names == [f"S{i}" for i in reversed(range(n + 1))]
+
+
+CYCLES = [
+    (
+        """
+struct A:
+    b: B
+
+struct B:
+    a: DynArray[A, 3]
+    """,
+        "`A` -> `B` -> `A`",
+    ),
+    (
+        """
+struct A:
+    a: A
+    """,
+        "`A` -> `A`",
+    ),
+    (
+        """
+X: constant(uint256) = 1
+
+A: constant(uint256) = X + C
+
+B: constant(uint256) = A
+
+C: constant(uint256) = B * 2
+
+D: constant(uint256) = A
+    """,
+        "`A` -> `C` -> `B` -> `A`",
+    ),
+    (
+        """
+interface I:
+    def foo() -> J: view
+
+interface J:
+    def foo(i: I): nonpayable
+    """,
+        "`I` -> `J` -> `I`",
+    ),
+]
+
+
+@pytest.mark.parametrize("code,path", CYCLES)
+def test_cyclic_declarations(code, path):
+    with pytest.raises(StructureException) as e:
+        analyze_module(parse_to_ast(code))
+
+    assert e.value.message == f"Cyclic reference between declarations: {path}"
+
+
+def test_shadowed_builtin_is_not_a_cycle():
+    code = """
+event int128:
+    variable: int128
+    """
+    with pytest.raises(NamespaceCollision):
+        analyze_module(parse_to_ast(code))
@@ -0,0 +1,34 @@
+import pytest
+
+from vyper.semantics.analysis.levenshtein_utils import (
+    BKTree,
+    _get_levenshtein_error_suggestions,
+    levenshtein,
+)
+from vyper.semantics.namespace import Namespace
+
+WORDS = ["balance", "balances", "owner", "owners", "total_supply", "allowance", "uint256"]
+
+
+@pytest.mark.parametrize("key", ["balanc", "ownr", "total", "uint265", "xyz"])
+@pytest.mark.parametrize("max_distance", [0, 1, 2, 5])
+def test_bk_tree_search(key, max_distance):
+    tree = BKTree(WORDS)
+
+    expected = [(w, i) for i, w in enumerate(WORDS) if levenshtein(key, w) <= max_distance]
+    assert sorted(tree.search(key, max_distance), key=lambda k: k[1]) == expected
+
+
+@pytest.mark.parametrize("key", ["uint265", "msg_sender", "convrt", "balnce", "emptt", "b"])
+@pytest.mark.parametrize("threshold", [0.2, 0.4, 1.0])
+def test_suggestions_with_index(key, threshold):
+    namespace = Namespace()
+    with namespace.enter_scope():
+        for name in ("balance", "owner"):
+            namespace[name] = None
+
+        index = BKTree(namespace._builtin_names)
+        expected = _get_levenshtein_error_suggestions(key, namespace, threshold)
+        hint = _get_levenshtein_error_suggestions(key, namespace, threshold, index=index)
+
+    assert hint == expected
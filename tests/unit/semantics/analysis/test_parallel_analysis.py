@@ -0,0 +1,135 @@
+import json
+
+import pytest
+
+from vyper.compiler import compile_code
+from vyper.exceptions import StateAccessViolation, VyperException
+from vyper.semantics.analysis.parallel import can_analyze_in_parallel
+
+pytestmark = pytest.mark.skipif(
+    not can_analyze_in_parallel(), reason="parallel analysis requires fork"
+)
+
+LIB = """
+counter: uint256
+
+@internal
+def bump(x: uint256) -> uint256:
+    self.counter += x
+    return self.counter
+"""
+
+CODE = """
+import lib
+
+initializes: lib
+
+X: immutable(uint256)
+FOO: constant(uint256[3]) = [1, 2, 3]
+
+balances: public(HashMap[address, uint256])
+owner: public(address)
+
+struct S:
+    a: uint256
+    b: DynArray[int128, 3]
+
+@deploy
+def __init__(x: uint256):
+    X = x
+    self.owner = msg.sender
+
+@internal
+@view
+def _balance(a: address) -> uint256:
+    return self.balances[a] + X
+
+@internal
+def _add(a: address, amount: uint256) -> uint256:
+    self.balances[a] += amount + FOO[1]
+    return self._balance(a)
+
+@external
+def add(amount: uint256) -> uint256:
+    s: S = S(a=amount, b=[1, -2])
+    for i: uint256 in range(3):
+        s.a += FOO[i]
+    return self._add(msg.sender, s.a) + lib.bump(amount)
+
+@external
+@view
+def get(a: address) -> uint256:
+    return self._balance(a)
+"""
+
+
+def _compile(code, input_bundle, jobs, monkeypatch):
+    monkeypatch.setattr("vyper.compiler.settings.VYPER_ANALYSIS_JOBS", jobs)
+    output_formats = ["annotated_ast_dict", "bytecode", "abi"]
+    return compile_code(code, input_bundle=input_bundle, output_formats=output_formats)
+
+
+def test_parallel_analysis(make_input_bundle, monkeypatch):
+    input_bundle = make_input_bundle({"lib.vy": LIB})
+
+    expected = _compile(CODE, input_bundle, 1, monkeypatch)
+    out = _compile(CODE, input_bundle, 4, monkeypatch)
+
+    assert out["bytecode"] == expected["bytecode"]
+    assert out["abi"] == expected["abi"]
+    # key order of AST dicts is not deterministic
+    ast, expected_ast = (
+        json.dumps(o["annotated_ast_dict"], sort_keys=True, default=str) for o in (out, expected)
+    )
+    assert ast == expected_ast
+
+
+def test_parallel_analysis_errors(monkeypatch):
+    code = """
+x: uint256
+
+@internal
+@view
+def bar():
+    self.x = 1
+
+@external
+@view
+def foo():
+    self.x = 2
+    self.bar()
+
+@external
+def baz():
+    self.bar()
+    """
+
+    def _errors(jobs):
+        monkeypatch.setattr("vyper.compiler.settings.VYPER_ANALYSIS_JOBS", jobs)
+        with pytest.raises(VyperException) as e:
+            compile_code(code)
+        return e.value
+
+    expected, exc = _errors(1), _errors(4)
+    assert type(exc) is type(expected)
+    assert str(exc) == str(expected)
+
+
+def test_parallel_analysis_single_error(monkeypatch):
+    code = """
+x: uint256
+
+@external
+def foo():
+    pass
+
+@external
+@view
+def bar():
+    self.x = 1
+    """
+    monkeypatch.setattr("vyper.compiler.settings.VYPER_ANALYSIS_JOBS", 2)
+    with pytest.raises(StateAccessViolation) as e:
+        compile_code(code)
+
+    assert e.value.annotations[0].lineno == 11
@@ -9,8 +9,8 @@ from vyper.exceptions import (
     UnknownAttribute,
 )
 from vyper.semantics.analysis.base import VarInfo
-from vyper.semantics.analysis.utils import get_possible_types_from_node
-from vyper.semantics.types import AddressT, BoolT, DArrayT, SArrayT
+from vyper.semantics.analysis.utils import get_common_types, get_possible_types_from_node
+from vyper.semantics.types import AddressT, BoolT, DArrayT, IntegerT, SArrayT
 from vyper.semantics.types.shortcuts import INT128_T
 
 INTEGER_LITERALS = [(42, 31337), (-1, 1), (69, 2**128)]
@@ -219,3 +219,38 @@ def test_tuple_subscript(build_node, namespace):
     types_list = get_possible_types_from_node(node)
 
     assert types_list == [namespace["bar"].typ]
+
+
+def _integer_types_for(value):
+    ret = [t for t in IntegerT.all() if t.ast_bounds[0] <= value <= t.ast_bounds[1]]
+    return sorted(ret, key=lambda t: (t.bits, not t.is_signed), reverse=True)
+
+
+@pytest.mark.parametrize(
+    "value",
+    [0, 1, 127, 128, 255, 256, 2**255 - 1, 2**255, 2**256 - 1, -1, -128, -129, -(2**255)],
+)
+def test_int_literal(build_node, namespace, value):
+    node = build_node(str(value))
+    with namespace.enter_scope():
+        assert get_possible_types_from_node(node) == _integer_types_for(value)
+
+
+@pytest.mark.parametrize("values", [(1, 256, -129), (2**128, 0), (-1, 2**255 - 1), (3,)])
+def test_common_types_int_literals(build_node, namespace, values):
+    nodes = [build_node(str(v)) for v in values]
+    expected = [
+        t for t in _integer_types_for(values[0]) if all(t in _integer_types_for(v) for v in values)
+    ]
+    with namespace.enter_scope():
+        assert get_common_types(*nodes) == expected
+
+
+def test_common_types_mixed(build_node, namespace):
+    nodes = [build_node("1"), build_node("foo")]
+    namespace["foo"] = VarInfo(INT128_T)
+    assert get_common_types(*nodes) == [INT128_T]
+
+    nodes = [build_node("1"), build_node("bar")]
+    namespace["bar"] = VarInfo(AddressT())
+    assert get_common_types(*nodes) == []
@@ -0,0 +1,79 @@
+import json
+import pickle
+
+import pytest
+
+from vyper.utils import LazyJSON, dump_json, iterencode_json
+
+
+class _Writer:
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, chunk):
+        self.chunks.append(chunk)
+
+
+def _tree(depth):
+    # a nested value which is only generated while it is being encoded
+    if depth == 0:
+        return {"leaf": [1, 2.5, None, True, "x"]}
+    return {"depth": depth, "children": [LazyJSON(_tree, depth - 1), LazyJSON(_tree, depth - 1)]}
+
+
+@pytest.mark.parametrize("depth", [0, 1, 5])
+@pytest.mark.parametrize(
+    "kwargs", [{}, {"sort_keys": True}, {"indent": 2}, {"separators": (",", ":")}]
+)
+def test_iterencode_json(depth, kwargs):
+    value = {"b": LazyJSON(_tree, depth), "a": [LazyJSON(str, "y"), {}, []]}
+    expected = json.dumps(LazyJSON(_tree, depth).materialize(), **kwargs)
+
+    assert "".join(iterencode_json(LazyJSON(_tree, depth), **kwargs)) == expected
+    assert "".join(iterencode_json(value, **kwargs)) == json.dumps(_materialized(value), **kwargs)
+
+
+def _materialized(value):
+    return LazyJSON(lambda: value).materialize()
+
+
+def test_iterencode_json_default():
+    value = {"a": LazyJSON(lambda: {"b": object, 1: None}), "c": b"x"}
+
+    with pytest.raises(TypeError):
+        "".join(iterencode_json(value))
+
+    output = "".join(iterencode_json(value, default=repr))
+    assert output == json.dumps({"a": {"b": object, 1: None}, "c": b"x"}, default=repr)
+
+
+def test_lazy_json_is_not_expanded_eagerly():
+    expanded = []
+
+    def fn(i):
+        expanded.append(i)
+        return [i]
+
+    value = [LazyJSON(fn, i) for i in range(3)]
+    chunks = iterencode_json(value)
+    assert expanded == []
+
+    assert "".join(chunks) == "[[0], [1], [2]]"
+    assert expanded == [0, 1, 2]
+
+
+def test_dump_json(monkeypatch):
+    monkeypatch.setattr("vyper.utils._JSON_WRITE_SIZE", 256)
+    f = _Writer()
+    value = [LazyJSON(_tree, 8) for _ in range(4)]
+    dump_json(value, f)
+
+    assert "".join(f.chunks) == json.dumps(_materialized(value))
+    # the output is written in chunks rather than as one string
+    assert len(f.chunks) > 1
+
+
+def test_pickle_lazy_json():
+    value = {"a": LazyJSON(_tree, 2)}
+
+    assert pickle.loads(pickle.dumps(value)) == _materialized(value)
@@ -0,0 +1,433 @@
+"""
+A compact binary encoding of Vyper ASTs, for caching parse results on disk
+and handing them to other processes.
+
+The encoding preserves the node classes, fields, node ids, source offsets
+and the tree structure (`_children`, including nodes which are no longer
+reachable from any field, e.g. the `public(...)` wrapper of a public
+variable declaration). Results of semantic analysis (node metadata, the
+original nodes of folded values, expanded getters) are not encoded, so an
+annotated AST decodes to an unannotated one.
+
+Format
+------
+A header (magic bytes and format version) followed by frames, so that
+encoding and decoding can be done incrementally. Each frame is
+
+    <n_strings: u32> <strings_size: u32> <n_ints: u32>
+    <string lengths: u32 * n_strings> <strings: utf-8>
+    <ints: i32 * n_ints>
+
+and a frame with all three counts zero ends the stream. Strings are
+appended to a string table shared by all frames, and referenced from the
+ints by their index. The ints are a sequence of ops:
+
+    CLASS <name> <n_fields> <field name>...   (define a node class)
+    SOURCE <source code> <source id>          (define a `SourceTable`)
+    NODE <class> <parent> <is child> <lineno> <col_offset> <end_lineno>
+        <end_col_offset> <source> <src start> <src end> <node id>
+        <node source code>                    (create a node)
+    FIELDS <node> <value>...                  (set the fields of a node)
+
+Nodes and tables are referenced by the order in which they are defined.
+A node is defined before its children, and its fields are set after all
+the nodes they reference have been defined. Values (fields, node ids,
+etc.) are tagged, cf. `_Encoder._value`.
+"""
+
+import array
+import decimal
+import io
+import struct
+import sys
+from typing import IO, Any, Optional
+
+from vyper.ast import nodes as vy_ast
+from vyper.ast.metadata import NodeMetadata
+
+MAGIC = b"\x00VYAST"
+FORMAT_VERSION = 1
+
+_HEADER = struct.Struct("<H")
+_FRAME_HEADER = struct.Struct("<III")
+# flush a frame once it holds this many ints
+_FRAME_SIZE = 1 << 16
+
+_INT_MIN = -(2**31)
+_INT_MAX = 2**31 - 1
+
+# ops
+_CLASS = 0
+_SOURCE = 1
+_NODE = 2
+_FIELDS = 3
+
+# value tags
+_NONE = 0
+_INT = 1
+_BOOL = 2
+_STR = 3
+_BYTES = 4
+_DECIMAL = 5
+_BIGINT = 6
+_NODE_REF = 7
+_LIST = 8
+_ELLIPSIS = 9
+
+# attributes which are encoded in the NODE op rather than as fields
+_NODE_ATTRIBUTES = frozenset(vy_ast.NODE_SRC_ATTRIBUTES + ("ast_type", "node_id"))
+
+
+def _class_fields(cls: type) -> tuple[str, ...]:
+    return tuple(sorted(i for i in cls.get_fields() if i not in _NODE_ATTRIBUTES))  # type: ignore
+
+
+def _private_slots(cls: type) -> tuple[str, ...]:
+    # private slots of node subclasses, e.g. `ExprNode._expr_info`
+    base = set(vy_ast.VyperNode.__slots__)
+    slots = [x for i in cls.__mro__ for x in getattr(i, "__slots__", ())]
+    return tuple(i for i in slots if i.startswith("_") and i not in base)
+
+
+def _little_endian(ints: array.array) -> array.array:
+    if sys.byteorder == "big":  # pragma: nocover
+        ints.byteswap()
+    return ints
+
+
+class _Encoder:
+    def __init__(self, fp: IO[bytes]):
+        self._fp = fp
+        self._strings: dict[str, int] = {}
+        self._new_strings: list[str] = []
+        self._classes: dict[type, tuple[int, tuple[str, ...]]] = {}
+        # keyed by id(), the tree keeps the objects alive while encoding
+        self._sources: dict[int, int] = {}
+        self._nodes: dict[int, int] = {}
+        self._ints = array.array("i")
+
+        fp.write(MAGIC + _HEADER.pack(FORMAT_VERSION))
+
+    def encode(self, node: vy_ast.VyperNode) -> None:
+        self._node(node, -1, False)
+        self._flush()
+        self._fp.write(_FRAME_HEADER.pack(0, 0, 0))
+
+    def _flush(self) -> None:
+        strings = self._new_strings
+        lengths = _little_endian(array.array("I", [len(s) for s in strings]))
+        blob = "".join(strings).encode("utf-8", "surrogatepass")
+        ints = _little_endian(self._ints)
+
+        self._fp.write(_FRAME_HEADER.pack(len(strings), len(blob), len(ints)))
+        self._fp.write(lengths.tobytes())
+        self._fp.write(blob)
+        self._fp.write(ints.tobytes())
+
+        self._new_strings = []
+        self._ints = array.array("i")
+
+    def _str(self, value: str) -> int:
+        ret = self._strings.get(value)
+        if ret is None:
+            ret = self._strings[value] = len(self._strings)
+            self._new_strings.append(value)
+        return ret
+
+    def _class(self, cls: type) -> tuple[int, tuple[str, ...]]:
+        ret = self._classes.get(cls)
+        if ret is None:
+            fields = _class_fields(cls)
+            ret = self._classes[cls] = (len(self._classes), fields)
+            self._ints.extend((_CLASS, self._str(cls.__name__), len(fields)))
+            self._ints.extend(self._str(i) for i in fields)
+        return ret
+
+    def _source(self, source: Optional[vy_ast.SourceTable]) -> int:
+        if source is None:
+            return -1
+        ret = self._sources.get(id(source))
+        if ret is None:
+            ret = self._sources[id(source)] = len(self._sources)
+            self._ints.append(_SOURCE)
+            self._value(source.source_code)
+            self._value(source.source_id)
+        return ret
+
+    def _value(self, value: Any) -> None:
+        ints = self._ints
+        typ = type(value)
+        if value is None:
+            ints.extend((_NONE, 0))
+        elif typ is bool:
+            ints.extend((_BOOL, int(value)))
+        elif typ is int:
+            if _INT_MIN <= value <= _INT_MAX:
+                ints.extend((_INT, value))
+            else:
+                ints.extend((_BIGINT, self._str(str(value))))
+        elif typ is str:
+            ints.extend((_STR, self._str(value)))
+        elif typ is bytes:
+            ints.extend((_BYTES, self._str(value.decode("latin-1"))))
+        elif typ is decimal.Decimal:
+            ints.extend((_DECIMAL, self._str(str(value))))
+        elif typ is list:
+            ints.extend((_LIST, len(value)))
+            for item in value:
+                self._value(item)
+        elif isinstance(value, vy_ast.VyperNode):
+            ints.extend((_NODE_REF, self._nodes[id(value)]))
+        elif value is Ellipsis:
+            ints.extend((_ELLIPSIS, 0))
+        else:
+            raise TypeError(f"cannot encode value of type {typ.__name__}: {value!r}")
+
+    def _loc(self, value: Optional[int]) -> int:
+        # source locations are non-negative
+        return -1 if value is None else value
+
+    def _node(self, node: vy_ast.VyperNode, parent: int, is_child: bool) -> int:
+        cls_ix, fields = self._class(type(node))
+        source_ix = self._source(node._source)
+
+        ix = self._nodes[id(node)] = len(self._nodes)
+        loc = self._loc
+        self._ints.extend(
+            (
+                _NODE,
+                cls_ix,
+                parent,
+                is_child,
+                loc(node.lineno),
+                loc(node.col_offset),
+                loc(node.end_lineno),
+                loc(node.end_col_offset),
+                source_ix,
+                loc(node._src_start),
+                loc(node._src_end),
+            )
+        )
+        self._value(node.node_id)
+        self._value(node._node_source_code)
+
+        for child in node._children:
+            if id(child) not in self._nodes:
+                self._node(child, ix, True)
+
+        values = [getattr(node, i, None) for i in fields]
+        # nodes which are not children of any node (e.g. created by
+        # `from_node()`) are defined before they are referenced
+        for value in values:
+            for item in value if isinstance(value, list) else (value,):
+                if isinstance(item, vy_ast.VyperNode) and id(item) not in self._nodes:
+                    self._node(item, ix, False)
+
+        self._ints.extend((_FIELDS, ix))
+        for value in values:
+            self._value(value)
+
+        if len(self._ints) >= _FRAME_SIZE:
+            self._flush()
+
+        return ix
+
+
+class _Decoder:
+    def __init__(self, fp: IO[bytes]):
+        self._fp = fp
+        self._strings: list[str] = []
+        # (class, field names, private slots)
+        self._classes: list[tuple[type[vy_ast.VyperNode], tuple[str, ...], tuple[str, ...]]] = []
+        self._sources: list[vy_ast.SourceTable] = []
+        self._nodes: list[vy_ast.VyperNode] = []
+        # the field names of each node, in encoding order
+        self._node_fields: list[tuple[str, ...]] = []
+
+        header = fp.read(len(MAGIC) + _HEADER.size)
+        if header[: len(MAGIC)] != MAGIC:
+            raise ValueError("not a binary Vyper AST")
+        (version,) = _HEADER.unpack(header[len(MAGIC) :])
+        if version != FORMAT_VERSION:
+            raise ValueError(f"unsupported binary AST format version {version}")
+
+    def decode(self) -> vy_ast.VyperNode:
+        try:
+            while (ints := self._read_frame()) is not None:
+                self._run(ints)
+        except (IndexError, struct.error, UnicodeDecodeError) as e:
+            raise ValueError("corrupted binary AST") from e
+        if len(self._nodes) == 0:
+            raise ValueError("empty binary AST")
+        return self._nodes[0]
+
+    def _read(self, size: int) -> bytes:
+        ret = self._fp.read(size)
+        if len(ret) != size:
+            raise ValueError("truncated binary AST")
+        return ret
+
+    def _read_frame(self) -> Optional[list[int]]:
+        n_strings, strings_size, n_ints = _FRAME_HEADER.unpack(self._read(_FRAME_HEADER.size))
+        if n_strings == strings_size == n_ints == 0:
+            return None
+
+        lengths = array.array("I")
+        lengths.frombytes(self._read(4 * n_strings))
+        blob = self._read(strings_size).decode("utf-8", "surrogatepass")
+        pos = 0
+        for length in _little_endian(lengths):
+            self._strings.append(blob[pos : pos + length])
+            pos += length
+
+        ints = array.array("i")
+        ints.frombytes(self._read(4 * n_ints))
+        return _little_endian(ints).tolist()
+
+    def _value(self, ints: list[int], pos: int) -> tuple[Any, int]:
+        tag, payload = ints[pos], ints[pos + 1]
+        pos += 2
+        if tag == _NODE_REF:
+            return self._nodes[payload], pos
+        if tag == _STR:
+            return self._strings[payload], pos
+        if tag == _INT:
+            return payload, pos
+        if tag == _NONE:
+            return None, pos
+        if tag == _BOOL:
+            return bool(payload), pos
+        if tag == _LIST:
+            ret = []
+            for _ in range(payload):
+                item, pos = self._value(ints, pos)
+                ret.append(item)
+            return ret, pos
+        if tag == _BYTES:
+            return self._strings[payload].encode("latin-1"), pos
+        if tag == _DECIMAL:
+            return decimal.Decimal(self._strings[payload]), pos
+        if tag == _BIGINT:
+            return int(self._strings[payload]), pos
+        if tag == _ELLIPSIS:
+            return Ellipsis, pos
+        raise ValueError(f"invalid value tag {tag}")
+
+    def _class(self, name: str, fields: tuple[str, ...]) -> None:
+        cls = getattr(vy_ast, name, None)
+        if not isinstance(cls, type) or not issubclass(cls, vy_ast.VyperNode):
+            raise ValueError(f"unknown node class {name}")
+        unknown = set(fields) - cls.get_fields()
+        if len(unknown) > 0:
+            raise ValueError(f"unknown fields of {name}: {sorted(unknown)}")
+        self._classes.append((cls, fields, _private_slots(cls)))
+
+    def _run(self, ints: list[int]) -> None:
+        strings = self._strings
+        nodes = self._nodes
+        node_fields = self._node_fields
+        n = len(ints)
+        pos = 0
+        while pos < n:
+            op = ints[pos]
+
+            if op == _NODE:
+                (
+                    cls_ix,
+                    parent_ix,
+                    is_child,
+                    lineno,
+                    col_offset,
+                    end_lineno,
+                    end_col_offset,
+                    source_ix,
+                    src_start,
+                    src_end,
+                ) = ints[pos + 1 : pos + 11]
+                node_id, pos = self._value(ints, pos + 11)
+                node_source_code, pos = self._value(ints, pos)
+
+                cls, fields, private_slots = self._classes[cls_ix]
+                node: Any = cls.__new__(cls)
+                for slot in private_slots:
+                    setattr(node, slot, None)
+                node._children = []
+                node._metadata = NodeMetadata()
+                node._original_node = None
+                node._cache_descendants = None
+                node.ast_type = cls.__name__
+                node.node_id = node_id
+                node.lineno = None if lineno < 0 else lineno
+                node.col_offset = None if col_offset < 0 else col_offset
+                node.end_lineno = None if end_lineno < 0 else end_lineno
+                node.end_col_offset = None if end_col_offset < 0 else end_col_offset
+                node._source = None if source_ix < 0 else self._sources[source_ix]
+                node._src_start = None if src_start < 0 else src_start
+                node._src_end = None if src_end < 0 else src_end
+                node._node_source_code = node_source_code
+
+                # cf. `VyperNode.set_parent`
+                if parent_ix < 0:
+                    node._parent = None
+                    node._depth = 0
+                else:
+                    parent: Any = nodes[parent_ix]
+                    node._parent = parent
+                    node._depth = parent._depth + 1
+                    if is_child:
+                        parent._children.append(node)
+                nodes.append(node)
+                node_fields.append(fields)
+
+            elif op == _FIELDS:
+                ix = ints[pos + 1]
+                pos += 2
+                node = nodes[ix]
+                for field in node_fields[ix]:
+                    value, pos = self._value(ints, pos)
+                    setattr(node, field, value)
+
+            elif op == _CLASS:
+                name, n_fields = strings[ints[pos + 1]], ints[pos + 2]
+                pos += 3
+                fields = tuple(strings[i] for i in ints[pos : pos + n_fields])
+                pos += n_fields
+                self._class(name, fields)
+
+            elif op == _SOURCE:
+                source_code, pos = self._value(ints, pos + 1)
+                source_id, pos = self._value(ints, pos)
+                self._sources.append(vy_ast.SourceTable(source_code, source_id))
+
+            else:
+                raise ValueError(f"invalid op {op}")
+
+
+def dump(node: vy_ast.VyperNode, fp: IO[bytes]) -> None:
+    """
+    Encode a Vyper AST (a node and its descendants) into a binary file.
+    """
+    _Encoder(fp).encode(node)
+
+
+def dumps(node: vy_ast.VyperNode) -> bytes:
+    """
+    Encode a Vyper AST (a node and its descendants) into bytes.
+    """
+    fp = io.BytesIO()
+    dump(node, fp)
+    return fp.getvalue()
+
+
+def load(fp: IO[bytes]) -> vy_ast.VyperNode:
+    """
+    Decode a Vyper AST from a binary file, cf. `dump()`.
+    """
+    return _Decoder(fp).decode()
+
+
+def loads(data: bytes) -> vy_ast.VyperNode:
+    """
+    Decode a Vyper AST from bytes, cf. `dumps()`.
+    """
+    return load(io.BytesIO(data))
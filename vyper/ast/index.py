@@ -0,0 +1,103 @@
+import bisect
+import heapq
+from typing import Optional, Union
+
+# an index of the nodes of a module by node type. after parsing, the tree
+# structure of a module does not change (nodes which are generated during
+# analysis, e.g. getters or folded values, are not added to `_children`),
+# so the index is built once, when a module is first queried, and then
+# answers `get_children()` and `get_descendants()` queries for any node of
+# the module without walking the tree.
+
+
+class ModuleIndex:
+    """
+    Index of the nodes of a module by node type.
+
+    Attributes
+    ----------
+    module_id : int
+        `id()` of the indexed module. A copy of a module (e.g. via
+        `deepcopy`) carries a stale index, which is detected with this.
+    """
+
+    def __init__(self, module):
+        self.module_id = id(module)
+
+        # all nodes of the module, in `_get_descendants()` (preorder) order.
+        # the descendants of a node are the nodes between its position and
+        # the end of its subtree.
+        self._nodes: list = []
+        self._position: dict[int, int] = {}
+        self._end: list[int] = []
+
+        stack: list = [(module, False)]
+        while stack:
+            node, visited = stack.pop()
+            if visited:
+                self._end[self._position[id(node)]] = len(self._nodes)
+                continue
+            self._position[id(node)] = len(self._nodes)
+            self._nodes.append(node)
+            self._end.append(-1)
+            stack.append((node, True))
+            stack.extend((child, False) for child in reversed(node._children))
+
+        # positions of the nodes of each (concrete) type, ascending
+        self._by_type: dict[type, list[int]] = {}
+        for i, node in enumerate(self._nodes):
+            self._by_type.setdefault(type(node), []).append(i)
+
+        self._children_by_type: dict[type, list[int]] = {}
+        for child in module._children:
+            pos = self._position[id(child)]
+            self._children_by_type.setdefault(type(child), []).append(pos)
+
+        self._matching_types: dict[Union[type, tuple], list[type]] = {}
+
+    def _types(self, node_type: Union[type, tuple]) -> list[type]:
+        # the types in the index which are instances of `node_type`
+        ret = self._matching_types.get(node_type)
+        if ret is None:
+            ret = [t for t in self._by_type if issubclass(t, node_type)]
+            self._matching_types[node_type] = ret
+        return ret
+
+    def _merge(self, positions: list[list[int]]) -> list:
+        if len(positions) == 1:
+            return [self._nodes[i] for i in positions[0]]
+        return [self._nodes[i] for i in heapq.merge(*positions)]
+
+    def children(self, node_type: Union[type, tuple]) -> list:
+        """
+        Return the children of the module which are instances of `node_type`.
+        """
+        positions = [
+            self._children_by_type[t] for t in self._types(node_type) if t in self._children_by_type
+        ]
+        return self._merge(positions)
+
+    def descendants(
+        self, node, node_type: Union[type, tuple], include_self: bool
+    ) -> Optional[list]:
+        """
+        Return the descendants of `node` which are instances of `node_type`,
+        in the same order as `VyperNode.get_descendants()`. Returns `None`
+        if `node` is not part of the indexed module.
+        """
+        start = self._position.get(id(node))
+        if start is None or self._nodes[start] is not node:
+            return None
+        stop = self._end[start]
+        if not include_self:
+            start += 1
+
+        positions = []
+        for t in self._types(node_type):
+            p = self._by_type[t]
+            lo = bisect.bisect_left(p, start)
+            hi = bisect.bisect_left(p, stop, lo)
+            if lo < hi:
+                positions.append(p[lo:hi])
+
+        return self._merge(positions)
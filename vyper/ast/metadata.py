@@ -9,7 +9,9 @@ from vyper.exceptions import VyperException
 # during for loop iterator variable type inference), we can roll back
 # any state updates due to type checking.
 # this is implemented as a stack of changesets, because we need to
-# handle nested rollbacks in the case of nested for loops
+# handle nested rollbacks in the case of nested for loops.
+# writes are only journaled while a changeset is open. outside of that
+# (i.e. almost always), a metadata write is a plain dict store.
 class _NodeMetadataJournal:
     _NOT_FOUND = object()
 
@@ -25,6 +27,8 @@ class _NodeMetadataJournal:
 
     @contextlib.contextmanager
     def enter(self):
+        if len(self._node_updates) == 0:
+            NodeMetadata._start_journaling()
         self._node_updates.append({})
         try:
             yield
@@ -34,6 +38,9 @@ class _NodeMetadataJournal:
             raise e from e
         else:
             self._commit_inner()
+        finally:
+            if len(self._node_updates) == 0:
+                NodeMetadata._stop_journaling()
 
     def _rollback_inner(self):
         for (_, k), (metadata, prev) in self._node_updates[-1].items():
@@ -68,13 +75,22 @@ class NodeMetadata(dict):
 
     _JOURNAL: _NodeMetadataJournal = _NodeMetadataJournal()
 
-    def __setitem__(self, k, v):
-        # if we are in a context where we need to journal, add
-        # this to the changeset.
-        if len(self._JOURNAL._node_updates) != 0:
-            self._JOURNAL.register_update(self, k)
+    def _journaled_setitem(self, k, v):
+        # we are in a context where we need to journal, add this to
+        # the changeset.
+        self._JOURNAL.register_update(self, k)
+        dict.__setitem__(self, k, v)
+
+    # note: `__setitem__` is only overridden while journaling, so that
+    # the rest of the time stores go straight to `dict.__setitem__`
+    # (without a python-level call).
+    @classmethod
+    def _start_journaling(cls):
+        cls.__setitem__ = cls._journaled_setitem  # type: ignore[method-assign]
 
-        super().__setitem__(k, v)
+    @classmethod
+    def _stop_journaling(cls):
+        del cls.__setitem__
 
     @classmethod
     @contextlib.contextmanager
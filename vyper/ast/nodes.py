@@ -9,6 +9,7 @@ import pickle
 import sys
 from typing import Any, Optional, Union
 
+from vyper.ast.index import ModuleIndex
 from vyper.ast.metadata import NodeMetadata
 from vyper.compiler.settings import VYPER_ERROR_CONTEXT_LINES, VYPER_ERROR_LINE_NUMBERS
 from vyper.exceptions import (
@@ -26,6 +27,7 @@ from vyper.exceptions import (
 )
 from vyper.utils import (
     MAX_DECIMAL_PLACES,
+    LazyJSON,
     SizeLimits,
     annotate_source_code,
     evm_div,
@@ -53,10 +55,27 @@ NODE_SRC_ATTRIBUTES = (
     "node_source_code",
     "src",
 )
+# `full_source_code`, `node_source_code` and `src` are not stored on the node,
+# they are derived from the module's `SourceTable` and the node's offsets
+# into it (cf. `VyperNode.src`).
+NODE_LINE_ATTRIBUTES = ("col_offset", "end_col_offset", "end_lineno", "lineno")
+NODE_OFFSET_ATTRIBUTES = ("_source", "_src_start", "_src_end", "_node_source_code")
 
 DICT_AST_SKIPLIST = ("full_source_code", "node_source_code")
 
 
+class SourceTable:
+    """
+    The source code and source id of a module, shared by all of its nodes.
+    """
+
+    __slots__ = ("source_code", "source_id")
+
+    def __init__(self, source_code: Optional[str], source_id: Optional[int]):
+        self.source_code = source_code
+        self.source_id = source_id
+
+
 def get_node(
     ast_struct: Union[dict, python_ast.AST], parent: Optional["VyperNode"] = None
 ) -> "VyperNode":
@@ -156,22 +175,27 @@ def _to_node(obj, parent):
     return obj
 
 
-def _to_dict(value):
+def _to_dict(value, include_analysis, lazy):
     # if value is a Vyper node, convert to a dict
     if isinstance(value, VyperNode):
-        return value.to_dict()
+        if lazy:
+            return LazyJSON(value.to_dict, include_analysis, True)
+        return value.to_dict(include_analysis)
     return value
 
 
 def _node_filter(node, filters):
-    # recursive equality check for VyperNode.get_children filters
-    if not filters:
-        return True
-    for key, value in filters.items():
+    # recursive equality check for VyperNode.get_children filters.
+    # `filters` is a list of (attribute path, expected value), where the
+    # path is the dotted attribute name split into its parts.
+    for path, value in filters:
+        obj = node
+        for key in path:
+            obj = getattr(obj, key, None)
         if isinstance(value, set):
-            if node.get(key) not in value:
+            if obj not in value:
                 return False
-        elif node.get(key) != value:
+        elif obj != value:
             return False
     return True
 
@@ -180,8 +204,10 @@ def _apply_filters(node_iter, node_type, filters, reverse):
     ret = node_iter
     if node_type is not None:
         ret = (i for i in ret if isinstance(i, node_type))
-    if filters is not None:
-        ret = (i for i in ret if _node_filter(i, filters))
+    if filters:
+        # split the dotted attribute names once, rather than for each node
+        paths = [(tuple(key.split(".")), value) for key, value in filters.items()]
+        ret = (i for i in ret if _node_filter(i, paths))
 
     ret = list(ret)
     if reverse:
@@ -223,7 +249,7 @@ class VyperNode:
         across different Python versions.
     """
 
-    __slots__ = NODE_BASE_ATTRIBUTES + NODE_SRC_ATTRIBUTES
+    __slots__ = NODE_BASE_ATTRIBUTES + NODE_LINE_ATTRIBUTES + NODE_OFFSET_ATTRIBUTES
 
     _public_slots = [i for i in __slots__ if not i.startswith("_")]
     _only_empty_fields: tuple = ()
@@ -250,13 +276,36 @@ class VyperNode:
         self._original_node = None
         self._cache_descendants = None
 
-        for field_name in NODE_SRC_ATTRIBUTES:
+        for field_name in NODE_LINE_ATTRIBUTES:
             # when a source offset is not available, use the parent's source offset
             value = kwargs.pop(field_name, None)
             if value is None:
                 value = getattr(parent, field_name, None)
             setattr(self, field_name, value)
 
+        source = kwargs.pop("_source", None)
+        if source is not None:
+            # fast path: the caller already has the offsets into the source
+            # table (cf. `ASTBuilder`, `from_node`). the string forms are
+            # ignored (python operator singletons may carry stale ones).
+            kwargs.pop("full_source_code", None)
+            kwargs.pop("src", None)
+            kwargs.pop("node_source_code", None)
+            self._source = source
+            self._src_start = kwargs.pop("_src_start")
+            self._src_end = kwargs.pop("_src_end")
+            self._node_source_code = kwargs.pop("_node_source_code", None)
+        else:
+            self._source = None
+            self._src_start = None
+            self._src_end = None
+            self._node_source_code = None
+            for field_name in ("full_source_code", "src", "node_source_code"):
+                value = kwargs.pop(field_name, None)
+                if value is None:
+                    value = getattr(parent, field_name, None)
+                setattr(self, field_name, value)
+
         for field_name, value in kwargs.items():
             if field_name in self._translated_fields:
                 field_name = self._translated_fields[field_name]
@@ -279,6 +328,55 @@ class VyperNode:
         if parent is not None:
             parent._children.append(self)
 
+    @property
+    def full_source_code(self) -> Optional[str]:
+        if self._source is None:
+            return None
+        return self._source.source_code
+
+    @full_source_code.setter
+    def full_source_code(self, value: Optional[str]) -> None:
+        source_id = None if self._source is None else self._source.source_id
+        self._source = SourceTable(value, source_id)
+
+    @property
+    def src(self) -> Optional[str]:
+        """
+        The source offset of the node, as `"<start>:<length>:<source id>"`.
+        """
+        if self._src_start is None:
+            return None
+        length = self._src_end - self._src_start
+        return f"{self._src_start}:{length}:{self._source.source_id}"
+
+    @src.setter
+    def src(self, value: Optional[str]) -> None:
+        if value is None:
+            self._src_start = self._src_end = None
+            return
+        start, length, source_id = (int(i) for i in value.split(":"))
+        self._src_start = start
+        self._src_end = start + length
+        if self._source is None or self._source.source_id != source_id:
+            source_code = None if self._source is None else self._source.source_code
+            self._source = SourceTable(source_code, source_id)
+
+    @property
+    def node_source_code(self) -> Optional[str]:
+        if self._node_source_code is not None:
+            return self._node_source_code
+        if self._src_start is None or self._source.source_code is None:
+            return None
+        return self._source.source_code[self._src_start : self._src_end]
+
+    @node_source_code.setter
+    def node_source_code(self, value: Optional[str]) -> None:
+        # only store the source code if it is not the slice of the full
+        # source code at `src` (e.g. folded negative literals)
+        self._node_source_code = None
+        if value != self.node_source_code:
+            self._node_source_code = value
+
     @property
     def parent(self):
         return self._parent
@@ -311,6 +409,8 @@ class VyperNode:
         Vyper node instance
         """
         ast_struct = {i: getattr(node, i) for i in VyperNode._public_slots}
+        if node._source is not None:
+            ast_struct.update({i: getattr(node, i) for i in NODE_OFFSET_ATTRIBUTES})
         ast_struct.update(ast_type=cls.__name__, **kwargs)
         return cls(**ast_struct)
 
@@ -324,7 +424,7 @@ class VyperNode:
         and are not included within this sequence.
         """
         slot_fields = [x for i in cls.__mro__ for x in getattr(i, "__slots__", [])]
-        return set(i for i in slot_fields if not i.startswith("_"))
+        return set(i for i in slot_fields if not i.startswith("_")) | set(NODE_SRC_ATTRIBUTES)
 
     def __deepcopy__(self, memo):
         # default implementation of deepcopy is a hotspot
@@ -434,17 +534,30 @@ class VyperNode:
         """
         pass
 
-    def to_dict(self) -> dict:
+    def to_dict(self, include_analysis: bool = True, lazy: bool = False) -> dict:
         """
         Return the node as a dict. Child nodes and their descendants are also converted.
+
+        Arguments
+        ---------
+        include_analysis : bool, optional
+            If False, results of semantic analysis (types, variable reads and
+            writes) are omitted, so an analyzed AST gives the same output as
+            a freshly parsed one.
+        lazy : bool, optional
+            If True, child nodes are returned as `LazyJSON` values, which are
+            only converted when the output is encoded.
         """
         ast_dict = {}
         for key in [i for i in self.get_fields() if i not in DICT_AST_SKIPLIST]:
             value = getattr(self, key, None)
             if isinstance(value, list):
-                ast_dict[key] = [_to_dict(i) for i in value]
+                ast_dict[key] = [_to_dict(i, include_analysis, lazy) for i in value]
             else:
-                ast_dict[key] = _to_dict(value)
+                ast_dict[key] = _to_dict(value, include_analysis, lazy)
+
+        if not include_analysis:
+            return ast_dict
 
         # TODO: add full analysis result, e.g. expr_info
         if "type" in self._metadata:
@@ -514,6 +627,9 @@ class VyperNode:
         list
             Child nodes matching the filter conditions.
         """
+        if node_type is not None and isinstance(self, Module):
+            children = self.get_index().children(node_type)
+            return _apply_filters(iter(children), None, filters, reverse)
         return _apply_filters(iter(self._children), node_type, filters, reverse)
 
     def get_descendants(
@@ -560,9 +676,25 @@ class VyperNode:
         list
             Descendant nodes matching the filter conditions.
         """
+        if node_type is not None:
+            index = self._get_module_index()
+            if index is not None:
+                descendants = index.descendants(self, node_type, include_self)
+                if descendants is not None:
+                    return _apply_filters(iter(descendants), None, filters, reverse)
+
         ret = self._get_descendants(include_self)
         return _apply_filters(ret, node_type, filters, reverse)
 
+    def _get_module_index(self) -> Optional["ModuleIndex"]:
+        # the index of the module which contains this node, if any
+        root = self
+        while root._parent is not None:
+            root = root._parent
+        if isinstance(root, Module):
+            return root.get_index()
+        return None
+
     def _get_descendants(self, include_self=True):
         # get descendants in topsort order
         if self._cache_descendants is None:
@@ -617,10 +749,22 @@ class TopLevel(VyperNode):
 
 class Module(TopLevel):
     # metadata
-    __slots__ = ("path", "resolved_path", "source_id", "is_interface")
+    __slots__ = ("path", "resolved_path", "source_id", "is_interface", "_index")
 
-    def to_dict(self):
-        return dict(source_sha256sum=self.source_sha256sum, **super().to_dict())
+    def get_index(self) -> ModuleIndex:
+        """
+        Return the index of the nodes of this module by node type. The
+        index is built on first use.
+        """
+        index = getattr(self, "_index", None)
+        if index is None or index.module_id != id(self):
+            index = ModuleIndex(self)
+            self._index = index
+        return index
+
+    def to_dict(self, include_analysis=True, lazy=False):
+        ast_dict = super().to_dict(include_analysis, lazy)
+        return dict(source_sha256sum=self.source_sha256sum, **ast_dict)
 
     @property
     def source_sha256sum(self):
@@ -735,9 +879,9 @@ class ExprNode(VyperNode):
         super().__init__(*args, **kwargs)
         self._expr_info = None
 
-    def to_dict(self):
-        ret = super().to_dict()
-        if self._expr_info is None:
+    def to_dict(self, include_analysis=True, lazy=False):
+        ret = super().to_dict(include_analysis, lazy)
+        if not include_analysis or self._expr_info is None:
             return ret
 
         reads = [s.to_dict() for s in self._expr_info._reads]
@@ -803,8 +947,8 @@ class Decimal(Num):
         if not isinstance(self.value, decimal.Decimal):
             self.value = decimal.Decimal(self.value)
 
-    def to_dict(self):
-        ast_dict = super().to_dict()
+    def to_dict(self, include_analysis=True, lazy=False):
+        ast_dict = super().to_dict(include_analysis, lazy)
         ast_dict["value"] = self.node_source_code
         return ast_dict
 
@@ -885,8 +1029,8 @@ class Bytes(Constant):
             length = len(self.value) // 2 - 1
             self.value = int(self.value, 16).to_bytes(length, "big")
 
-    def to_dict(self):
-        ast_dict = super().to_dict()
+    def to_dict(self, include_analysis=True, lazy=False):
+        ast_dict = super().to_dict(include_analysis, lazy)
         ast_dict["value"] = f"0x{self.value.hex()}"
         return ast_dict
 
@@ -899,8 +1043,8 @@ class HexBytes(Constant):
         if isinstance(self.value, str):
             self.value = bytes.fromhex(self.value)
 
-    def to_dict(self):
-        ast_dict = super().to_dict()
+    def to_dict(self, include_analysis=True, lazy=False):
+        ast_dict = super().to_dict(include_analysis, lazy)
         ast_dict["value"] = f"0x{self.value.hex()}"
         return ast_dict
 
@@ -938,8 +1082,8 @@ class NameConstant(Constant):
 class Ellipsis(Constant):
     __slots__ = ()
 
-    def to_dict(self):
-        ast_dict = super().to_dict()
+    def to_dict(self, include_analysis=True, lazy=False):
+        ast_dict = super().to_dict(include_analysis, lazy)
         # python ast ellipsis() is not json serializable; use a string
         ast_dict["value"] = self.node_source_code
         return ast_dict
@@ -1452,8 +1596,10 @@ class Pass(Stmt):
 class _ImportStmt(Stmt):
     __slots__ = ("name", "alias")
 
-    def to_dict(self):
-        ret = super().to_dict()
+    def to_dict(self, include_analysis=True, lazy=False):
+        ret = super().to_dict(include_analysis, lazy)
+        if not include_analysis:
+            return ret
         if (import_info := self._metadata.get("import_info")) is not None:
             ret["import_info"] = import_info.to_dict()
 
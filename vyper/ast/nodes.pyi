@@ -1,6 +1,7 @@
 import ast as python_ast
 from typing import Any, Optional, Sequence, Type, Union
 
+from .index import ModuleIndex
 from .natspec import parse_natspec as parse_natspec
 from .parse import parse_to_ast as parse_to_ast
 from .parse import parse_to_ast_with_settings as parse_to_ast_with_settings
@@ -8,15 +9,25 @@ from .utils import ast_to_dict as ast_to_dict
 
 NODE_BASE_ATTRIBUTES: Any
 NODE_SRC_ATTRIBUTES: Any
+NODE_LINE_ATTRIBUTES: Any
+NODE_OFFSET_ATTRIBUTES: Any
 DICT_AST_SKIPLIST: Any
 
+class SourceTable:
+    source_code: Optional[str] = ...
+    source_id: Optional[int] = ...
+    def __init__(self, source_code: Optional[str], source_id: Optional[int]) -> None: ...
+
 def get_node(
     ast_struct: Union[dict, python_ast.AST], parent: Optional[VyperNode] = ...
 ) -> VyperNode: ...
 
 class VyperNode:
+    __slots__: tuple = ...
+    node_id: Optional[int] = ...
     full_source_code: str = ...
     node_source_code: str = ...
+    src: str = ...
     lineno: int = ...
     col_offset: int = ...
     end_lineno: int = ...
@@ -24,6 +35,10 @@ class VyperNode:
     _metadata: dict = ...
     _original_node: Optional[VyperNode] = ...
     _children: list[VyperNode] = ...
+    _source: Optional[SourceTable] = ...
+    _src_start: Optional[int] = ...
+    _src_end: Optional[int] = ...
+    _node_source_code: Optional[str] = ...
     def __init__(self, parent: Optional[VyperNode] = ..., **kwargs: Any) -> None: ...
     def __hash__(self) -> Any: ...
     def __eq__(self, other: Any) -> Any: ...
@@ -43,7 +58,7 @@ class VyperNode:
     def _set_folded_value(self, node: ExprNode) -> None: ...
     @classmethod
     def from_node(cls, node: VyperNode, **kwargs: Any) -> Any: ...
-    def to_dict(self) -> dict: ...
+    def to_dict(self, include_analysis: bool = ..., lazy: bool = ...) -> dict: ...
     def get_children(
         self,
         node_type: Union[Type[VyperNode], Sequence[Type[VyperNode]], None] = ...,
@@ -73,6 +88,7 @@ class Module(TopLevel):
     source_id: int = ...
     is_interface: bool = ...
     def namespace(self) -> Any: ...  # context manager
+    def get_index(self) -> ModuleIndex: ...
 
 class FunctionDef(TopLevel):
     args: arguments = ...
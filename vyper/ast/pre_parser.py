@@ -3,6 +3,7 @@ import io
 import re
 from collections import defaultdict
 from tokenize import COMMENT, NAME, OP, STRING, TokenError, TokenInfo, tokenize, untokenize
+from typing import Optional
 
 from packaging.specifiers import InvalidSpecifier, SpecifierSet
 
@@ -200,6 +201,36 @@ CUSTOM_STATEMENT_TYPES = {"log": "Log"}
 CUSTOM_EXPRESSION_TYPES = {"extcall": "ExtCall", "staticcall": "StaticCall"}
 
 
+def _remove_token(token: TokenInfo) -> tuple[tuple[int, int], tuple[int, int], str]:
+    # blank out the token, keeping the positions of the following tokens.
+    # line breaks (e.g. in a multi-line for loop annotation) are escaped so
+    # that they do not end the statement.
+    replacement = "\\\n".join(" " * len(s) for s in token.string.split("\n"))
+    return token.start, token.end, replacement
+
+
+def _apply_edits(code: str, edits: list[tuple[tuple[int, int], tuple[int, int], str]]) -> str:
+    """
+    Apply `edits` (sorted, non-overlapping replacements between positions
+    reported by the tokenizer) to `code`.
+    """
+    # offsets of the lines as split by the tokenizer (1-indexed)
+    line_offsets = [0, 0]
+    for line in code.split("\n"):
+        line_offsets.append(line_offsets[-1] + len(line) + 1)
+
+    ret = []
+    ofst = 0
+    for start, end, replacement in edits:
+        start_ofst = line_offsets[start[0]] + start[1]
+        ret.append(code[ofst:start_ofst])
+        ret.append(replacement)
+        ofst = line_offsets[end[0]] + end[1]
+    ret.append(code[ofst:])
+
+    return "".join(ret)
+
+
 class PreParser:
     # Compilation settings based on the directives in the source code
     settings: Settings
@@ -253,11 +284,17 @@ class PreParser:
 
         _col_adjustments: dict[int, int] = defaultdict(lambda: 0)
 
+        # edits which turn the vyper source into python source (translated
+        # keywords, removed tokens), as (start, end, replacement)
+        edits: list[tuple[tuple[int, int], tuple[int, int], str]] = []
+
         code_bytes = code.encode("utf-8")
         token_list = list(tokenize(io.BytesIO(code_bytes).readline))
 
+        prev_token: Optional[TokenInfo] = None
         for token in token_list:
             toks = [token]
+            edit = None
 
             typ = token.type
             string = token.string
@@ -315,12 +352,25 @@ class PreParser:
                     # (recommend comparing the result of parse with the
                     # source code side by side to visualize the whitespace)
                     toks = [TokenInfo(NAME, new_keyword, start, end, line)]
+                    edit = (start, end, new_keyword)
 
             if (typ, string) == (OP, ";"):
                 raise SyntaxException("Semi-colon statements not allowed", code, start[0], start[1])
 
-            if not for_parser.consume(token) and not hex_string_parser.consume(token, result):
+            n_hex_strings = len(hex_string_parser.locations)
+            if for_parser.consume(token):
+                edits.append(_remove_token(token))
+            elif hex_string_parser.consume(token, result):
+                if len(hex_string_parser.locations) > n_hex_strings:
+                    # the `x` prefix of a hex string was removed
+                    assert prev_token is not None
+                    edits.append(_remove_token(prev_token))
+            else:
                 result.extend(toks)
+                if edit is not None:
+                    edits.append(edit)
+
+            prev_token = token
 
         for_loop_annotations = {}
         for k, v in for_parser.annotations.items():
@@ -331,4 +381,13 @@ class PreParser:
         self.keyword_translations = keyword_translations
         self.for_loop_annotations = for_loop_annotations
         self.hex_string_locations = hex_string_parser.locations
-        self.reformatted_code = untokenize(result).decode("utf-8")
+
+        if token_list[0].string == "utf-8":
+            # apply the edits to the source rather than untokenizing the
+            # tokens, which is slower but gives the same python AST since
+            # all the remaining tokens keep their positions.
+            self.reformatted_code = _apply_edits(code, edits)
+        else:  # pragma: nocover
+            # positions are relative to the source decoded with the encoding
+            # declared in the source
+            self.reformatted_code = untokenize(result).decode("utf-8")
@@ -2,17 +2,24 @@ from typing import Dict, List, Union
 
 from vyper.ast import nodes as vy_ast
 from vyper.exceptions import CompilerPanic
+from vyper.utils import LazyJSON
 
 
-def ast_to_dict(ast_struct: Union[vy_ast.VyperNode, List]) -> Union[Dict, List]:
+def ast_to_dict(
+    ast_struct: Union[vy_ast.VyperNode, List], include_analysis: bool = True, lazy: bool = False
+) -> Union[Dict, List, LazyJSON]:
     """
     Converts a Vyper AST node, or list of nodes, into a dictionary suitable for
-    output to the user.
+    output to the user. If `include_analysis` is False, the results of semantic
+    analysis are left out. If `lazy` is True, nodes are returned as `LazyJSON`
+    values, which are converted while the output is being encoded.
     """
     if isinstance(ast_struct, vy_ast.VyperNode):
-        return ast_struct.to_dict()
+        if lazy:
+            return LazyJSON(ast_struct.to_dict, include_analysis, True)
+        return ast_struct.to_dict(include_analysis)
     elif isinstance(ast_struct, list):
-        return [i.to_dict() for i in ast_struct]
+        return [ast_to_dict(i, include_analysis, lazy) for i in ast_struct]
     else:
         raise CompilerPanic(f'Unknown Vyper AST node provided: "{type(ast_struct)}".')
 
@@ -5,19 +5,28 @@ import inspect
 import json
 import os
 import sys
+import tracemalloc
+import warnings
 from pathlib import Path
 from typing import Any, Optional
 
 import vyper
 import vyper.codegen.ir_node as ir_node
 import vyper.evm.opcodes as evm
-from vyper.cli import vyper_json
-from vyper.cli.compile_archive import NotZipInput, compile_from_zip
-from vyper.compiler.input_bundle import FileInput, FilesystemInputBundle
+from vyper.cli import vyper_json, vyper_server
+from vyper.cli.compile_archive import NotZipInput, compile_from_zip, compiler_data_from_zip
+from vyper.cli.watch import Watcher
+from vyper.compiler import resolves_imports
+from vyper.compiler.cache import VYPER_CACHE_DIR, CompilationCache
+from vyper.compiler.input_bundle import FileInput, FilesystemInputBundle, PathLike
+from vyper.compiler.parallel import imap_ordered, picklable_exception
+from vyper.compiler.phases import CompilerData
+from vyper.compiler.session import CompilationSession
 from vyper.compiler.settings import VYPER_TRACEBACK_LIMIT, OptimizationLevel, Settings
-from vyper.typing import ContractPath, OutputFormats
-from vyper.utils import uniq
-from vyper.warnings import warnings_filter
+from vyper.semantics.analysis.imports import ModuleCache
+from vyper.typing import ContractPath, OutputFormats, StorageLayout
+from vyper.utils import LazyJSON, dump_json, uniq
+from vyper.warnings import set_warnings_filter, warnings_filter
 
 format_options_help = """Format to print, one or more of (comma-separated):
 bytecode (default) - Deployable bytecode
@@ -50,6 +59,7 @@ asm                - Output the EVM assembly of the deployable bytecode
 integrity          - Output the integrity hash of the source code
 archive            - Output the build as an archive file
 solc_json          - Output the build in solc json format
+phase_stats        - Time and memory spent in each compiler phase, in JSON format
 """
 
 combined_json_outputs = [
@@ -73,7 +83,8 @@ def _parse_cli_args():
 def _cli_helper(f, output_formats, compiled):
     if output_formats == ("combined_json",):
         compiled = {str(path): v for (path, v) in compiled.items()}
-        print(json.dumps(compiled), file=f)
+        dump_json(compiled, f)
+        print(file=f)
         return
 
     if output_formats == ("archive",):
@@ -92,8 +103,9 @@ def _cli_helper(f, output_formats, compiled):
 
     for contract_data in compiled.values():
         for data in contract_data.values():
-            if isinstance(data, (list, dict)):
-                print(json.dumps(data), file=f)
+            if isinstance(data, (list, dict, LazyJSON)):
+                dump_json(data, f)
+                print(file=f)
             else:
                 print(data, file=f)
 
@@ -104,6 +116,11 @@ def _parse_args(argv):
         vyper_json._parse_args(argv)
         return
 
+    if "--server" in argv:
+        argv.remove("--server")
+        vyper_server._parse_args(argv)
+        return
+
     parser = argparse.ArgumentParser(
         description="Pythonic Smart Contract Language for the EVM",
         formatter_class=argparse.RawTextHelpFormatter,
@@ -162,6 +179,11 @@ def _parse_args(argv):
         help="Switch to standard JSON mode. Use `--standard-json -h` for available options.",
         action="store_true",
     )
+    parser.add_argument(
+        "--server",
+        help="Run as a long-running compiler server. Use `--server -h` for available options.",
+        action="store_true",
+    )
     parser.add_argument(
         "--hex-ir", help="Represent integers as hex values in the IR", action="store_true"
     )
@@ -189,6 +211,33 @@ def _parse_args(argv):
     parser.add_argument(
         "-W", help="Control warnings", dest="warnings_control", choices=["error", "none"]
     )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        help="Number of contracts to compile in parallel (0 = one per CPU, defaults to 1)",
+        type=int,
+        default=1,
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help="Cache compiler outputs in this directory (defaults to $VYPER_CACHE_DIR, if set)",
+        dest="cache_dir",
+    )
+    parser.add_argument(
+        "--profile-phases",
+        help="Write the time and peak memory spent in each compiler phase as JSON\n"
+        "to this file (defaults to stderr). Disables the compilation cache.",
+        nargs="?",
+        const="-",
+        metavar="FILE",
+        dest="profile_phases",
+    )
+    parser.add_argument(
+        "--watch",
+        help="Keep running, and recompile whenever the input files or their\n"
+        "imports change. Only affected contracts are recompiled.",
+        action="store_true",
+    )
 
     args = parser.parse_args(argv)
 
@@ -243,24 +292,78 @@ def _parse_args(argv):
 
     include_sys_path = not args.disable_sys_path
 
-    compiled = compile_files(
-        args.input_files,
-        output_formats,
-        args.paths,
-        include_sys_path,
-        args.show_gas_estimates,
-        settings,
-        args.storage_layout,
-        args.no_bytecode_metadata,
-        args.warnings_control,
-    )
+    cache = None
+    cache_dir = args.cache_dir or VYPER_CACHE_DIR
+    if cache_dir:
+        cache = CompilationCache(cache_dir)
+
+    if args.watch:
+        if args.profile_phases is not None:
+            raise ValueError("Cannot use `--watch` and `--profile-phases` at the same time!")
+        # the watcher keeps its compilations in an in-memory session, which
+        # would be bypassed by an on-disk cache or by worker processes
+        if cache is not None:
+            raise ValueError(
+                "Cannot use `--watch` and `--cache-dir` (or $VYPER_CACHE_DIR) at the same time!"
+            )
+        if args.jobs != 1:
+            raise ValueError("Cannot use `--watch` and `--jobs` at the same time!")
+        compile_fn = functools.partial(
+            compile_files,
+            output_formats=output_formats,
+            paths=args.paths,
+            include_sys_path=include_sys_path,
+            show_gas_estimates=args.show_gas_estimates,
+            settings=settings,
+            no_bytecode_metadata=args.no_bytecode_metadata,
+            warnings_control=args.warnings_control,
+        )
+        watcher = Watcher(compile_fn, args.input_files, args.storage_layout)
+        watcher.run(functools.partial(_write_output, args.output_path, output_formats))
+        return
+
+    profile_phases = args.profile_phases is not None
+    start_tracing = profile_phases and not tracemalloc.is_tracing()
+    if start_tracing:
+        # peak memory is only measured while tracemalloc is tracing
+        tracemalloc.start()
+
+    try:
+        compiled = compile_files(
+            args.input_files,
+            output_formats,
+            args.paths,
+            include_sys_path,
+            args.show_gas_estimates,
+            settings,
+            args.storage_layout,
+            args.no_bytecode_metadata,
+            args.warnings_control,
+            cache,
+            args.jobs,
+            profile_phases,
+            lazy_json=True,
+        )
+    finally:
+        if start_tracing:
+            tracemalloc.stop()
+
+    if profile_phases:
+        _write_phase_stats(args.profile_phases, output_formats, compiled)
 
+    if args.verbose and cache is not None:
+        print(f"cache stats: `{cache.stats()}`", file=sys.stderr)
+
+    _write_output(args.output_path, output_formats, compiled)
+
+
+def _write_output(output_path, output_formats, compiled):
     mode = "w"
     if output_formats == ("archive",):
         mode = "wb"
 
-    if args.output_path:
-        with open(args.output_path, mode) as f:
+    if output_path:
+        with open(output_path, mode) as f:
             _cli_helper(f, output_formats, compiled)
     else:
         # https://stackoverflow.com/a/54073813
@@ -268,6 +371,24 @@ def _parse_args(argv):
             _cli_helper(f, output_formats, compiled)
 
 
+def _write_phase_stats(profile_path, output_formats, compiled):
+    phase_stats = {}
+    for path, contract_data in compiled.items():
+        if not isinstance(contract_data, dict):
+            continue  # e.g. "version"
+        if "phase_stats" in output_formats:
+            phase_stats[str(path)] = contract_data["phase_stats"]
+        else:
+            phase_stats[str(path)] = contract_data.pop("phase_stats")
+
+    out = json.dumps(phase_stats, indent=2, sort_keys=True)
+    if profile_path == "-":
+        print(out, file=sys.stderr)
+    else:
+        with open(profile_path, "w") as f:
+            print(out, file=f)
+
+
 def exc_handler(contract_path: ContractPath, exception: Exception) -> None:
     print(f"Error compiling: {contract_path}")
     raise exception
@@ -321,6 +442,11 @@ def compile_files(
     storage_layout_paths: list[str] = None,
     no_bytecode_metadata: bool = False,
     warnings_control: Optional[str] = None,
+    cache: Optional[CompilationCache | CompilationSession] = None,
+    jobs: int = 1,
+    profile_phases: bool = False,
+    module_cache: Optional[ModuleCache] = None,
+    lazy_json: bool = False,
 ) -> dict:
     search_paths = get_search_paths(paths, include_sys_path)
     input_bundle = FilesystemInputBundle(search_paths)
@@ -346,17 +472,47 @@ def compile_files(
     }
     final_formats = [translate_map.get(i, i) for i in output_formats]
 
+    if profile_phases and "phase_stats" not in final_formats:
+        final_formats.append("phase_stats")
+
     if storage_layout_paths:
         if len(storage_layout_paths) != len(input_files):
             raise ValueError(
                 f"provided {len(storage_layout_paths)} storage "
                 f"layouts, but {len(input_files)} source files"
             )
+        # consumed below, don't modify the caller's list
+        storage_layout_paths = list(storage_layout_paths)
 
     ret: dict[Any, Any] = {}
     if show_version:
         ret["version"] = vyper.__version__
 
+    if jobs == 0:
+        jobs = os.cpu_count() or 1
+
+    if jobs > 1 and len(input_files) > 1:
+        ret.update(
+            _compile_files_parallel(
+                jobs,
+                input_files,
+                input_bundle,
+                storage_layout_paths,
+                warnings_control,
+                output_formats=final_formats,
+                settings=settings,
+                show_gas_estimates=show_gas_estimates,
+                no_bytecode_metadata=no_bytecode_metadata,
+                cache=cache,
+            )
+        )
+        return ret
+
+    # imported modules are parsed and analyzed once, and shared by all
+    # the targets which import them.
+    if module_cache is None:
+        module_cache = ModuleCache()
+
     for file_name in input_files:
         file_path = Path(file_name)
 
@@ -394,6 +550,9 @@ def compile_files(
             storage_layout_override=storage_layout_override,
             show_gas_estimates=show_gas_estimates,
             no_bytecode_metadata=no_bytecode_metadata,
+            cache=cache,
+            module_cache=module_cache,
+            lazy_json=lazy_json,
         )
 
         ret[file_path] = output
@@ -401,5 +560,187 @@ def compile_files(
     return ret
 
 
+# parallel compilation. each input file is compiled in a worker process,
+# and results are collected in input order, so that outputs, warnings and
+# exceptions are reported exactly as they would be by the serial loop in
+# `compile_files()`.
+
+
+class _HandledException(Exception):
+    # raised in worker processes in place of `exc_handler()`, so that the
+    # exception can be routed to `exc_handler()` in the parent process.
+    def __init__(self, contract_path: str, exc: Exception):
+        self.contract_path = contract_path
+        self.exc = exc
+
+
+def _worker_exc_handler(contract_path: ContractPath, exception: Exception) -> None:
+    raise _HandledException(str(contract_path), exception)
+
+
+# input bundle and module cache of the current worker process, set up by
+# `_init_worker()`
+_worker_input_bundle: Optional[FilesystemInputBundle] = None
+_worker_module_cache: Optional[ModuleCache] = None
+
+
+def _init_worker(
+    search_paths: list[PathLike], source_ids: dict[PathLike, int], counter: int
+) -> None:
+    global _worker_input_bundle, _worker_module_cache
+    input_bundle = FilesystemInputBundle(search_paths)
+    # seed source ids so that they are the same as in a serial run
+    input_bundle._source_ids = source_ids.copy()
+    input_bundle._source_id_counter = counter
+    _worker_input_bundle = input_bundle
+    _worker_module_cache = ModuleCache()
+
+
+def _compile_file_task(
+    file_name: str,
+    is_zip: bool,
+    storage_layout_override: Optional[StorageLayout],
+    warnings_control: Optional[str],
+    kwargs: dict,
+):
+    assert _worker_input_bundle is not None  # sanity
+    cache = kwargs["cache"]
+    cache_stats = cache.stats() if cache is not None else None
+
+    output, exc, contract_path = None, None, None
+    with warnings.catch_warnings(record=True) as caught_warnings:
+        if warnings_control is None:
+            # record everything, the parent process applies the filter
+            warnings.simplefilter("always")
+        else:
+            set_warnings_filter(warnings_control)
+
+        try:
+            if is_zip:
+                output = compile_from_zip(
+                    file_name,
+                    kwargs["output_formats"],
+                    kwargs["settings"],
+                    kwargs["no_bytecode_metadata"],
+                )
+            else:
+                file = _worker_input_bundle.load_file(Path(file_name))
+                assert isinstance(file, FileInput)  # mypy hint
+                output = vyper.compile_from_file_input(
+                    file,
+                    input_bundle=_worker_input_bundle,
+                    exc_handler=_worker_exc_handler,
+                    storage_layout_override=storage_layout_override,
+                    module_cache=_worker_module_cache,
+                    **kwargs,
+                )
+        except _HandledException as e:
+            exc, contract_path = picklable_exception(e.exc), e.contract_path
+        except Exception as e:
+            exc = picklable_exception(e)
+
+    caught = [(w.category, str(w.message), w.filename, w.lineno) for w in caught_warnings]
+    if cache is not None:
+        # send back the delta, the parent process keeps the running count
+        cache_stats = {k: v - cache_stats[k] for k, v in cache.stats().items()}
+
+    return output, caught, exc, contract_path, cache_stats
+
+
+def _compile_files_parallel(
+    jobs: int,
+    input_files: list[str],
+    input_bundle: FilesystemInputBundle,
+    storage_layout_paths: Optional[list[str]],
+    warnings_control: Optional[str],
+    **kwargs,
+) -> dict:
+    settings = kwargs["settings"]
+    no_bytecode_metadata = kwargs["no_bytecode_metadata"]
+    cache = kwargs["cache"]
+    # whether the serial loop would load the imports of each input
+    load_imports = resolves_imports(kwargs["output_formats"], cache)
+
+    # load every input (and, if the requested outputs need them, its
+    # imports) in order, so that source ids are assigned in the same order
+    # as in a serial run. any errors are ignored here, they are reproduced
+    # (and reported) by the workers.
+    tasks: list[tuple] = []
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+
+        for file_name in input_files:
+            try:
+                compiler_data_from_zip(file_name, settings, no_bytecode_metadata)
+                tasks.append((file_name, True, None))
+                continue
+            except NotZipInput:
+                pass
+            except Exception:
+                tasks.append((file_name, True, None))
+                continue
+
+            try:
+                file = input_bundle.load_file(Path(file_name))
+                assert isinstance(file, FileInput)  # mypy hint
+            except Exception:
+                tasks.append((file_name, False, None))
+                continue
+
+            storage_layout_override = None
+            if storage_layout_paths:
+                storage_file_path = storage_layout_paths.pop(0)
+                with open(storage_file_path) as sfh:
+                    storage_layout_override = json.load(sfh)
+
+            tasks.append((file_name, False, storage_layout_override))
+
+            if not load_imports:
+                continue
+            try:
+                _ = CompilerData(file, input_bundle, settings=settings).resolved_imports
+            except Exception:
+                pass
+
+    initargs = (
+        input_bundle.search_paths,
+        input_bundle._source_ids,
+        input_bundle._source_id_counter,
+    )
+
+    ret = {}
+    # dedup warnings the same way a single process would
+    registry: dict = {}
+    task_args = [(*task, warnings_control, kwargs) for task in tasks]
+    results = imap_ordered(jobs, _compile_file_task, task_args, _init_worker, initargs)
+    try:
+        for (file_name, *_), result in zip(tasks, results):
+            output, caught, exc, contract_path, cache_stats = result
+
+            for category, message, filename, lineno in caught:
+                warnings.warn_explicit(message, category, filename, lineno, registry=registry)
+
+            if cache_stats is not None:
+                cache.hits += cache_stats["hits"]
+                cache.misses += cache_stats["misses"]
+
+            if exc is not None:
+                if contract_path is not None:
+                    exc_handler(contract_path, exc)
+                raise exc
+
+            ret[Path(file_name)] = output
+    finally:
+        # cancel any pending work
+        results.close()
+
+    output_formats = kwargs["output_formats"]
+    if kwargs["show_gas_estimates"] and any(f in ("ir", "ir_runtime") for f in output_formats):
+        # mirror the side effect of `build_ir_output()`, which ran in the workers
+        ir_node.IRnode.repr_show_gas = True
+
+    return ret
+
+
 if __name__ == "__main__":
     _parse_args(sys.argv[1:])
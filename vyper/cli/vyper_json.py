@@ -2,18 +2,23 @@
 
 import argparse
 import json
+import os
 import sys
 import warnings
 from pathlib import Path, PurePath
 from typing import Any, Callable, Hashable, Optional
 
 import vyper
-from vyper.compiler.input_bundle import FileInput, JSONInputBundle
+from vyper.compiler import resolves_imports
+from vyper.compiler.input_bundle import FileInput, JSONInputBundle, PathLike
+from vyper.compiler.parallel import imap_ordered, picklable_exception
+from vyper.compiler.phases import CompilerData
 from vyper.compiler.settings import OptimizationLevel, Settings
 from vyper.evm.opcodes import EVM_VERSIONS
 from vyper.exceptions import JSONError
+from vyper.semantics.analysis.imports import ModuleCache
 from vyper.typing import StorageLayout
-from vyper.utils import OrderedSet, keccak256
+from vyper.utils import OrderedSet, dump_json, keccak256, uniq
 from vyper.warnings import Deprecation, vyper_warn
 
 TRANSLATE_MAP = {
@@ -66,6 +71,13 @@ def _parse_args(argv):
         help="Show python traceback on error instead of returning JSON",
         action="store_true",
     )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        help="Number of targets to compile in parallel (0 = one per CPU, defaults to 1)",
+        type=int,
+        default=1,
+    )
 
     args = parser.parse_args(argv)
     if args.input_file:
@@ -77,20 +89,17 @@ def _parse_args(argv):
         json_path = "<stdin>"
 
     exc_handler = exc_handler_raises if args.traceback else exc_handler_to_dict
-    output_json = json.dumps(
-        compile_json(input_json, exc_handler, json_path),
-        indent=2 if args.pretty_json else None,
-        sort_keys=True,
-        default=str,
-    )
+    output_dict = compile_json(input_json, exc_handler, json_path, args.jobs, lazy_json=True)
+    json_kwargs = dict(indent=2 if args.pretty_json else None, sort_keys=True, default=str)
 
     if args.output_file is not None:
         output_path = Path(args.output_file).resolve()
         with output_path.open("w") as fh:
-            fh.write(output_json)
+            dump_json(output_dict, fh, **json_kwargs)
         print(f"Results saved to {output_path}")
     else:
-        print(output_json)
+        dump_json(output_dict, sys.stdout, **json_kwargs)
+        print()
 
 
 def exc_handler_raises(file_path: Optional[str], exception: Exception, component: str) -> None:
@@ -303,7 +312,12 @@ def get_settings(input_dict: dict) -> Settings:
 
 
 def compile_from_input_dict(
-    input_dict: dict, exc_handler: Callable = exc_handler_raises
+    input_dict: dict,
+    exc_handler: Callable = exc_handler_raises,
+    jobs: int = 1,
+    module_cache: Optional[ModuleCache] = None,
+    lazy_json: bool = False,
+    profile_phases: bool = False,
 ) -> tuple[dict, dict]:
     if input_dict["language"] != "Vyper":
         raise JSONError(f"Invalid language '{input_dict['language']}' - Only Vyper is supported.")
@@ -317,11 +331,36 @@ def compile_from_input_dict(
     sources = get_inputs(input_dict)
     storage_layout_overrides = get_storage_layout_overrides(input_dict)
     output_formats = get_output_formats(input_dict)
+    if profile_phases:
+        output_formats = {
+            path: list(uniq([*formats, "phase_stats"])) for path, formats in output_formats.items()
+        }
     compilation_targets = list(output_formats.keys())
     search_paths = get_search_paths(input_dict)
 
     input_bundle = JSONInputBundle(sources, search_paths=search_paths)
 
+    if jobs == 0:
+        jobs = os.cpu_count() or 1
+
+    if jobs > 1 and len(compilation_targets) > 1:
+        return _compile_targets_parallel(
+            jobs,
+            sources,
+            input_bundle,
+            compilation_targets,
+            output_formats,
+            storage_layout_overrides,
+            exc_handler,
+            integrity_sum=integrity,
+            settings=settings,
+            no_bytecode_metadata=no_bytecode_metadata,
+        )
+
+    if module_cache is None:
+        # share imported modules between the targets of this input
+        module_cache = ModuleCache()
+
     res, warnings_dict = {}, {}
     warnings.simplefilter("always")
     for contract_path in compilation_targets:
@@ -339,6 +378,8 @@ def compile_from_input_dict(
                     integrity_sum=integrity,
                     settings=settings,
                     no_bytecode_metadata=no_bytecode_metadata,
+                    module_cache=module_cache,
+                    lazy_json=lazy_json,
                 )
                 assert isinstance(data, dict)
                 data["source_id"] = file.source_id
@@ -351,6 +392,119 @@ def compile_from_input_dict(
     return res, warnings_dict
 
 
+# parallel compilation. each target is compiled in a worker process, and
+# results are collected in target order, so that the output (including
+# source ids, warnings and errors) is the same as in a serial run.
+
+# input bundle and module cache of the current worker process, set up by
+# `_init_worker()`
+_worker_input_bundle: Optional[JSONInputBundle] = None
+_worker_module_cache: Optional[ModuleCache] = None
+
+
+def _init_worker(
+    sources: dict[PurePath, Any],
+    search_paths: list[PathLike],
+    source_ids: dict[PathLike, int],
+    counter: int,
+) -> None:
+    global _worker_input_bundle, _worker_module_cache
+    input_bundle = JSONInputBundle(sources, search_paths=search_paths)
+    # seed source ids so that they are the same as in a serial run
+    input_bundle._source_ids = source_ids.copy()
+    input_bundle._source_id_counter = counter
+    _worker_input_bundle = input_bundle
+    _worker_module_cache = ModuleCache()
+
+
+def _compile_target_task(
+    contract_path: PurePath,
+    output_formats: list[str],
+    storage_layout_override: Optional[StorageLayout],
+    kwargs: dict,
+):
+    assert _worker_input_bundle is not None  # sanity
+
+    data, exc = None, None
+    with warnings.catch_warnings(record=True) as caught_warnings:
+        warnings.simplefilter("always")
+        try:
+            file = _worker_input_bundle.load_file(contract_path)
+            assert isinstance(file, FileInput)  # mypy hint
+            data = vyper.compile_from_file_input(
+                file,
+                input_bundle=_worker_input_bundle,
+                output_formats=output_formats,
+                storage_layout_override=storage_layout_override,
+                module_cache=_worker_module_cache,
+                **kwargs,
+            )
+            assert isinstance(data, dict)
+            data["source_id"] = file.source_id
+        except Exception as e:
+            exc = picklable_exception(e)
+
+    caught = [(w.category, str(w.message), w.filename, w.lineno) for w in caught_warnings]
+    return data, caught, exc
+
+
+def _compile_targets_parallel(
+    jobs: int,
+    sources: dict[PurePath, Any],
+    input_bundle: JSONInputBundle,
+    compilation_targets: list[PurePath],
+    output_formats: dict[PurePath, list[str]],
+    storage_layout_overrides: dict[PurePath, StorageLayout],
+    exc_handler: Callable,
+    **kwargs,
+) -> tuple[dict, dict]:
+    # load every target (and, if its requested outputs need them, its
+    # imports) in order, so that source ids are assigned in the same order
+    # as in a serial run. any errors are ignored here, they are reproduced
+    # (and reported) by the workers.
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        for contract_path in compilation_targets:
+            try:
+                file = input_bundle.load_file(contract_path)
+                assert isinstance(file, FileInput)  # mypy hint
+                if not resolves_imports(output_formats[contract_path]):
+                    continue
+                _ = CompilerData(file, input_bundle, settings=kwargs["settings"]).resolved_imports
+            except Exception:
+                pass
+
+    initargs = (
+        sources,
+        input_bundle.search_paths,
+        input_bundle._source_ids,
+        input_bundle._source_id_counter,
+    )
+    tasks = [
+        (path, output_formats[path], storage_layout_overrides.get(path), kwargs)
+        for path in compilation_targets
+    ]
+
+    res, warnings_dict = {}, {}
+    warnings.simplefilter("always")
+    results = imap_ordered(jobs, _compile_target_task, tasks, _init_worker, initargs)
+    try:
+        for contract_path, (data, caught, exc) in zip(compilation_targets, results):
+            if exc is not None:
+                return exc_handler(contract_path, exc, "compiler"), {}
+            res[contract_path] = data
+            if caught:
+                warnings_dict[contract_path] = [
+                    warnings.WarningMessage(category(message), category, filename, lineno)
+                    for (category, message, filename, lineno) in caught
+                ]
+    finally:
+        # cancel any pending work
+        results.close()
+
+    return res, warnings_dict
+
+
 # convert output of compile_input_dict to final output format
 def format_to_output_dict(compiler_data: dict) -> dict:
     output_dict: dict = {"compiler": f"vyper-{vyper.__version__}", "contracts": {}, "sources": {}}
@@ -423,6 +577,10 @@ def compile_json(
     input_json: dict | str,
     exc_handler: Callable = exc_handler_raises,
     json_path: Optional[str] = None,
+    jobs: int = 1,
+    module_cache: Optional[ModuleCache] = None,
+    lazy_json: bool = False,
+    profile_phases: bool = False,
 ) -> dict:
     try:
         if isinstance(input_json, str):
@@ -435,7 +593,9 @@ def compile_json(
             input_dict = input_json
 
         try:
-            compiler_data, warn_data = compile_from_input_dict(input_dict, exc_handler)
+            compiler_data, warn_data = compile_from_input_dict(
+                input_dict, exc_handler, jobs, module_cache, lazy_json, profile_phases
+            )
             if "errors" in compiler_data:
                 return compiler_data
         except KeyError as exc:
@@ -445,6 +605,12 @@ def compile_json(
             return exc_handler(json_path, exc, "json")
 
         output_dict = format_to_output_dict(compiler_data)
+        if profile_phases:
+            # not part of the standard json output, for callers which
+            # report compiler performance (cf. `vyper_server`)
+            output_dict["phase_stats"] = {
+                path.as_posix(): data["phase_stats"] for path, data in compiler_data.items()
+            }
         if warn_data:
             output_dict["errors"] = []
             for path, msg in ((k, x) for k, v in warn_data.items() for x in v):
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+
+# a long-running compiler process, for tools which invoke the compiler
+# many times over the same project (editors, test frameworks, build
+# watchers). it speaks JSON-RPC 2.0 over stdio or a unix socket, one
+# message per line. the `compile` method accepts the same payloads as
+# `vyper-json` and returns the same output, along with the time spent in
+# each compiler phase. parsed and analyzed modules
+# are kept in memory between requests (cf. `ModuleCache`), so repeated
+# compiles of an unchanged project skip parsing and analysis of imports.
+
+import argparse
+import json
+import os
+import socket
+import stat
+import sys
+import time
+import traceback
+from typing import Any, Callable, Iterable, Optional, TextIO
+
+import vyper
+from vyper.cli.vyper_json import compile_json, exc_handler_to_dict
+from vyper.semantics.analysis.imports import ModuleCache
+
+# error codes, cf. https://www.jsonrpc.org/specification#error_object
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(
+        description="Vyper programming language for EVM - compiler server",
+        formatter_class=argparse.RawTextHelpFormatter,
+    )
+    parser.add_argument(
+        "--version", action="version", version=f"{vyper.__version__}+commit.{vyper.__commit__}"
+    )
+    parser.add_argument(
+        "--socket",
+        help="Listen on a unix socket at this path. If not given, requests\n"
+        "are read from stdin and responses are written to stdout.",
+        default=None,
+        dest="socket_path",
+    )
+
+    args = parser.parse_args(argv)
+
+    server = CompilerServer()
+    if args.socket_path is not None:
+        server.serve_unix_socket(args.socket_path)
+    else:
+        server.serve(sys.stdin, sys.stdout)
+
+
+def _total_phase_stats(target_stats: Iterable[dict]) -> dict:
+    """
+    Sum the `phase_stats` output of each target, per phase.
+    """
+    ret: dict[str, dict] = {}
+    for stats in target_stats:
+        for name, phase in stats.items():
+            total = ret.setdefault(name, {"calls": 0, "wall_time": 0.0, "cpu_time": 0.0})
+            for k in total:
+                total[k] += phase[k]
+    return ret
+
+
+def _remove_stale_socket(path: str) -> None:
+    """
+    Remove the socket file left behind by a server which did not shut
+    down cleanly (e.g. was killed). Raises if a server is still listening
+    on `path`.
+    """
+    try:
+        is_socket = stat.S_ISSOCK(os.stat(path).st_mode)
+    except FileNotFoundError:
+        return
+    if not is_socket:
+        # not ours, let `bind()` report the error
+        return
+
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except ConnectionRefusedError:
+        # nothing is listening
+        os.unlink(path)
+        return
+    finally:
+        probe.close()
+
+    raise ValueError(f"Another server is already listening on `{path}`!")
+
+
+class _RPCError(Exception):
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+class CompilerServer:
+    def __init__(self):
+        self.module_cache = ModuleCache()
+        self.running = True
+
+        self._methods: dict[str, Callable] = {
+            "compile": self.rpc_compile,
+            "stats": self.rpc_stats,
+            "reset": self.rpc_reset,
+            "shutdown": self.rpc_shutdown,
+        }
+
+    def rpc_compile(self, params: Any) -> dict:
+        if not isinstance(params, dict):
+            raise _RPCError(INVALID_PARAMS, "`compile` expects a standard json input object")
+
+        t0 = time.perf_counter()
+        output = compile_json(
+            params, exc_handler_to_dict, module_cache=self.module_cache, profile_phases=True
+        )
+        t1 = time.perf_counter()
+
+        phase_stats = output.pop("phase_stats", {})
+        timings = {"compile": t1 - t0, "phases": _total_phase_stats(phase_stats.values())}
+        return {"output": output, "timings": timings}
+
+    def rpc_stats(self, params: Any) -> dict:
+        return {"module_cache": self.module_cache.stats()}
+
+    def rpc_reset(self, params: Any) -> None:
+        self.module_cache.clear()
+
+    def rpc_shutdown(self, params: Any) -> None:
+        self.running = False
+
+    def handle_message(self, message: str) -> Optional[dict]:
+        """
+        Handle a single JSON-RPC message. Returns the response object, or
+        None if the message is a notification (has no id).
+        """
+        request_id = None
+        try:
+            try:
+                request = json.loads(message)
+            except json.JSONDecodeError as e:
+                raise _RPCError(PARSE_ERROR, str(e)) from e
+
+            if not isinstance(request, dict) or not isinstance(request.get("method"), str):
+                raise _RPCError(INVALID_REQUEST, "expected a JSON-RPC request object")
+
+            request_id = request.get("id")
+            method = self._methods.get(request["method"])
+            if method is None:
+                raise _RPCError(METHOD_NOT_FOUND, f"unknown method `{request['method']}`")
+
+            t0 = time.perf_counter()
+            result = method(request.get("params"))
+            if isinstance(result, dict) and "timings" in result:
+                result["timings"]["total"] = time.perf_counter() - t0
+
+            if "id" not in request:
+                return None
+            response = {"jsonrpc": "2.0", "id": request_id, "result": result}
+
+        except _RPCError as e:
+            error = {"code": e.code, "message": e.message}
+            response = {"jsonrpc": "2.0", "id": request_id, "error": error}
+        except Exception as e:
+            # compilation errors are returned as part of the compile output,
+            # anything else is a bug in the compiler.
+            error = {"code": INTERNAL_ERROR, "message": repr(e), "data": traceback.format_exc()}
+            response = {"jsonrpc": "2.0", "id": request_id, "error": error}
+
+        return response
+
+    def serve(self, rfile: TextIO, wfile: TextIO) -> None:
+        """
+        Handle newline-delimited messages from `rfile` until EOF or until
+        a shutdown request is received.
+        """
+        for line in rfile:
+            if not line.strip():
+                continue
+
+            response = self.handle_message(line)
+            if response is not None:
+                wfile.write(json.dumps(response, sort_keys=True, default=str) + "\n")
+                wfile.flush()
+
+            if not self.running:
+                break
+
+    def serve_unix_socket(self, path: str) -> None:
+        # connections are handled one at a time, since compilation
+        # mutates the (shared) cached modules.
+        _remove_stale_socket(path)
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.bind(path)
+        try:
+            sock.listen()
+            while self.running:
+                conn, _ = sock.accept()
+                with conn, conn.makefile("r") as rfile, conn.makefile("w") as wfile:
+                    self.serve(rfile, wfile)
+        finally:
+            sock.close()
+            os.unlink(path)
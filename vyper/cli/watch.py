@@ -0,0 +1,160 @@
+# not an entry point!
+# watch mode (`vyper --watch`): compile the input files, then recompile
+# them whenever any of the files they depend on change. compilations go
+# through a `CompilationSession`, so only the targets which depend on a
+# changed file are recompiled, and unchanged imported modules are reused.
+# all the input files are compiled in a single `compile_files()` call, so
+# that source ids (and therefore source maps and ast output) are the same
+# as in a regular `vyper` invocation with the same input files.
+
+import os
+import sys
+import time
+import traceback
+from pathlib import Path
+from typing import Callable, Optional
+
+from vyper.compiler.session import CompilationSession
+from vyper.utils import sha256sum
+
+POLL_INTERVAL = 0.5  # seconds
+
+# (mtime, size) of a file, None if it does not exist
+_FileStat = Optional[tuple[int, int]]
+
+
+def _stat(path: Path) -> _FileStat:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class Watcher:
+    def __init__(
+        self,
+        compile_fn: Callable[..., dict],
+        input_files: list[str],
+        storage_layout_paths: Optional[list[str]] = None,
+    ):
+        """
+        `compile_fn` is `compile_files()` with all arguments bound except
+        for the input files, storage layout paths and caches.
+        """
+        self.compile_fn = compile_fn
+        self.input_files = input_files
+        self.storage_layout_paths = storage_layout_paths
+        self.session = CompilationSession()
+
+        # outputs of the last successful compilation
+        self.outputs: dict = {}
+        # whether the last compilation failed
+        self.failed = False
+
+    def _resolved_path(self, input_file: str) -> Path:
+        return Path(input_file).resolve()
+
+    def dirty_files(self, changed: set[Path]) -> list[str]:
+        """
+        The input files which need to be recompiled after `changed` (the
+        resolved paths of files which changed on disk).
+        """
+        affected = set(self.session.affected_targets(changed))
+        ret = []
+        for input_file in self.input_files:
+            resolved_path = self._resolved_path(input_file)
+            known = len(self.session.dependencies(resolved_path)) > 0
+            if not known or resolved_path in affected or self.failed:
+                ret.append(input_file)
+        return ret
+
+    def rebuild(self) -> bool:
+        """
+        Recompile the input files. Targets whose dependencies did not
+        change are reused from the session. Errors are reported on stderr.
+        Returns True if all the input files compile.
+        """
+        try:
+            self.outputs = self.compile_fn(
+                self.input_files,
+                storage_layout_paths=self.storage_layout_paths,
+                cache=self.session,
+                module_cache=self.session.module_cache,
+            )
+            self.failed = False
+        except Exception:
+            self.failed = True
+            traceback.print_exc()
+
+        return not self.failed
+
+    def compiled(self) -> dict:
+        """
+        The outputs of all input files, in the format of `compile_files()`.
+        """
+        return self.outputs
+
+    def watched_files(self) -> set[Path]:
+        ret = self.session.watched_files()
+        ret.update(self._resolved_path(f) for f in self.input_files)
+        return ret
+
+    def stale_files(self) -> set[Path]:
+        """
+        The files whose contents changed since they were last compiled
+        (e.g. files which were edited during compilation).
+        """
+        ret = set()
+        for input_file in self.input_files:
+            dependencies = self.session.dependencies(self._resolved_path(input_file))
+            for path, digest in dependencies.items():
+                try:
+                    with path.open() as f:
+                        contents = f.read()
+                except OSError:
+                    ret.add(path)
+                    continue
+                if sha256sum(contents) != digest:
+                    ret.add(path)
+        return ret
+
+    def wait_for_changes(self, poll_interval: float = POLL_INTERVAL) -> set[Path]:
+        """
+        Block until any of the watched files change, returning the files
+        which changed.
+        """
+        stats = {path: _stat(path) for path in self.watched_files()}
+
+        changed = self.stale_files()
+        if len(changed) > 0:
+            return changed
+
+        while True:
+            time.sleep(poll_interval)
+            changed = {path for path, stat in stats.items() if _stat(path) != stat}
+            if len(changed) > 0:
+                return changed
+
+    def run(self, write_output: Callable[[dict], None]) -> None:
+        dirty = list(self.input_files)
+        try:
+            while True:
+                t0 = time.perf_counter()
+                ok = self.rebuild()
+                if ok:
+                    write_output(self.compiled())
+                elapsed = time.perf_counter() - t0
+
+                if ok:
+                    status = f"compiled {len(dirty)} contract(s) in {elapsed:.2f}s"
+                else:
+                    status = "compilation failed"
+                n_files = len(self.watched_files())
+                print(f"{status}, watching {n_files} file(s) for changes...", file=sys.stderr)
+
+                dirty = []
+                while len(dirty) == 0:
+                    dirty = self.dirty_files(self.wait_for_changes())
+        except KeyboardInterrupt:
+            pass
@@ -148,7 +148,7 @@ def _adjust_gas_estimate(func_t, common_ir):
 
     mem_expansion_cost = calc_mem_gas(frame_info.mem_used)
     common_ir.add_gas_estimate += mem_expansion_cost
-    func_t._ir_info.gas_estimate = common_ir.gas
+    func_t._ir_info.gas_estimate_ir = common_ir
 
 
 def generate_ir_for_external_function(code, compilation_target):
@@ -127,10 +127,15 @@ class _WithBuilder:
             return ret
 
 
+# pop and pass are used to push/pop values on the stack to be consumed
+# for internal functions, so they are allowed as zero valency arguments
+_ZERO_VALENCY_WHITELIST = ("pass", "pop")
+
+
 # Data structure for IR parse tree
 class IRnode:
     repr_show_gas = False
-    _gas: int
+    _gas: Optional[int]
     valency: int
     args: List["IRnode"]
     value: Union[str, int]
@@ -177,9 +182,13 @@ class IRnode:
 
         assert self.value is not None, "None is not allowed as IRnode value"
 
+        # the gas estimate is only needed for `show_gas_estimates`, so
+        # it is computed on demand (see `gas`)
+        self._gas = None
+
         # Determine this node's valency (1 if it pushes a value on the stack,
         # 0 otherwise) and checks to make sure the number and valencies of
-        # children are correct. Also, find an upper bound on gas consumption
+        # children are correct.
         # Numbers
         if isinstance(self.value, int):
             assert len(self.args) == 0, "int can't have arguments"
@@ -188,61 +197,27 @@ class IRnode:
             assert -(2**255) <= self.value < 2**256, "out of range"
 
             self.valency = 1
-            self._gas = 5
         elif isinstance(self.value, bytes):
             # a literal bytes value, probably inside a "data" node.
             assert len(self.args) == 0, "bytes can't have arguments"
 
             self.valency = 0
-            self._gas = 0
 
         elif isinstance(self.value, str):
             # Opcodes and pseudo-opcodes (e.g. clamp)
-            if self.value.upper() in get_ir_opcodes():
-                _, ins, outs, gas = get_ir_opcodes()[self.value.upper()]
+            opcode = get_ir_opcodes().get(self.value.upper())
+            if opcode is not None:
+                _, ins, outs, _ = opcode
                 self.valency = outs
                 assert (
                     len(self.args) == ins
                 ), f"Number of arguments mismatched: {self.value} {self.args}"
-                # We add 2 per stack height at push time and take it back
-                # at pop time; this makes `break` easier to handle
-                self._gas = gas + 2 * (outs - ins)
                 for arg in self.args:
-                    # pop and pass are used to push/pop values on the stack to be
-                    # consumed for internal functions, therefore we whitelist this as a zero valency
-                    # allowed argument.
-                    zero_valency_whitelist = {"pass", "pop"}
                     assert (
-                        arg.valency == 1 or arg.value in zero_valency_whitelist
+                        arg.valency == 1 or arg.value in _ZERO_VALENCY_WHITELIST
                     ), f"invalid argument to `{self.value}`: {arg}"
-
-                    self._gas += arg.gas
-                # Dynamic gas cost: 8 gas for each byte of logging data
-                if self.value.upper()[0:3] == "LOG" and isinstance(self.args[1].value, int):
-                    self._gas += self.args[1].value * 8
-                # Dynamic gas cost: non-zero-valued call
-                if self.value.upper() == "CALL" and self.args[2].value != 0:
-                    self._gas += 34000
-                # Dynamic gas cost: filling sstore (ie. not clearing)
-                elif self.value.upper() == "SSTORE" and self.args[1].value != 0:
-                    self._gas += 15000
-                # Dynamic gas cost: calldatacopy
-                elif self.value.upper() in ("CALLDATACOPY", "CODECOPY", "EXTCODECOPY"):
-                    size = 34000
-                    size_arg_index = 3 if self.value.upper() == "EXTCODECOPY" else 2
-                    size_arg = self.args[size_arg_index]
-                    if isinstance(size_arg.value, int):
-                        size = size_arg.value
-                    self._gas += ceil32(size) // 32 * 3
-                # Gas limits in call
-                if self.value.upper() == "CALL" and isinstance(self.args[0].value, int):
-                    self._gas += self.args[0].value
             # If statements
             elif self.value == "if":
-                if len(self.args) == 3:
-                    self._gas = self.args[0].gas + max(self.args[1].gas, self.args[2].gas) + 3
-                if len(self.args) == 2:
-                    self._gas = self.args[0].gas + self.args[1].gas + 17
                 assert (
                     self.args[0].valency > 0
                 ), f"zerovalent argument as a test to an if statement: {self.args[0]}"
@@ -258,7 +233,6 @@ class IRnode:
                     self.args[1].valency == 1 or self.args[1].value == "pass"
                 ), f"zerovalent argument to with statement: {self.args[1]}"
                 self.valency = self.args[2].valency
-                self._gas = sum([arg.gas for arg in self.args]) + 5
             # Repeat statements: repeat <index_name> <startval> <rounds> <rounds_bound> <body>
             elif self.value == "repeat":
                 assert (
@@ -269,7 +243,6 @@ class IRnode:
                 start = self.args[1]
                 repeat_count = self.args[2]
                 repeat_bound = self.args[3]
-                body = self.args[4]
 
                 assert (
                     isinstance(repeat_bound.value, int) and repeat_bound.value > 0
@@ -280,19 +253,9 @@ class IRnode:
 
                 self.valency = 0
 
-                self._gas = counter_ptr.gas + start.gas
-                self._gas += 3  # gas for repeat_bound
-                int_bound = int(repeat_bound.value)
-                self._gas += int_bound * (body.gas + 50) + 30
-
-                if repeat_count != repeat_bound:
-                    # gas for assert(repeat_count <= repeat_bound)
-                    self._gas += 18
-
             # Seq statements: seq <statement> <statement> ...
             elif self.value == "seq":
                 self.valency = self.args[-1].valency if self.args else 0
-                self._gas = sum([arg.gas for arg in self.args]) + 30
 
             # GOTO is a jump with args
             # e.g. (goto my_label x y z) will push x y and z onto the stack,
@@ -304,14 +267,12 @@ class IRnode:
                     ), f"zerovalent argument to goto {arg}"
 
                 self.valency = 0
-                self._gas = sum([arg.gas for arg in self.args])
             elif self.value == "label":
                 assert (
                     self.args[1].value == "var_list"
                 ), f"2nd argument to label must be var_list, {self}"
                 assert len(args) == 3, f"label should have 3 args but has {len(args)}, {self}"
                 self.valency = 0
-                self._gas = 1 + sum(t.gas for t in self.args)
             elif self.value == "unique_symbol":
                 # a label which enforces uniqueness, and does not appear
                 # in generated bytecode. this is useful for generating
@@ -320,7 +281,6 @@ class IRnode:
                 # must be distinct from all `unique_symbol`s AS WELL AS all
                 # `label`s, otherwise IR-to-assembly will raise an exception.
                 self.valency = 0
-                self._gas = 0
 
             # var_list names a variable number stack variables
             elif self.value == "var_list":
@@ -328,7 +288,6 @@ class IRnode:
                     if not isinstance(arg.value, str) or len(arg.args) > 0:  # pragma: nocover
                         raise CodegenPanic(f"var_list only takes strings: {self.args}")
                 self.valency = 0
-                self._gas = 0
 
             # Multi statements: multi <expr> <expr> ...
             elif self.value == "multi":
@@ -337,19 +296,87 @@ class IRnode:
                         arg.valency > 0
                     ), f"Multi expects all children to not be zerovalent: {arg}"
                 self.valency = sum([arg.valency for arg in self.args])
-                self._gas = sum([arg.gas for arg in self.args])
             elif self.value == "deploy":
                 self.valency = 0
                 assert len(self.args) == 3, f"`deploy` should have three args {self}"
-                self._gas = NullAttractor()  # unknown
             # Stack variables
             else:
                 self.valency = 1
-                self._gas = 3
         else:  # pragma: nocover
             raise CompilerPanic(f"Invalid value for IR AST node: {self.value}")
         assert isinstance(self.args, list)
 
+    def _estimate_gas(self):
+        # find an upper bound on gas consumption of this node (excluding
+        # `add_gas_estimate`). the structure of the node was validated in
+        # `__init__`.
+        if isinstance(self.value, int):
+            return 5
+        if isinstance(self.value, bytes):
+            return 0
+
+        assert isinstance(self.value, str)  # mypy hint
+        opcode = get_ir_opcodes().get(self.value.upper())
+        if opcode is not None:
+            _, ins, outs, gas = opcode
+            # We add 2 per stack height at push time and take it back
+            # at pop time; this makes `break` easier to handle
+            ret = gas + 2 * (outs - ins)
+            for arg in self.args:
+                ret += arg.gas
+            # Dynamic gas cost: 8 gas for each byte of logging data
+            if self.value.upper()[0:3] == "LOG" and isinstance(self.args[1].value, int):
+                ret += self.args[1].value * 8
+            # Dynamic gas cost: non-zero-valued call
+            if self.value.upper() == "CALL" and self.args[2].value != 0:
+                ret += 34000
+            # Dynamic gas cost: filling sstore (ie. not clearing)
+            elif self.value.upper() == "SSTORE" and self.args[1].value != 0:
+                ret += 15000
+            # Dynamic gas cost: calldatacopy
+            elif self.value.upper() in ("CALLDATACOPY", "CODECOPY", "EXTCODECOPY"):
+                size = 34000
+                size_arg_index = 3 if self.value.upper() == "EXTCODECOPY" else 2
+                size_arg = self.args[size_arg_index]
+                if isinstance(size_arg.value, int):
+                    size = size_arg.value
+                ret += ceil32(size) // 32 * 3
+            # Gas limits in call
+            if self.value.upper() == "CALL" and isinstance(self.args[0].value, int):
+                ret += self.args[0].value
+            return ret
+
+        if self.value == "if":
+            if len(self.args) == 3:
+                return self.args[0].gas + max(self.args[1].gas, self.args[2].gas) + 3
+            return self.args[0].gas + self.args[1].gas + 17
+        if self.value == "with":
+            return sum([arg.gas for arg in self.args]) + 5
+        if self.value == "repeat":
+            counter_ptr, start, repeat_count, repeat_bound, body = self.args
+
+            ret = counter_ptr.gas + start.gas
+            ret += 3  # gas for repeat_bound
+            int_bound = int(repeat_bound.value)
+            ret += int_bound * (body.gas + 50) + 30
+
+            if repeat_count != repeat_bound:
+                # gas for assert(repeat_count <= repeat_bound)
+                ret += 18
+            return ret
+        if self.value == "seq":
+            return sum([arg.gas for arg in self.args]) + 30
+        if self.value in ("goto", "exit_to", "multi"):
+            return sum([arg.gas for arg in self.args])
+        if self.value == "label":
+            return 1 + sum(t.gas for t in self.args)
+        if self.value in ("unique_symbol", "var_list"):
+            return 0
+        if self.value == "deploy":
+            return NullAttractor()  # unknown
+        # Stack variables
+        return 3
+
     # deepcopy is a perf hotspot; it pays to optimize it a little
     def __deepcopy__(self, memo):
         cls = self.__class__
@@ -361,6 +388,8 @@ class IRnode:
     # TODO would be nice to rename to `gas_estimate` or `gas_bound`
     @property
     def gas(self):
+        if self._gas is None:
+            self._gas = self._estimate_gas()
         return self._gas + self.add_gas_estimate
 
     # the IR should be cached and/or evaluated exactly once
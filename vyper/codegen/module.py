@@ -416,8 +416,24 @@ def _selector_section_linear(external_functions, module_t):
     return ret
 
 
+def _reset_codegen_state(module_t: ModuleT) -> None:
+    # imported modules can be shared between compilations (cf.
+    # `ModuleCache`), clear function ids and IR info from a previous run.
+    module_ts = [module_t]
+    for info in module_t.reachable_imports:
+        if isinstance(info.parsed, vy_ast.Module):
+            module_ts.append(info.parsed._metadata["type"])
+
+    for t in module_ts:
+        for fn_t in t.functions.values():
+            fn_t._function_id = None
+            fn_t._ir_info = None
+
+
 # take a ModuleT, and generate the runtime and deploy IR
 def generate_ir_for_module(module_t: ModuleT) -> tuple[IRnode, IRnode]:
+    _reset_codegen_state(module_t)
+
     # order functions so that each function comes after all of its callees
     id_generator = IDGenerator()
     runtime_reachable = _runtime_reachable_functions(module_t, id_generator)
@@ -3,47 +3,77 @@ from typing import Callable, Dict, Optional
 
 import vyper.codegen.core as codegen
 import vyper.compiler.output as output
+from vyper.compiler.cache import UNCACHEABLE_FORMATS, CompilationCache
 from vyper.compiler.input_bundle import FileInput, InputBundle, PathLike
 from vyper.compiler.phases import CompilerData
+from vyper.compiler.session import CompilationSession
 from vyper.compiler.settings import Settings, anchor_settings, get_global_settings
+from vyper.semantics.analysis.imports import ModuleCache
 from vyper.typing import OutputFormats, StorageLayout
 
+# output formats, grouped by the (earliest) `CompilerData` phase which
+# they require. phases run on demand, so requesting only formats from
+# the early phases (e.g. abi, interface, layout) never generates IR.
+_OUTPUT_FORMATS_BY_PHASE: dict[str, dict[str, Callable]] = {
+    "vyper_module": {"ast_dict": output.build_ast_dict},
+    "integrity_sum": {"integrity": output.build_integrity},
+    "annotated_vyper_module": {
+        "annotated_ast_dict": output.build_annotated_ast_dict,
+        "devdoc": output.build_devdoc,
+        "userdoc": output.build_userdoc,
+        "external_interface": output.build_external_interface_output,
+        "interface": output.build_interface_output,
+        "method_identifiers": output.build_method_identifiers_output,
+        # (requires IR if gas estimates are requested)
+        "abi": output.build_abi_output,
+    },
+    "storage_layout": {"layout": output.build_layout_output},
+    "ir_nodes": {
+        "ir": output.build_ir_output,
+        "ir_runtime": output.build_ir_runtime_output,
+        "ir_dict": output.build_ir_dict_output,
+        "ir_runtime_dict": output.build_ir_runtime_dict_output,
+        # function ids and frame info are assigned during codegen
+        "metadata": output.build_metadata_output,
+    },
+    "venom_functions": {
+        "bb": output.build_bb_output,
+        "bb_runtime": output.build_bb_runtime_output,
+        "cfg": output.build_cfg_output,
+        "cfg_runtime": output.build_cfg_runtime_output,
+    },
+    "assembly": {"asm": output.build_asm_output},
+    "assembled": {
+        "source_map": output.build_source_map_output,
+        "source_map_runtime": output.build_source_map_runtime_output,
+    },
+    "bytecode": {
+        "bytecode": output.build_bytecode_output,
+        "bytecode_runtime": output.build_bytecode_runtime_output,
+        "blueprint_bytecode": output.build_blueprint_bytecode_output,
+        "opcodes": output.build_opcodes_output,
+        "opcodes_runtime": output.build_opcodes_runtime_output,
+        # the archive formats try to compile to bytecode, but are
+        # produced even if codegen fails
+        "archive": output.build_archive,
+        "archive_b64": output.build_archive_b64,
+        "solc_json": output.build_solc_json,
+    },
+    # stats of the phases run to generate the other outputs
+    "phase_stats": {"phase_stats": output.build_phase_stats_output},
+}
+
 OUTPUT_FORMATS = {
-    # requires vyper_module
-    "ast_dict": output.build_ast_dict,
-    # requires annotated_vyper_module
-    "annotated_ast_dict": output.build_annotated_ast_dict,
-    "layout": output.build_layout_output,
-    "devdoc": output.build_devdoc,
-    "userdoc": output.build_userdoc,
-    "archive": output.build_archive,
-    "archive_b64": output.build_archive_b64,
-    "integrity": output.build_integrity,
-    "solc_json": output.build_solc_json,
-    # requires ir_node
-    "external_interface": output.build_external_interface_output,
-    "interface": output.build_interface_output,
-    "bb": output.build_bb_output,
-    "bb_runtime": output.build_bb_runtime_output,
-    "cfg": output.build_cfg_output,
-    "cfg_runtime": output.build_cfg_runtime_output,
-    "ir": output.build_ir_output,
-    "ir_runtime": output.build_ir_runtime_output,
-    "ir_dict": output.build_ir_dict_output,
-    "ir_runtime_dict": output.build_ir_runtime_dict_output,
-    "method_identifiers": output.build_method_identifiers_output,
-    "metadata": output.build_metadata_output,
-    # requires assembly
-    "abi": output.build_abi_output,
-    "asm": output.build_asm_output,
-    "source_map": output.build_source_map_output,
-    "source_map_runtime": output.build_source_map_runtime_output,
-    # requires bytecode
-    "bytecode": output.build_bytecode_output,
-    "bytecode_runtime": output.build_bytecode_runtime_output,
-    "blueprint_bytecode": output.build_blueprint_bytecode_output,
-    "opcodes": output.build_opcodes_output,
-    "opcodes_runtime": output.build_opcodes_runtime_output,
+    output_format: formatter
+    for formats in _OUTPUT_FORMATS_BY_PHASE.values()
+    for output_format, formatter in formats.items()
+}
+
+# the phase which each output format requires
+OUTPUT_FORMAT_PHASES = {
+    output_format: phase
+    for phase, formats in _OUTPUT_FORMATS_BY_PHASE.items()
+    for output_format in formats
 }
 
 INTERFACE_OUTPUT_FORMATS = [
@@ -54,8 +84,30 @@ INTERFACE_OUTPUT_FORMATS = [
     "abi",
 ]
 
+# output formats which can be generated as `LazyJSON` values, so that they
+# are streamed to the output file instead of being built in memory
+LAZY_JSON_OUTPUT_FORMATS = ("ast_dict", "annotated_ast_dict", "ir_dict", "ir_runtime_dict")
+
 UNKNOWN_CONTRACT_NAME = "<unknown>"
 
+# formats which are generated without resolving the imports of the target
+_NO_IMPORTS_PHASES = ("vyper_module", "phase_stats")
+
+
+def resolves_imports(
+    output_formats: OutputFormats, cache: Optional[CompilationCache | CompilationSession] = None
+) -> bool:
+    """
+    Whether compiling a target to `output_formats` (through `cache`, if
+    given) resolves its imports, loading the imported files. Source ids
+    are assigned as files are loaded, so callers which compile targets
+    out of order use this to assign them as an in-order run would.
+    """
+    if cache is not None and not any(f in UNCACHEABLE_FORMATS for f in output_formats):
+        # the cache key depends on the imports
+        return True
+    return any(OUTPUT_FORMAT_PHASES.get(f) not in _NO_IMPORTS_PHASES for f in output_formats)
+
 
 def compile_from_file_input(
     file_input: FileInput,
@@ -67,6 +119,9 @@ def compile_from_file_input(
     no_bytecode_metadata: bool = False,
     show_gas_estimates: bool = False,
     exc_handler: Optional[Callable] = None,
+    cache: Optional[CompilationCache | CompilationSession] = None,
+    module_cache: Optional[ModuleCache] = None,
+    lazy_json: bool = False,
 ) -> dict:
     """
     Main entry point into the compiler.
@@ -98,6 +153,17 @@ def compile_from_file_input(
         Do not add metadata to bytecode. Defaults to False
     experimental_codegen: bool
         Use experimental codegen. Defaults to False
+    cache: CompilationCache | CompilationSession, optional
+        On-disk cache (or in-memory session) to fetch outputs from, and
+        store them to. If not given, outputs are always generated from
+        scratch.
+    module_cache: ModuleCache, optional
+        In-memory cache of parsed and analyzed imported modules, which
+        can be shared between compilations.
+    lazy_json: bool, optional
+        Generate the formats in `LAZY_JSON_OUTPUT_FORMATS` as `LazyJSON`
+        values, to be written out with `vyper.utils.dump_json()`. Ignored
+        if `cache` is given. Defaults to False
 
     Returns
     -------
@@ -114,21 +180,30 @@ def compile_from_file_input(
         storage_layout=storage_layout_override,
         show_gas_estimates=show_gas_estimates,
         no_bytecode_metadata=no_bytecode_metadata,
+        module_cache=module_cache,
     )
 
-    return outputs_from_compiler_data(compiler_data, output_formats, exc_handler)
+    if cache is not None:
+        return cache.compile(compiler_data, output_formats or ("bytecode",), exc_handler)
+
+    return outputs_from_compiler_data(compiler_data, output_formats, exc_handler, lazy_json)
 
 
 def outputs_from_compiler_data(
     compiler_data: CompilerData,
     output_formats: Optional[OutputFormats] = None,
     exc_handler: Optional[Callable] = None,
+    lazy_json: bool = False,
 ):
     if output_formats is None:
         output_formats = ("bytecode",)
 
     ret = {}
 
+    # phase_stats goes last, so that it includes the phases run for the
+    # other requested outputs
+    output_formats = sorted(output_formats, key=lambda f: f == "phase_stats")
+
     with anchor_settings(compiler_data.settings):
         for output_format in output_formats:
             if output_format not in OUTPUT_FORMATS:
@@ -142,7 +217,10 @@ def outputs_from_compiler_data(
 
             try:
                 formatter = OUTPUT_FORMATS[output_format]
-                ret[output_format] = formatter(compiler_data)
+                if lazy_json and output_format in LAZY_JSON_OUTPUT_FORMATS:
+                    ret[output_format] = formatter(compiler_data, lazy=True)
+                else:
+                    ret[output_format] = formatter(compiler_data)
             except Exception as exc:
                 if exc_handler is not None:
                     exc_handler(str(compiler_data.file_input.path), exc)
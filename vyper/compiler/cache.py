@@ -0,0 +1,234 @@
+import json
+import os
+import pickle
+import tempfile
+import warnings
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Optional
+
+from vyper.compiler.phases import CompilerData
+from vyper.utils import get_long_version, sha256sum
+
+# opt-in on-disk cache for compiler outputs. the cache is content-addressed:
+# entries are keyed on the integrity sum of the contract (which covers the
+# contents of all its imports), the normalized settings, storage layout
+# override, and the compiler version. a warm hit still needs to parse the
+# import graph (which is required to compute the integrity sum), but skips
+# semantic analysis, codegen and assembly.
+# NOTE: entries are pickled, so the cache directory should be trusted the
+# same way as the compiler installation itself.
+
+VYPER_CACHE_DIR = os.environ.get("VYPER_CACHE_DIR")
+
+DEFAULT_CACHE_MAX_SIZE = 512 * 1024 * 1024  # 512MB
+
+# bump this if the on-disk format of cache entries changes
+CACHE_FORMAT_VERSION = 1
+
+# output formats whose values are live compiler objects (IRnode,
+# IRContext) rather than plain data, or which describe the compilation
+# itself (phase_stats), and therefore cannot be cached.
+UNCACHEABLE_FORMATS = frozenset(["ir", "ir_runtime", "bb", "bb_runtime", "phase_stats"])
+
+_SUFFIX = ".pickle"
+
+
+@dataclass
+class CacheEntry:
+    outputs: dict[str, Any]
+    # (category, message) pairs, replayed on cache hits
+    warnings: list[tuple[type, str]] = field(default_factory=list)
+
+    def replay_warnings(self) -> None:
+        for category, message in self.warnings:
+            warnings.warn(category(message), stacklevel=3)
+
+
+class CompilationCache:
+    """
+    A size-bounded, LRU-evicted cache of compiler outputs on disk.
+
+    Writes are atomic (write to a temporary file, then rename), so the
+    cache can be shared between concurrently running compiler processes.
+    """
+
+    def __init__(self, cache_dir: str | Path, max_size: int = DEFAULT_CACHE_MAX_SIZE):
+        self.cache_dir = Path(cache_dir)
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses}
+
+    def key_for(self, compiler_data: CompilerData, output_formats) -> Optional[str]:
+        return cache_key(compiler_data, output_formats)
+
+    def _path_of(self, key: str) -> Path:
+        return self.cache_dir / (key + _SUFFIX)
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        path = self._path_of(key)
+        try:
+            with path.open("rb") as f:
+                entry = pickle.load(f)
+        except FileNotFoundError:
+            entry = None
+        except Exception:
+            # corrupted or stale entry, treat it as a miss
+            _unlink(path)
+            entry = None
+
+        if not isinstance(entry, CacheEntry):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        # bump mtime, which is used as the LRU clock
+        try:
+            os.utime(path)
+        except FileNotFoundError:  # evicted by another process
+            pass
+        return entry
+
+    def put(self, key: str, entry: CacheEntry) -> None:
+        try:
+            data = pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            # some output is not serializable, skip it
+            return
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, self._path_of(key))
+        except BaseException:
+            _unlink(Path(tmp_path))
+            raise
+
+        self.evict()
+
+    def evict(self) -> None:
+        """
+        Remove least recently used entries until the total size of the
+        cache is at most `self.max_size`.
+        """
+        entries = []
+        total_size = 0
+        for path in self.cache_dir.glob("*" + _SUFFIX):
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+            total_size += st.st_size
+
+        entries.sort(key=lambda t: t[0])
+        for _, size, path in entries:
+            if total_size <= self.max_size:
+                break
+            _unlink(path)
+            total_size -= size
+
+    def compile(self, compiler_data: CompilerData, output_formats, exc_handler=None) -> dict:
+        # break a dependency cycle
+        from vyper.compiler import outputs_from_compiler_data
+
+        try:
+            key = self.key_for(compiler_data, output_formats)
+        except Exception:
+            # let the regular compilation path report the error
+            key = None
+
+        if key is None:
+            return outputs_from_compiler_data(compiler_data, output_formats, exc_handler)
+
+        entry = self.get(key)
+        if entry is not None:
+            entry.replay_warnings()
+            return entry.outputs
+
+        ret, entry = compile_and_record(compiler_data, output_formats, exc_handler)
+        if entry is not None:
+            self.put(key, entry)
+
+        return ret
+
+
+def cache_key(compiler_data: CompilerData, output_formats) -> Optional[str]:
+    """
+    Compute the cache key for a compilation, or None if the requested
+    outputs cannot be cached.
+    """
+    if any(f in UNCACHEABLE_FORMATS for f in output_formats):
+        return None
+
+    file_input = compiler_data.file_input
+
+    # source ids and paths of imported modules leak into some outputs
+    # (e.g. annotated_ast_dict, metadata), so they are part of the key.
+    imported_modules = compiler_data.resolved_imports._ast_of.values()
+    imports = sorted((m.source_id, m.path, m.resolved_path) for m in imported_modules)
+
+    layout = compiler_data.storage_layout_override
+
+    key = {
+        "cache_format": CACHE_FORMAT_VERSION,
+        "compiler_version": get_long_version(),
+        "integrity_sum": compiler_data.integrity_sum,
+        "settings": compiler_data.settings.as_dict(),
+        "storage_layout_override": layout,
+        "path": file_input.path.as_posix(),
+        "resolved_path": file_input.resolved_path.as_posix(),
+        "source_id": file_input.source_id,
+        "imports": imports,
+        "show_gas_estimates": compiler_data.show_gas_estimates,
+        "no_bytecode_metadata": compiler_data.no_bytecode_metadata,
+        "output_formats": list(output_formats),
+    }
+    return sha256sum(json.dumps(key, sort_keys=True))
+
+
+def compile_and_record(
+    compiler_data: CompilerData, output_formats, exc_handler=None
+) -> tuple[dict, Optional[CacheEntry]]:
+    """
+    Generate the outputs, recording the warnings emitted along the way.
+    Returns the outputs, and a cache entry for them (or None if the
+    compilation failed, and should not be cached).
+    """
+    # break a dependency cycle
+    from vyper.compiler import outputs_from_compiler_data
+
+    handled_exception = False
+
+    def _exc_handler(contract_path, exc):
+        nonlocal handled_exception
+        handled_exception = True
+        if exc_handler is None:
+            raise exc
+        exc_handler(contract_path, exc)
+
+    with warnings.catch_warnings(record=True) as caught_warnings:
+        ret = outputs_from_compiler_data(compiler_data, output_formats, _exc_handler)
+
+    # re-emit warnings, so that they are visible to the caller
+    for w in caught_warnings:
+        warnings.warn_explicit(w.message, w.category, w.filename, w.lineno)
+
+    if handled_exception:
+        return ret, None
+
+    caught = [(w.category, str(w.message)) for w in caught_warnings]
+    return ret, CacheEntry(ret, caught)
+
+
+def _unlink(path: Path) -> None:
+    try:
+        path.unlink()
+    except FileNotFoundError:
+        pass
@@ -15,19 +15,20 @@ from vyper.semantics.analysis.base import ModuleInfo
 from vyper.semantics.types.function import ContractFunctionT, FunctionVisibility, StateMutability
 from vyper.semantics.types.module import InterfaceT
 from vyper.typing import StorageLayout
-from vyper.utils import safe_relpath
+from vyper.utils import LazyJSON, safe_relpath
 from vyper.warnings import ContractSizeLimit, vyper_warn
 
 
-def build_ast_dict(compiler_data: CompilerData) -> dict:
+def build_ast_dict(compiler_data: CompilerData, lazy: bool = False) -> dict:
     ast_dict = {
         "contract_name": str(compiler_data.contract_path),
-        "ast": ast_to_dict(compiler_data.vyper_module),
+        # `vyper_module` is analyzed in place, cf. `CompilerData._resolve_imports`
+        "ast": ast_to_dict(compiler_data.vyper_module, include_analysis=False, lazy=lazy),
     }
     return ast_dict
 
 
-def build_annotated_ast_dict(compiler_data: CompilerData) -> dict:
+def build_annotated_ast_dict(compiler_data: CompilerData, lazy: bool = False) -> dict:
     module_t = compiler_data.annotated_vyper_module._metadata["type"]
     # get all reachable imports including recursion
     imported_module_infos = module_t.reachable_imports
@@ -52,8 +53,8 @@ def build_annotated_ast_dict(compiler_data: CompilerData) -> dict:
 
     annotated_ast_dict = {
         "contract_name": str(compiler_data.contract_path),
-        "ast": ast_to_dict(compiler_data.annotated_vyper_module),
-        "imports": [ast_to_dict(ast) for ast in unique_modules.values()],
+        "ast": ast_to_dict(compiler_data.annotated_vyper_module, lazy=lazy),
+        "imports": [ast_to_dict(ast, lazy=lazy) for ast in unique_modules.values()],
     }
     return annotated_ast_dict
 
@@ -104,6 +105,10 @@ def build_integrity(compiler_data: CompilerData) -> str:
     return compiler_data.integrity_sum
 
 
+def build_phase_stats_output(compiler_data: CompilerData) -> dict:
+    return {name: stats.as_dict() for name, stats in compiler_data.phase_stats.items()}
+
+
 def build_external_interface_output(compiler_data: CompilerData) -> str:
     interface = compiler_data.annotated_vyper_module._metadata["type"].interface
     stem = PurePath(compiler_data.contract_path).stem
@@ -193,22 +198,24 @@ def build_ir_runtime_output(compiler_data: CompilerData) -> IRnode:
     return compiler_data.ir_runtime
 
 
-def _ir_to_dict(ir_node):
+def _ir_to_dict(ir_node, lazy=False):
     # Currently only supported with IRnode and not VenomIR
     if not isinstance(ir_node, IRnode):
         return
     args = ir_node.args
     if len(args) > 0 or ir_node.value == "seq":
+        if lazy:
+            return {ir_node.value: [LazyJSON(_ir_to_dict, x, True) for x in args]}
         return {ir_node.value: [_ir_to_dict(x) for x in args]}
     return ir_node.value
 
 
-def build_ir_dict_output(compiler_data: CompilerData) -> dict:
-    return _ir_to_dict(compiler_data.ir_nodes)
+def build_ir_dict_output(compiler_data: CompilerData, lazy: bool = False) -> dict:
+    return _ir_to_dict(compiler_data.ir_nodes, lazy)
 
 
-def build_ir_runtime_dict_output(compiler_data: CompilerData) -> dict:
-    return _ir_to_dict(compiler_data.ir_runtime)
+def build_ir_runtime_dict_output(compiler_data: CompilerData, lazy: bool = False) -> dict:
+    return _ir_to_dict(compiler_data.ir_runtime, lazy)
 
 
 def build_metadata_output(compiler_data: CompilerData) -> dict:
@@ -236,6 +243,10 @@ def build_metadata_output(compiler_data: CompilerData) -> dict:
 
     def _to_dict(func_t):
         ret = vars(func_t).copy()
+        # `default_values` is a cached property, so it may or may not be in
+        # vars(); pop it so that key order doesn't depend on whether it was
+        # already computed (e.g. by another compilation sharing `func_t`).
+        ret.pop("default_values", None)
         ret["return_type"] = str(ret["return_type"])
         ret["_ir_identifier"] = func_t._ir_info.ir_identifier
 
@@ -288,8 +299,6 @@ def build_method_identifiers_output(compiler_data: CompilerData) -> dict:
 
 def build_abi_output(compiler_data: CompilerData) -> list:
     module_t = compiler_data.annotated_vyper_module._metadata["type"]
-    if not compiler_data.annotated_vyper_module.is_interface:
-        _ = compiler_data.ir_runtime  # ensure _ir_info is generated
 
     abi = module_t.interface.to_toplevel_abi_dict()
     if module_t.init_function:
@@ -313,7 +322,7 @@ def build_abi_output(compiler_data: CompilerData) -> list:
 
 
 def build_asm_output(compiler_data: CompilerData) -> str:
-    return _build_asm(compiler_data.assembly)
+    return _build_asm(compiler_data.assembly.decode())
 
 
 def build_layout_output(compiler_data: CompilerData) -> StorageLayout:
@@ -352,7 +361,7 @@ def _build_node_identifier(ast_node):
     return (ast_node.module_node.source_id, ast_node.node_id)
 
 
-def _build_source_map_output(compiler_data, bytecode, pc_maps):
+def _build_source_map_output(compiler_data, assembled):
     """
     Generate source map output in various formats. Note that integrations
     are encouraged to use pc_ast_map since the information it provides is
@@ -361,9 +370,12 @@ def _build_source_map_output(compiler_data, bytecode, pc_maps):
     """
     # sort the pc maps alphabetically
     # CMC 2024-03-09 is this really necessary?
+    pc_maps = assembled.pc_maps
     out = {}
     for k in sorted(pc_maps.keys()):
-        out[k] = pc_maps[k]
+        # copy, `assembled` is cached by `compiler_data` and must not be
+        # modified (below, or by the caller)
+        out[k] = pc_maps[k].copy()
 
     ast_map = out.pop("pc_raw_ast_map")
 
@@ -374,7 +386,8 @@ def _build_source_map_output(compiler_data, bytecode, pc_maps):
 
     pc_pos_map = {k: compile_ir.getpos(v) for (k, v) in ast_map.items()}
     node_id_map = {k: _build_node_identifier(v) for (k, v) in ast_map.items()}
-    compressed_map = _compress_source_map(ast_map, out["pc_jump_map"], len(bytecode))
+    # (the compiler metadata is not covered by the source map)
+    compressed_map = _compress_source_map(ast_map, out["pc_jump_map"], assembled.code_len)
     out["pc_pos_map_compressed"] = compressed_map
     out["pc_pos_map"] = pc_pos_map
     out["pc_ast_map"] = node_id_map
@@ -384,15 +397,11 @@ def _build_source_map_output(compiler_data, bytecode, pc_maps):
 
 
 def build_source_map_output(compiler_data: CompilerData) -> dict:
-    bytecode, pc_maps = compile_ir.assembly_to_evm(compiler_data.assembly, compiler_metadata=None)
-    return _build_source_map_output(compiler_data, bytecode, pc_maps)
+    return _build_source_map_output(compiler_data, compiler_data.assembled)
 
 
 def build_source_map_runtime_output(compiler_data: CompilerData) -> dict:
-    bytecode, pc_maps = compile_ir.assembly_to_evm(
-        compiler_data.assembly_runtime, compiler_metadata=None
-    )
-    return _build_source_map_output(compiler_data, bytecode, pc_maps)
+    return _build_source_map_output(compiler_data, compiler_data.assembled_runtime)
 
 
 # generate a solidity-style source map. this functionality is deprecated
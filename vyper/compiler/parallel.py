@@ -0,0 +1,51 @@
+# utility functions for running compiler tasks (e.g. compiling targets or
+# analyzing modules) in worker processes
+
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.context import BaseContext
+from typing import Any, Callable, Generator, Optional, Sequence
+
+from vyper.exceptions import VyperException, _BaseVyperException
+
+
+def picklable_exception(exc: Exception) -> Exception:
+    """
+    Prepare an exception raised in a worker process to be sent back to
+    the parent process.
+    """
+    if isinstance(exc, _BaseVyperException) and callable(exc._hint):
+        # hints can be lazily computed, force them before shipping
+        # the exception to the parent process
+        exc._hint = exc.hint
+    try:
+        pickle.dumps(exc)
+    except Exception:
+        # can't send the exception object back, send its message instead
+        exc = VyperException(str(exc))
+    return exc
+
+
+def imap_ordered(
+    jobs: int,
+    fn: Callable,
+    tasks: Sequence[tuple],
+    initializer: Optional[Callable] = None,
+    initargs: tuple = (),
+    mp_context: Optional[BaseContext] = None,
+) -> Generator[Any, None, None]:
+    """
+    Run `fn(*task)` for each task in a process pool, yielding results in
+    the order of `tasks`. If the consumer stops early (or raises), pending
+    tasks are cancelled.
+    """
+    max_workers = max(1, min(jobs, len(tasks)))
+    with ProcessPoolExecutor(
+        max_workers, mp_context=mp_context, initializer=initializer, initargs=initargs
+    ) as pool:
+        futures = [pool.submit(fn, *task) for task in tasks]
+        try:
+            for future in futures:
+                yield future.result()
+        finally:
+            pool.shutdown(cancel_futures=True)
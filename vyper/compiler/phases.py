@@ -1,4 +1,4 @@
-import copy
+import functools
 import json
 from functools import cached_property
 from pathlib import Path, PurePath
@@ -10,12 +10,13 @@ from vyper.ast import natspec
 from vyper.codegen import module
 from vyper.codegen.ir_node import IRnode
 from vyper.compiler.input_bundle import FileInput, FilesystemInputBundle, InputBundle
+from vyper.compiler.profiling import PhaseProfiler, PhaseStats
 from vyper.compiler.settings import OptimizationLevel, Settings, anchor_settings, merge_settings
 from vyper.ir import compile_ir, optimizer
 from vyper.ir.compile_ir import reset_symbols
 from vyper.semantics import analyze_module, set_data_positions, validate_compilation_target
 from vyper.semantics.analysis.data_positions import generate_layout_export
-from vyper.semantics.analysis.imports import resolve_imports
+from vyper.semantics.analysis.imports import ModuleCache, resolve_imports
 from vyper.semantics.types.function import ContractFunctionT
 from vyper.semantics.types.module import ModuleT
 from vyper.typing import StorageLayout
@@ -26,6 +27,20 @@ from vyper.warnings import VyperWarning, vyper_warn
 DEFAULT_CONTRACT_PATH = PurePath("VyperContract.vy")
 
 
+def phase(fn):
+    """
+    Decorator for a compiler phase: a cached property of `CompilerData`
+    whose timing (and memory usage) is recorded in `phase_stats`.
+    """
+
+    @functools.wraps(fn)
+    def wrapper(self):
+        with self.profiler.phase(fn.__name__):
+            return fn(self)
+
+    return cached_property(wrapper)
+
+
 class CompilerData:
     """
     Object for fetching and storing compiler data for a Vyper contract.
@@ -54,6 +69,8 @@ class CompilerData:
         Deployment bytecode
     bytecode_runtime : bytes
         Runtime bytecode
+    phase_stats : dict
+        Time (and memory) spent in each compiler phase
     """
 
     def __init__(
@@ -65,6 +82,7 @@ class CompilerData:
         storage_layout: StorageLayout = None,
         show_gas_estimates: bool = False,
         no_bytecode_metadata: bool = False,
+        module_cache: Optional[ModuleCache] = None,
     ) -> None:
         """
         Initialization method.
@@ -81,6 +99,8 @@ class CompilerData:
             Show gas estimates for abi and ir output modes
         no_bytecode_metadata: bool, optional
             Do not add metadata to bytecode. Defaults to False
+        module_cache: ModuleCache, optional
+            Cache of imported modules, shared with other compilations.
         """
 
         if isinstance(file_input, str):
@@ -97,9 +117,15 @@ class CompilerData:
         self.original_settings = settings
         self.input_bundle = input_bundle or FilesystemInputBundle([Path(".")])
         self.expected_integrity_sum = integrity_sum
+        self.module_cache = module_cache
+        self.profiler = PhaseProfiler()
 
-        # ast cache, hitchhike onto the input_bundle object
-        self.input_bundle._cache._ast_of: dict[int, vy_ast.Module] = {}  # type: ignore
+    @property
+    def phase_stats(self) -> dict[str, PhaseStats]:
+        """
+        Profiling stats of the phases which have run so far, by phase name.
+        """
+        return self.profiler.stats
 
     @cached_property
     def source_code(self):
@@ -113,7 +139,7 @@ class CompilerData:
     def contract_path(self):
         return self.file_input.path
 
-    @cached_property
+    @phase
     def _generate_ast(self):
         is_vyi = self.contract_path.suffix == ".vyi"
 
@@ -158,12 +184,18 @@ class CompilerData:
             return sha256sum(layout_sum + imports_integrity_sum)
         return imports_integrity_sum
 
-    @cached_property
+    @phase
     def _resolve_imports(self):
-        # deepcopy so as to not interfere with `-f ast` output
-        vyper_module = copy.deepcopy(self.vyper_module)
+        # note: the module is analyzed in place, there is no need to copy
+        # it. analysis only adds metadata to the nodes, which `-f ast`
+        # output leaves out (cf. `build_ast_dict`).
+        vyper_module = self.vyper_module
         with self.input_bundle.search_path(Path(vyper_module.resolved_path).parent):
-            imports = resolve_imports(vyper_module, self.input_bundle)
+            # analysis of imported modules depends on the settings
+            cache_context = json.dumps(self.settings.as_dict(), sort_keys=True)
+            imports = resolve_imports(
+                vyper_module, self.input_bundle, self.module_cache, cache_context
+            )
 
         # check integrity sum
         integrity_sum = self._compute_integrity_sum(imports._integrity_sum)
@@ -188,10 +220,16 @@ class CompilerData:
     def resolved_imports(self):
         return self._resolve_imports[1]
 
-    @cached_property
+    @phase
     def _annotate(self) -> tuple[natspec.NatspecOutput, vy_ast.Module]:
         module = self._resolve_imports[0]
-        analyze_module(module)
+        try:
+            analyze_module(module)
+        except Exception:
+            if self.module_cache is not None:
+                # imported modules may be partially analyzed, don't reuse them
+                self.module_cache.discard(module)
+            raise
         nspec = natspec.parse_natspec(module)
         return nspec, module
 
@@ -203,7 +241,7 @@ class CompilerData:
     def annotated_vyper_module(self) -> vy_ast.Module:
         return self._annotate[1]
 
-    @cached_property
+    @phase
     def compilation_target(self):
         """
         Get the annotated AST, and additionally run the global checks
@@ -214,7 +252,7 @@ class CompilerData:
         validate_compilation_target(module_t)
         return self.annotated_vyper_module
 
-    @cached_property
+    @phase
     def storage_layout(self) -> StorageLayout:
         module_ast = self.compilation_target
         set_data_positions(module_ast, self.storage_layout_override)
@@ -229,7 +267,7 @@ class CompilerData:
         _ = self.natspec
         return self.annotated_vyper_module._metadata["type"]
 
-    @cached_property
+    @phase
     def _ir_output(self):
         # fetch both deployment and runtime IR
         return generate_ir_nodes(self.global_ctx, self.settings)
@@ -253,15 +291,15 @@ class CompilerData:
         fs = self.annotated_vyper_module.get_children(vy_ast.FunctionDef)
         return {f.name: f._metadata["func_type"] for f in fs}
 
-    @cached_property
+    @phase
     def venom_functions(self):
         deploy_ir, runtime_ir = self._ir_output
         deploy_venom = generate_ir(deploy_ir, self.settings)
         runtime_venom = generate_ir(runtime_ir, self.settings)
         return deploy_venom, runtime_venom
 
-    @cached_property
-    def assembly(self) -> list:
+    @phase
+    def assembly(self) -> compile_ir.EncodedAssembly:
         if self.settings.experimental_codegen:
             deploy_code, runtime_code = self.venom_functions
             assert self.settings.optimize is not None  # mypy hint
@@ -271,8 +309,8 @@ class CompilerData:
         else:
             return generate_assembly(self.ir_nodes, self.settings.optimize)
 
-    @cached_property
-    def assembly_runtime(self) -> list:
+    @phase
+    def assembly_runtime(self) -> compile_ir.EncodedAssembly:
         if self.settings.experimental_codegen:
             _, runtime_code = self.venom_functions
             assert self.settings.optimize is not None  # mypy hint
@@ -280,16 +318,24 @@ class CompilerData:
         else:
             return generate_assembly(self.ir_runtime, self.settings.optimize)
 
-    @cached_property
-    def bytecode(self) -> bytes:
+    @phase
+    def assembled(self) -> compile_ir.AssembledCode:
         metadata = None
         if not self.no_bytecode_metadata:
             metadata = bytes.fromhex(self.integrity_sum)
-        return generate_bytecode(self.assembly, compiler_metadata=metadata)
+        return compile_ir.assemble(self.assembly, compiler_metadata=metadata)
 
-    @cached_property
+    @phase
+    def assembled_runtime(self) -> compile_ir.AssembledCode:
+        return compile_ir.assemble(self.assembly_runtime, compiler_metadata=None)
+
+    @phase
+    def bytecode(self) -> bytes:
+        return self.assembled.bytecode
+
+    @phase
     def bytecode_runtime(self) -> bytes:
-        return generate_bytecode(self.assembly_runtime, compiler_metadata=None)
+        return self.assembled_runtime.bytecode
 
     @cached_property
     def blueprint_bytecode(self) -> bytes:
@@ -334,7 +380,9 @@ def generate_ir_nodes(global_ctx: ModuleT, settings: Settings) -> tuple[IRnode,
     return ir_nodes, ir_runtime
 
 
-def generate_assembly(ir_nodes: IRnode, optimize: Optional[OptimizationLevel] = None) -> list:
+def generate_assembly(
+    ir_nodes: IRnode, optimize: Optional[OptimizationLevel] = None
+) -> compile_ir.EncodedAssembly:
     """
     Generate assembly instructions from IR.
 
@@ -345,8 +393,8 @@ def generate_assembly(ir_nodes: IRnode, optimize: Optional[OptimizationLevel] =
 
     Returns
     -------
-    list
-        List of assembly instructions.
+    EncodedAssembly
+        Integer-coded assembly instructions.
     """
     optimize = optimize or OptimizationLevel.default()
     assembly = compile_ir.compile_to_assembly(ir_nodes, optimize=optimize)
@@ -358,7 +406,7 @@ def generate_assembly(ir_nodes: IRnode, optimize: Optional[OptimizationLevel] =
                 "a supported EVM! It will FAIL on all other nodes!"
             )
         )
-    return assembly
+    return compile_ir.encode_assembly(assembly)
 
 
 def _find_nested_opcode(assembly, key):
@@ -369,13 +417,15 @@ def _find_nested_opcode(assembly, key):
         return any(_find_nested_opcode(x, key) for x in sublists)
 
 
-def generate_bytecode(assembly: list, compiler_metadata: Optional[Any]) -> bytes:
+def generate_bytecode(
+    assembly: compile_ir.EncodedAssembly | list, compiler_metadata: Optional[Any]
+) -> bytes:
     """
     Generate bytecode from assembly instructions.
 
     Arguments
     ---------
-    assembly : list
+    assembly : EncodedAssembly | list
         Assembly instructions. Can be deployment or runtime assembly.
 
     Returns
@@ -383,4 +433,4 @@ def generate_bytecode(assembly: list, compiler_metadata: Optional[Any]) -> bytes
     bytes
         Final compiled bytecode.
     """
-    return compile_ir.assembly_to_evm(assembly, compiler_metadata=compiler_metadata)[0]
+    return compile_ir.assemble(assembly, compiler_metadata=compiler_metadata).bytecode
@@ -0,0 +1,100 @@
+import contextlib
+import dataclasses
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+# per-phase profiling of the compiler. each `CompilerData` records stats
+# for its phases (cf. `vyper.compiler.phases.phase`); code which runs
+# inside of a phase (e.g. venom passes) can record finer-grained phases
+# with `profile_phase()`. phases nest, and the time of a phase excludes
+# the time spent in nested phases, so that the times of all phases add up
+# to the total time. memory is only measured if tracemalloc is tracing.
+
+
+@dataclass
+class PhaseStats:
+    calls: int = 0
+    # seconds spent in the phase, excluding nested phases
+    wall_time: float = 0.0
+    cpu_time: float = 0.0
+    # peak traced memory (in bytes) allocated during the phase, including
+    # nested phases. None if tracemalloc was not tracing.
+    peak_memory: Optional[int] = None
+
+    def as_dict(self) -> dict:
+        return dataclasses.asdict(self)
+
+
+@dataclass
+class _Frame:
+    wall_start: float
+    cpu_start: float
+    mem_start: int = 0
+    mem_peak: int = 0
+    nested_wall: float = 0.0
+    nested_cpu: float = 0.0
+
+
+class PhaseProfiler:
+    def __init__(self):
+        self.stats: dict[str, PhaseStats] = {}
+        self._stack: list[_Frame] = []
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        global _active_profiler
+
+        tracing = tracemalloc.is_tracing()
+        mem_start = 0
+        if tracing:
+            mem_start, peak = tracemalloc.get_traced_memory()
+            if len(self._stack) > 0:
+                parent = self._stack[-1]
+                parent.mem_peak = max(parent.mem_peak, peak)
+            tracemalloc.reset_peak()
+
+        frame = _Frame(time.perf_counter(), time.process_time(), mem_start, mem_start)
+        self._stack.append(frame)
+
+        prev_profiler, _active_profiler = _active_profiler, self
+        try:
+            yield
+        finally:
+            _active_profiler = prev_profiler
+
+            wall_time = time.perf_counter() - frame.wall_start
+            cpu_time = time.process_time() - frame.cpu_start
+            self._stack.pop()
+
+            stats = self.stats.setdefault(name, PhaseStats())
+            stats.calls += 1
+            stats.wall_time += wall_time - frame.nested_wall
+            stats.cpu_time += cpu_time - frame.nested_cpu
+
+            if tracing:
+                _, peak = tracemalloc.get_traced_memory()
+                frame.mem_peak = max(frame.mem_peak, peak)
+                peak_memory = frame.mem_peak - frame.mem_start
+                stats.peak_memory = max(stats.peak_memory or 0, peak_memory)
+
+            if len(self._stack) > 0:
+                parent = self._stack[-1]
+                parent.nested_wall += wall_time
+                parent.nested_cpu += cpu_time
+                parent.mem_peak = max(parent.mem_peak, frame.mem_peak)
+
+
+# the profiler of the innermost phase which is currently running
+_active_profiler: Optional[PhaseProfiler] = None
+
+
+def profile_phase(name: str):
+    """
+    Record a phase with the profiler of the currently running compiler
+    phase. No-op when called outside of a compiler phase.
+    """
+    if _active_profiler is None:
+        return contextlib.nullcontext()
+    return _active_profiler.phase(name)
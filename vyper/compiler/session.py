@@ -0,0 +1,132 @@
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Optional
+
+import vyper.ast as vy_ast
+from vyper.compiler.cache import CacheEntry, cache_key, compile_and_record
+from vyper.compiler.input_bundle import FileInput
+from vyper.compiler.phases import CompilerData
+from vyper.semantics.analysis.imports import ModuleCache, _is_builtin
+
+# incremental compilation. a `CompilationSession` compiles the same targets
+# over and over (e.g. each time a file is saved, cf. `vyper --watch`). it
+# keeps the import graph and outputs of the previous compilation of each
+# target. a target whose integrity sum (which covers the contents of all
+# its transitive imports) did not change is not recompiled at all; when
+# it did change, imported modules which did not change are reused from
+# the session's `ModuleCache` instead of being parsed and analyzed again.
+
+
+@dataclass
+class _Target:
+    key: Optional[str]
+    # outputs of the previous compilation, None if it failed
+    entry: Optional[CacheEntry]
+    # the target and all the files it (transitively) imports, mapped to
+    # their sha256sum
+    files: dict[Path, str]
+
+
+class CompilationSession:
+    """
+    Compile targets repeatedly, redoing only the work affected by changes
+    to their sources. Can be used anywhere a `CompilationCache` can (e.g.
+    the `cache` argument to `compile_from_file_input()`), in conjunction
+    with the session's `module_cache`.
+    """
+
+    def __init__(self):
+        self.module_cache = ModuleCache()
+        self._targets: dict[Path, _Target] = {}
+        # number of targets compiled, and reused from a previous compilation
+        self.compiled = 0
+        self.reused = 0
+
+    def stats(self) -> dict[str, int]:
+        return {"compiled": self.compiled, "reused": self.reused}
+
+    def compile(self, compiler_data: CompilerData, output_formats, exc_handler=None) -> dict:
+        target_path = Path(compiler_data.file_input.resolved_path)
+        prev = self._targets.get(target_path)
+
+        try:
+            key = cache_key(compiler_data, output_formats)
+        except Exception:
+            # let the regular compilation path report the error
+            key = None
+
+        if key is not None and prev is not None and prev.entry is not None and prev.key == key:
+            self.reused += 1
+            prev.entry.replay_warnings()
+            return prev.entry.outputs
+
+        self.compiled += 1
+        entry = None
+        try:
+            ret, entry = compile_and_record(compiler_data, output_formats, exc_handler)
+        finally:
+            # record the dependencies even if the compilation failed, so
+            # that the target is recompiled once any of them change.
+            files = _dependency_files(compiler_data)
+            if files is None:
+                # import resolution failed, keep the files of the previous
+                # compilation
+                files = prev.files.copy() if prev is not None else {}
+                files[target_path] = compiler_data.file_input.sha256sum
+            self._targets[target_path] = _Target(key, entry, files)
+
+        return ret
+
+    def dependencies(self, target_path: Path) -> dict[Path, str]:
+        """
+        The files which the previous compilation of `target_path` depended
+        on, mapped to their sha256sum.
+        """
+        target = self._targets.get(Path(target_path))
+        if target is None:
+            return {}
+        return target.files
+
+    def watched_files(self) -> set[Path]:
+        """
+        All the files which the previous compilations depended on.
+        """
+        return set().union(*(target.files for target in self._targets.values()))
+
+    def affected_targets(self, changed_files: Iterable[Path]) -> list[Path]:
+        """
+        The targets which depend on any of `changed_files`, and need to be
+        recompiled.
+        """
+        changed = set(changed_files)
+        return [
+            path for path, target in self._targets.items() if not changed.isdisjoint(target.files)
+        ]
+
+
+def _dependency_files(compiler_data: CompilerData) -> Optional[dict[Path, str]]:
+    try:
+        module_ast = compiler_data._resolve_imports[0]
+    except Exception:
+        # the target does not parse or its imports cannot be resolved
+        return None
+
+    file_input = compiler_data.file_input
+    ret = {Path(file_input.resolved_path): file_input.sha256sum}
+    _collect_files_r(module_ast, ret)
+    return ret
+
+
+def _collect_files_r(module_ast: vy_ast.Module, acc: dict[Path, str]) -> None:
+    for node in module_ast.get_children((vy_ast.Import, vy_ast.ImportFrom)):
+        info = node._metadata.get("import_info")
+        if info is None or _is_builtin(info.qualified_module_name):
+            continue
+
+        path = Path(info.compiler_input.resolved_path)
+        if path in acc:
+            continue
+        acc[path] = info.compiler_input.sha256sum
+
+        if isinstance(info.compiler_input, FileInput):
+            _collect_files_r(info.parsed, acc)
@@ -9,6 +9,9 @@ VYPER_COLOR_OUTPUT = os.environ.get("VYPER_COLOR_OUTPUT", "0") == "1"
 VYPER_ERROR_CONTEXT_LINES = int(os.environ.get("VYPER_ERROR_CONTEXT_LINES", "1"))
 VYPER_ERROR_LINE_NUMBERS = os.environ.get("VYPER_ERROR_LINE_NUMBERS", "1") == "1"
 
+# number of worker processes for analysing function bodies (0 = one per CPU)
+VYPER_ANALYSIS_JOBS = int(os.environ.get("VYPER_ANALYSIS_JOBS", "1"))
+
 VYPER_TRACEBACK_LIMIT: Optional[int]
 
 _tb_limit_str = os.environ.get("VYPER_TRACEBACK_LIMIT")
@@ -1,13 +1,15 @@
 import copy
 import functools
 import math
-from dataclasses import dataclass
+from array import array
+from dataclasses import dataclass, field
+from typing import Any, Optional
 
 import cbor2
 
 from vyper.codegen.ir_node import IRnode
 from vyper.compiler.settings import OptimizationLevel
-from vyper.evm.opcodes import get_opcodes, version_check
+from vyper.evm.opcodes import OPCODES, get_active_evm_version, get_opcodes, version_check
 from vyper.exceptions import CodegenPanic, CompilerPanic
 from vyper.ir.optimizer import COMMUTATIVE_OPS
 from vyper.utils import MemoryPositions
@@ -34,16 +36,6 @@ def PUSH(x):
     return [f"PUSH{len(bs)}"] + bs
 
 
-# push an exact number of bytes
-def PUSH_N(x, n):
-    o = []
-    for _i in range(n):
-        o.insert(0, x % 256)
-        x //= 256
-    assert x == 0
-    return [f"PUSH{len(o)}"] + o
-
-
 _next_symbol = 0
 
 
@@ -192,9 +184,11 @@ class Instruction(str):
     def __new__(cls, sstr, *args, **kwargs):
         return super().__new__(cls, sstr)
 
+    # only DEBUG instructions set this, so share the default
+    pc_debugger = False
+
     def __init__(self, sstr, ast_source=None, error_msg=None):
         self.error_msg = error_msg
-        self.pc_debugger = False
 
         self.ast_source = ast_source
 
@@ -237,42 +231,59 @@ def compile_to_assembly(code, optimize=OptimizationLevel.GAS):
 
 
 # Compiles IR to assembly
-@apply_line_numbers
 def _compile_to_assembly(code, withargs=None, existing_labels=None, break_dest=None, height=0):
     if withargs is None:
         withargs = {}
-    if not isinstance(withargs, dict):
-        raise CompilerPanic(f"Incorrect type for withargs: {type(withargs)}")
+    if existing_labels is None:
+        existing_labels = set()
 
-    def _data_ofst_of(sym, ofst, height_):
-        # e.g. _OFST _sym_foo 32
-        assert is_symbol(sym) or is_mem_sym(sym)
-        if isinstance(ofst.value, int):
-            # resolve at compile time using magic _OFST op
-            return ["_OFST", sym, ofst.value]
-        else:
-            # if we can't resolve at compile time, resolve at runtime
-            ofst = _compile_to_assembly(ofst, withargs, existing_labels, break_dest, height_)
-            return ofst + [sym, "ADD"]
+    asm = []
+    _compile_to_assembly_r(asm, code, withargs, existing_labels, break_dest, height)
+    return asm
 
-    def _height_of(witharg):
-        ret = height - withargs[witharg]
-        if ret > 16:
-            raise Exception("With statement too deep")
-        return ret
 
-    if existing_labels is None:
-        existing_labels = set()
+def _emit(asm, code, *items):
+    # append `items` to `asm`, tagging instructions with the source of the
+    # IR node which emits them.
+    for i in items:
+        if isinstance(i, str) and not isinstance(i, Instruction):
+            i = Instruction(i, code.ast_source, code.error_msg)
+        asm.append(i)
+
+
+def _height_of(withargs, witharg, height):
+    ret = height - withargs[witharg]
+    if ret > 16:
+        raise Exception("With statement too deep")
+    return ret
+
+
+def _emit_data_ofst(asm, code, sym, ofst, withargs, existing_labels, break_dest, height):
+    # e.g. _OFST _sym_foo 32
+    assert is_symbol(sym) or is_mem_sym(sym)
+    if isinstance(ofst.value, int):
+        # resolve at compile time using magic _OFST op
+        _emit(asm, code, "_OFST", sym, ofst.value)
+    else:
+        # if we can't resolve at compile time, resolve at runtime
+        _compile_to_assembly_r(asm, ofst, withargs, existing_labels, break_dest, height)
+        _emit(asm, code, sym, "ADD")
+
+
+# appends the assembly for `code` to `asm`. all of the assembly goes into
+# one buffer (except for the runtime code and data sections, which are
+# separate programs), so that the work is linear in the size of the output.
+def _compile_to_assembly_r(asm, code, withargs, existing_labels, break_dest, height):
+    if not isinstance(withargs, dict):
+        raise CompilerPanic(f"Incorrect type for withargs: {type(withargs)}")
     if not isinstance(existing_labels, set):
         raise CompilerPanic(f"must be set(), but got {type(existing_labels)}")
 
     # Opcodes
     if isinstance(code.value, str) and code.value.upper() in get_opcodes():
-        o = []
         for i, c in enumerate(code.args[::-1]):
-            o.extend(_compile_to_assembly(c, withargs, existing_labels, break_dest, height + i))
-        o.append(code.value.upper())
-        return o
+            _compile_to_assembly_r(asm, c, withargs, existing_labels, break_dest, height + i)
+        _emit(asm, code, code.value.upper())
 
     # Numbers
     elif isinstance(code.value, int):
@@ -280,11 +291,11 @@ def _compile_to_assembly(code, withargs=None, existing_labels=None, break_dest=N
             raise Exception(f"Value too low: {code.value}")
         elif code.value >= 2**256:
             raise Exception(f"Value too high: {code.value}")
-        return PUSH(code.value % 2**256)
+        _emit(asm, code, *PUSH(code.value % 2**256))
 
     # Variables connected to with statements
     elif isinstance(code.value, str) and code.value in withargs:
-        return ["DUP" + str(_height_of(code.value))]
+        _emit(asm, code, "DUP" + str(_height_of(withargs, code.value, height)))
 
     # Setting variables connected to with statements
     elif code.value == "set":
@@ -292,27 +303,25 @@ def _compile_to_assembly(code, withargs=None, existing_labels=None, break_dest=N
             raise Exception("Set expects two arguments, the first being a stack variable")
         if height - withargs[code.args[0].value] > 16:
             raise Exception("With statement too deep")
-        return _compile_to_assembly(code.args[1], withargs, existing_labels, break_dest, height) + [
-            "SWAP" + str(height - withargs[code.args[0].value]),
-            "POP",
-        ]
+        _compile_to_assembly_r(asm, code.args[1], withargs, existing_labels, break_dest, height)
+        _emit(asm, code, "SWAP" + str(height - withargs[code.args[0].value]), "POP")
 
     # Pass statements
     # TODO remove "dummy"; no longer needed
     elif code.value in ("pass", "dummy"):
-        return []
+        pass
 
     # "mload" from data section of the currently executing code
     elif code.value == "dload":
         loc = code.args[0]
 
-        o = []
         # codecopy 32 bytes to FREE_VAR_SPACE, then mload from FREE_VAR_SPACE
-        o.extend(PUSH(32))
-        o.extend(_data_ofst_of("_sym_code_end", loc, height + 1))
-        o.extend(PUSH(MemoryPositions.FREE_VAR_SPACE) + ["CODECOPY"])
-        o.extend(PUSH(MemoryPositions.FREE_VAR_SPACE) + ["MLOAD"])
-        return o
+        _emit(asm, code, *PUSH(32))
+        _emit_data_ofst(
+            asm, code, "_sym_code_end", loc, withargs, existing_labels, break_dest, height + 1
+        )
+        _emit(asm, code, *PUSH(MemoryPositions.FREE_VAR_SPACE), "CODECOPY")
+        _emit(asm, code, *PUSH(MemoryPositions.FREE_VAR_SPACE), "MLOAD")
 
     # batch copy from data section of the currently executing code to memory
     # (probably should have named this dcopy but oh well)
@@ -321,34 +330,32 @@ def _compile_to_assembly(code, withargs=None, existing_labels=None, break_dest=N
         src = code.args[1]
         len_ = code.args[2]
 
-        o = []
-        o.extend(_compile_to_assembly(len_, withargs, existing_labels, break_dest, height))
-        o.extend(_data_ofst_of("_sym_code_end", src, height + 1))
-        o.extend(_compile_to_assembly(dst, withargs, existing_labels, break_dest, height + 2))
-        o.extend(["CODECOPY"])
-        return o
+        _compile_to_assembly_r(asm, len_, withargs, existing_labels, break_dest, height)
+        _emit_data_ofst(
+            asm, code, "_sym_code_end", src, withargs, existing_labels, break_dest, height + 1
+        )
+        _compile_to_assembly_r(asm, dst, withargs, existing_labels, break_dest, height + 2)
+        _emit(asm, code, "CODECOPY")
 
     # "mload" from the data section of (to-be-deployed) runtime code
     elif code.value == "iload":
         loc = code.args[0]
 
-        o = []
-        o.extend(_data_ofst_of("_mem_deploy_end", loc, height))
-        o.append("MLOAD")
-
-        return o
+        _emit_data_ofst(
+            asm, code, "_mem_deploy_end", loc, withargs, existing_labels, break_dest, height
+        )
+        _emit(asm, code, "MLOAD")
 
     # "mstore" to the data section of (to-be-deployed) runtime code
     elif code.value == "istore":
         loc = code.args[0]
         val = code.args[1]
 
-        o = []
-        o.extend(_compile_to_assembly(val, withargs, existing_labels, break_dest, height))
-        o.extend(_data_ofst_of("_mem_deploy_end", loc, height + 1))
-        o.append("MSTORE")
-
-        return o
+        _compile_to_assembly_r(asm, val, withargs, existing_labels, break_dest, height)
+        _emit_data_ofst(
+            asm, code, "_mem_deploy_end", loc, withargs, existing_labels, break_dest, height + 1
+        )
+        _emit(asm, code, "MSTORE")
 
     # batch copy from memory to the data section of runtime code
     elif code.value == "istorebytes":
@@ -356,25 +363,21 @@ def _compile_to_assembly(code, withargs=None, existing_labels=None, break_dest=N
 
     # If statements (2 arguments, ie. if x: y)
     elif code.value == "if" and len(code.args) == 2:
-        o = []
-        o.extend(_compile_to_assembly(code.args[0], withargs, existing_labels, break_dest, height))
+        _compile_to_assembly_r(asm, code.args[0], withargs, existing_labels, break_dest, height)
         end_symbol = mksymbol("join")
-        o.extend(["ISZERO", end_symbol, "JUMPI"])
-        o.extend(_compile_to_assembly(code.args[1], withargs, existing_labels, break_dest, height))
-        o.extend([end_symbol, "JUMPDEST"])
-        return o
+        _emit(asm, code, "ISZERO", end_symbol, "JUMPI")
+        _compile_to_assembly_r(asm, code.args[1], withargs, existing_labels, break_dest, height)
+        _emit(asm, code, end_symbol, "JUMPDEST")
     # If statements (3 arguments, ie. if x: y, else: z)
     elif code.value == "if" and len(code.args) == 3:
-        o = []
-        o.extend(_compile_to_assembly(code.args[0], withargs, existing_labels, break_dest, height))
+        _compile_to_assembly_r(asm, code.args[0], withargs, existing_labels, break_dest, height)
         mid_symbol = mksymbol("else")
         end_symbol = mksymbol("join")
-        o.extend(["ISZERO", mid_symbol, "JUMPI"])
-        o.extend(_compile_to_assembly(code.args[1], withargs, existing_labels, break_dest, height))
-        o.extend([end_symbol, "JUMP", mid_symbol, "JUMPDEST"])
-        o.extend(_compile_to_assembly(code.args[2], withargs, existing_labels, break_dest, height))
-        o.extend([end_symbol, "JUMPDEST"])
-        return o
+        _emit(asm, code, "ISZERO", mid_symbol, "JUMPI")
+        _compile_to_assembly_r(asm, code.args[1], withargs, existing_labels, break_dest, height)
+        _emit(asm, code, end_symbol, "JUMP", mid_symbol, "JUMPDEST")
+        _compile_to_assembly_r(asm, code.args[2], withargs, existing_labels, break_dest, height)
+        _emit(asm, code, end_symbol, "JUMPDEST")
 
     # repeat(counter_location, start, rounds, rounds_bound, body)
     # basically a do-while loop:
@@ -386,7 +389,6 @@ def _compile_to_assembly(code, withargs=None, existing_labels=None, break_dest=N
     #   } while (++i != start + rounds)
     # }
     elif code.value == "repeat":
-        o = []
         if len(code.args) != 5:  # pragma: nocover
             raise CompilerPanic("bad number of repeat args")
 
@@ -403,71 +405,65 @@ def _compile_to_assembly(code, withargs=None, existing_labels=None, break_dest=N
         )
 
         # stack: []
-        o.extend(_compile_to_assembly(start, withargs, existing_labels, break_dest, height))
+        _compile_to_assembly_r(asm, start, withargs, existing_labels, break_dest, height)
 
-        o.extend(_compile_to_assembly(rounds, withargs, existing_labels, break_dest, height + 1))
+        _compile_to_assembly_r(asm, rounds, withargs, existing_labels, break_dest, height + 1)
 
         # stack: i
 
         # assert rounds <= round_bound
         if rounds != rounds_bound:
             # stack: i, rounds
-            o.extend(
-                _compile_to_assembly(
-                    rounds_bound, withargs, existing_labels, break_dest, height + 2
-                )
+            _compile_to_assembly_r(
+                asm, rounds_bound, withargs, existing_labels, break_dest, height + 2
             )
             # stack: i, rounds, rounds_bound
             # assert 0 <= rounds <= rounds_bound (for rounds_bound < 2**255)
             # TODO this runtime assertion shouldn't fail for
             # internally generated repeats.
-            o.extend(["DUP2", "GT"] + _assert_false())
+            _emit(asm, code, "DUP2", "GT", *_assert_false())
 
             # stack: i, rounds
             # if (0 == rounds) { goto end_dest; }
-            o.extend(["DUP1", "ISZERO", exit_dest, "JUMPI"])
+            _emit(asm, code, "DUP1", "ISZERO", exit_dest, "JUMPI")
 
         # stack: start, rounds
         if start.value != 0:
-            o.extend(["DUP2", "ADD"])
+            _emit(asm, code, "DUP2", "ADD")
 
         # stack: i, exit_i
-        o.extend(["SWAP1"])
+        _emit(asm, code, "SWAP1")
 
         if i_name.value in withargs:
             raise CompilerPanic(f"shadowed loop variable {i_name}")
         withargs[i_name.value] = height + 1
 
         # stack: exit_i, i
-        o.extend([entry_dest, "JUMPDEST"])
-        o.extend(
-            _compile_to_assembly(
-                body, withargs, existing_labels, (exit_dest, continue_dest, height + 2), height + 2
-            )
+        _emit(asm, code, entry_dest, "JUMPDEST")
+        _compile_to_assembly_r(
+            asm, body, withargs, existing_labels, (exit_dest, continue_dest, height + 2), height + 2
         )
 
         del withargs[i_name.value]
 
         # clean up any stack items left by body
-        o.extend(["POP"] * body.valency)
+        _emit(asm, code, *["POP"] * body.valency)
 
         # stack: exit_i, i
         # increment i:
-        o.extend([continue_dest, "JUMPDEST", "PUSH1", 1, "ADD"])
+        _emit(asm, code, continue_dest, "JUMPDEST", "PUSH1", 1, "ADD")
 
         # stack: exit_i, i+1 (new_i)
         # if (exit_i != new_i) { goto entry_dest }
-        o.extend(["DUP2", "DUP2", "XOR", entry_dest, "JUMPI"])
-        o.extend([exit_dest, "JUMPDEST", "POP", "POP"])
-
-        return o
+        _emit(asm, code, "DUP2", "DUP2", "XOR", entry_dest, "JUMPI")
+        _emit(asm, code, exit_dest, "JUMPDEST", "POP", "POP")
 
     # Continue to the next iteration of the for loop
     elif code.value == "continue":
         if not break_dest:
             raise CompilerPanic("Invalid break")
         dest, continue_dest, break_height = break_dest
-        return [continue_dest, "JUMP"]
+        _emit(asm, code, continue_dest, "JUMP")
     # Break from inside a for loop
     elif code.value == "break":
         if not break_dest:
@@ -476,8 +472,8 @@ def _compile_to_assembly(code, withargs=None, existing_labels=None, break_dest=N
 
         n_local_vars = height - break_height
         # clean up any stack items declared in the loop body
-        cleanup_local_vars = ["POP"] * n_local_vars
-        return cleanup_local_vars + [dest, "JUMP"]
+        _emit(asm, code, *["POP"] * n_local_vars)
+        _emit(asm, code, dest, "JUMP")
     # Break from inside one or more for loops prior to a return statement inside the loop
     elif code.value == "cleanup_repeat":
         if not break_dest:
@@ -489,25 +485,21 @@ def _compile_to_assembly(code, withargs=None, existing_labels=None, break_dest=N
             break_height -= 1
         if "return_pc" in withargs:
             break_height -= 1
-        return ["POP"] * break_height
+        _emit(asm, code, *["POP"] * break_height)
     # With statements
     elif code.value == "with":
-        o = []
-        o.extend(_compile_to_assembly(code.args[1], withargs, existing_labels, break_dest, height))
+        _compile_to_assembly_r(asm, code.args[1], withargs, existing_labels, break_dest, height)
         old = withargs.get(code.args[0].value, None)
         withargs[code.args[0].value] = height
-        o.extend(
-            _compile_to_assembly(code.args[2], withargs, existing_labels, break_dest, height + 1)
-        )
+        _compile_to_assembly_r(asm, code.args[2], withargs, existing_labels, break_dest, height + 1)
         if code.args[2].valency:
-            o.extend(["SWAP1", "POP"])
+            _emit(asm, code, "SWAP1", "POP")
         else:
-            o.extend(["POP"])
+            _emit(asm, code, "POP")
         if old is not None:
             withargs[code.args[0].value] = old
         else:
             del withargs[code.args[0].value]
-        return o
 
     # runtime statement (used to deploy runtime code)
     elif code.value == "deploy":
@@ -519,22 +511,19 @@ def _compile_to_assembly(code, withargs=None, existing_labels=None, break_dest=N
 
         runtime_begin = mksymbol("runtime_begin")
 
-        subcode = _compile_to_assembly(ir)
-
-        o = []
-
         # COPY the code to memory for deploy
-        o.extend(["_sym_subcode_size", runtime_begin, "_mem_deploy_start", "CODECOPY"])
+        _emit(asm, code, "_sym_subcode_size", runtime_begin, "_mem_deploy_start", "CODECOPY")
 
         # calculate the len of runtime code
-        o.extend(["_OFST", "_sym_subcode_size", immutables_len])  # stack: len
-        o.extend(["_mem_deploy_start"])  # stack: len mem_ofst
-        o.extend(["RETURN"])
+        _emit(asm, code, "_OFST", "_sym_subcode_size", immutables_len)  # stack: len
+        _emit(asm, code, "_mem_deploy_start")  # stack: len mem_ofst
+        _emit(asm, code, "RETURN")
 
         # since the asm data structures are very primitive, to make sure
         # assembly_to_evm is able to calculate data offsets correctly,
         # we pass the memsize via magic opcodes to the subcode
-        subcode = [RuntimeHeader(runtime_begin, memsize, immutables_len)] + subcode
+        subcode = [RuntimeHeader(runtime_begin, memsize, immutables_len)]
+        _compile_to_assembly_r(subcode, ir, {}, set(), None, 0)
 
         # append the runtime code after the ctor code
         # `append(...)` call here is intentional.
@@ -543,63 +532,53 @@ def _compile_to_assembly(code, withargs=None, existing_labels=None, break_dest=N
         # in the later step when the "ir" block compiled to EVM,
         # symbols in subcode are resolved to position from start of
         # runtime-code (instead of position from start of bytecode).
-        o.append(subcode)
-
-        return o
+        asm.append(subcode)
 
     # Seq (used to piece together multiple statements)
     elif code.value == "seq":
-        o = []
         for arg in code.args:
-            o.extend(_compile_to_assembly(arg, withargs, existing_labels, break_dest, height))
+            _compile_to_assembly_r(asm, arg, withargs, existing_labels, break_dest, height)
             if arg.valency == 1 and arg != code.args[-1]:
-                o.append("POP")
-        return o
+                _emit(asm, code, "POP")
     # Seq without popping.
     # unreachable keyword produces INVALID opcode
     elif code.value == "assert_unreachable":
-        o = _compile_to_assembly(code.args[0], withargs, existing_labels, break_dest, height)
+        _compile_to_assembly_r(asm, code.args[0], withargs, existing_labels, break_dest, height)
         end_symbol = mksymbol("reachable")
-        o.extend([end_symbol, "JUMPI", "INVALID", end_symbol, "JUMPDEST"])
-        return o
+        _emit(asm, code, end_symbol, "JUMPI", "INVALID", end_symbol, "JUMPDEST")
     # Assert (if false, exit)
     elif code.value == "assert":
-        o = _compile_to_assembly(code.args[0], withargs, existing_labels, break_dest, height)
-        o.extend(["ISZERO"])
-        o.extend(_assert_false())
-        return o
+        _compile_to_assembly_r(asm, code.args[0], withargs, existing_labels, break_dest, height)
+        _emit(asm, code, "ISZERO")
+        _emit(asm, code, *_assert_false())
 
     # SHA3 a single value
     elif code.value == "sha3_32":
-        o = _compile_to_assembly(code.args[0], withargs, existing_labels, break_dest, height)
-        o.extend(
-            [
-                *PUSH(MemoryPositions.FREE_VAR_SPACE),
-                "MSTORE",
-                *PUSH(32),
-                *PUSH(MemoryPositions.FREE_VAR_SPACE),
-                "SHA3",
-            ]
+        _compile_to_assembly_r(asm, code.args[0], withargs, existing_labels, break_dest, height)
+        _emit(
+            asm,
+            code,
+            *PUSH(MemoryPositions.FREE_VAR_SPACE),
+            "MSTORE",
+            *PUSH(32),
+            *PUSH(MemoryPositions.FREE_VAR_SPACE),
+            "SHA3",
         )
-        return o
     # SHA3 a 64 byte value
     elif code.value == "sha3_64":
-        o = _compile_to_assembly(code.args[0], withargs, existing_labels, break_dest, height)
-        o.extend(
-            _compile_to_assembly(code.args[1], withargs, existing_labels, break_dest, height + 1)
-        )
-        o.extend(
-            [
-                *PUSH(MemoryPositions.FREE_VAR_SPACE2),
-                "MSTORE",
-                *PUSH(MemoryPositions.FREE_VAR_SPACE),
-                "MSTORE",
-                *PUSH(64),
-                *PUSH(MemoryPositions.FREE_VAR_SPACE),
-                "SHA3",
-            ]
+        _compile_to_assembly_r(asm, code.args[0], withargs, existing_labels, break_dest, height)
+        _compile_to_assembly_r(asm, code.args[1], withargs, existing_labels, break_dest, height + 1)
+        _emit(
+            asm,
+            code,
+            *PUSH(MemoryPositions.FREE_VAR_SPACE2),
+            "MSTORE",
+            *PUSH(MemoryPositions.FREE_VAR_SPACE),
+            "MSTORE",
+            *PUSH(64),
+            *PUSH(MemoryPositions.FREE_VAR_SPACE),
+            "SHA3",
         )
-        return o
     elif code.value == "select":
         # b ^ ((a ^ b) * cond) where cond is 1 or 0
         # let t = a ^ b
@@ -607,22 +586,21 @@ def _compile_to_assembly(code, withargs=None, existing_labels=None, break_dest=N
         a = code.args[1]
         b = code.args[2]
 
-        o = []
-        o.extend(_compile_to_assembly(b, withargs, existing_labels, break_dest, height))
-        o.extend(_compile_to_assembly(a, withargs, existing_labels, break_dest, height + 1))
+        _compile_to_assembly_r(asm, b, withargs, existing_labels, break_dest, height)
+        _compile_to_assembly_r(asm, a, withargs, existing_labels, break_dest, height + 1)
         # stack: b a
-        o.extend(["DUP2", "XOR"])
+        _emit(asm, code, "DUP2", "XOR")
         # stack: b t
-        o.extend(_compile_to_assembly(cond, withargs, existing_labels, break_dest, height + 2))
+        _compile_to_assembly_r(asm, cond, withargs, existing_labels, break_dest, height + 2)
         # stack: b t cond
-        o.extend(["MUL", "XOR"])
+        _emit(asm, code, "MUL", "XOR")
 
         # stack: b ^ (t * cond)
-        return o
 
     # <= operator
     elif code.value == "le":
-        return _compile_to_assembly(
+        _compile_to_assembly_r(
+            asm,
             IRnode.from_list(["iszero", ["gt", code.args[0], code.args[1]]]),
             withargs,
             existing_labels,
@@ -631,7 +609,8 @@ def _compile_to_assembly(code, withargs=None, existing_labels=None, break_dest=N
         )
     # >= operator
     elif code.value == "ge":
-        return _compile_to_assembly(
+        _compile_to_assembly_r(
+            asm,
             IRnode.from_list(["iszero", ["lt", code.args[0], code.args[1]]]),
             withargs,
             existing_labels,
@@ -640,7 +619,8 @@ def _compile_to_assembly(code, withargs=None, existing_labels=None, break_dest=N
         )
     # <= operator
     elif code.value == "sle":
-        return _compile_to_assembly(
+        _compile_to_assembly_r(
+            asm,
             IRnode.from_list(["iszero", ["sgt", code.args[0], code.args[1]]]),
             withargs,
             existing_labels,
@@ -649,7 +629,8 @@ def _compile_to_assembly(code, withargs=None, existing_labels=None, break_dest=N
         )
     # >= operator
     elif code.value == "sge":
-        return _compile_to_assembly(
+        _compile_to_assembly_r(
+            asm,
             IRnode.from_list(["iszero", ["slt", code.args[0], code.args[1]]]),
             withargs,
             existing_labels,
@@ -658,7 +639,8 @@ def _compile_to_assembly(code, withargs=None, existing_labels=None, break_dest=N
         )
     # != operator
     elif code.value == "ne":
-        return _compile_to_assembly(
+        _compile_to_assembly_r(
+            asm,
             IRnode.from_list(["iszero", ["eq", code.args[0], code.args[1]]]),
             withargs,
             existing_labels,
@@ -671,7 +653,8 @@ def _compile_to_assembly(code, withargs=None, existing_labels=None, break_dest=N
         # floor32(x) = x - x % 32 == x & 0b11..100000 == x & (~31)
         # ceil32(x) = floor32(x + 31) == (x + 31) & (~31)
         x = code.args[0]
-        return _compile_to_assembly(
+        _compile_to_assembly_r(
+            asm,
             IRnode.from_list(["and", ["add", x, 31], ["not", 31]]),
             withargs,
             existing_labels,
@@ -690,32 +673,26 @@ def _compile_to_assembly(code, withargs=None, existing_labels=None, break_dest=N
                 data_node.append(c.value)
             elif isinstance(c, IRnode):
                 assert c.value == "symbol"
-                data_node.extend(
-                    _compile_to_assembly(c, withargs, existing_labels, break_dest, height)
-                )
+                _compile_to_assembly_r(data_node, c, withargs, existing_labels, break_dest, height)
             else:
                 raise ValueError(f"Invalid data: {type(c)} {c}")
 
-        # intentionally return a sublist.
-        return [data_node]
+        # intentionally a sublist.
+        asm.append(data_node)
 
     # jump to a symbol, and push variable # of arguments onto stack
     elif code.value == "goto":
-        o = []
         for i, c in enumerate(reversed(code.args[1:])):
-            o.extend(_compile_to_assembly(c, withargs, existing_labels, break_dest, height + i))
-        o.extend(["_sym_" + code.args[0].value, "JUMP"])
-        return o
+            _compile_to_assembly_r(asm, c, withargs, existing_labels, break_dest, height + i)
+        _emit(asm, code, "_sym_" + code.args[0].value, "JUMP")
     elif code.value == "djump":
-        o = []
         # "djump" compiles to a raw EVM jump instruction
         jump_target = code.args[0]
-        o.extend(_compile_to_assembly(jump_target, withargs, existing_labels, break_dest, height))
-        o.append("JUMP")
-        return o
+        _compile_to_assembly_r(asm, jump_target, withargs, existing_labels, break_dest, height)
+        _emit(asm, code, "JUMP")
     # push a literal symbol
     elif code.value == "symbol":
-        return ["_sym_" + code.args[0].value]
+        _emit(asm, code, "_sym_" + code.args[0].value)
     # set a symbol as a location.
     elif code.value == "label":
         label_name = code.args[0].value
@@ -743,15 +720,11 @@ def _compile_to_assembly(code, withargs=None, existing_labels=None, break_dest=N
             withargs[arg.value] = height
             height += 1
 
-        body_asm = _compile_to_assembly(
-            body, withargs=withargs, existing_labels=existing_labels, height=height
-        )
+        _emit(asm, code, "_sym_" + label_name, "JUMPDEST")
+        _compile_to_assembly_r(asm, body, withargs, existing_labels, None, height)
         # pop_scoped_vars = ["POP"] * height
         # for now, _rewrite_return_sequences forces
         # label params to be consumed implicitly
-        pop_scoped_vars = []
-
-        return ["_sym_" + label_name, "JUMPDEST"] + body_asm + pop_scoped_vars
 
     elif code.value == "unique_symbol":
         symbol = code.args[0].value
@@ -762,17 +735,15 @@ def _compile_to_assembly(code, withargs=None, existing_labels=None, break_dest=N
         else:
             existing_labels.add(symbol)
 
-        return []
-
     elif code.value == "exit_to":
         raise CodegenPanic("exit_to not implemented yet!")
 
     # inject debug opcode.
     elif code.value == "debugger":
-        return mkdebug(pc_debugger=False, ast_source=code.ast_source)
+        _emit(asm, code, *mkdebug(pc_debugger=False, ast_source=code.ast_source))
     # inject debug opcode.
     elif code.value == "pc_debugger":
-        return mkdebug(pc_debugger=True, ast_source=code.ast_source)
+        _emit(asm, code, *mkdebug(pc_debugger=True, ast_source=code.ast_source))
     else:  # pragma: no cover
         raise ValueError(f"Weird code element: {type(code)} {code}")
 
@@ -809,12 +780,27 @@ def note_breakpoint(line_number_map, pc, item):
 _TERMINAL_OPS = ("JUMP", "RETURN", "REVERT", "STOP", "INVALID")
 
 
+# the peephole passes below scan the assembly from left to right. rather
+# than deleting from the middle of the list (which is O(n) per deletion),
+# the items behind the cursor are moved to an output list, and rewrites
+# of the items under the cursor are written back into the input, in front
+# of the cursor (rewrites never make the assembly longer). this way, each
+# pass is linear in the length of the assembly.
+def _rewrite(assembly, i, n, items):
+    # replace assembly[i : i + n] with `items`, return the new cursor
+    i += n - len(items)
+    assembly[i : i + len(items)] = items
+    return i
+
+
 def _prune_unreachable_code(assembly):
     # delete code between terminal ops and JUMPDESTS as those are
     # unreachable
     changed = False
+    out = []
     i = 0
     while i < len(assembly) - 1:
+        out.append(assembly[i])
         if assembly[i] in _TERMINAL_OPS:
             # find the next jumpdest or sublist
             for j in range(i + 1, len(assembly)):
@@ -831,16 +817,20 @@ def _prune_unreachable_code(assembly):
                 # without finding an jumpdest or sublist
                 j = len(assembly)
             changed = j > i + 1
-            del assembly[i + 1 : j]
-
-        i += 1
+            # drop assembly[i + 1 : j]
+            i = j
+        else:
+            i += 1
 
+    out.extend(assembly[i:])
+    assembly[:] = out
     return changed
 
 
 def _prune_inefficient_jumps(assembly):
     # prune sequences `_sym_x JUMP _sym_x JUMPDEST` to `_sym_x JUMPDEST`
     changed = False
+    out = []
     i = 0
     while i < len(assembly) - 4:
         if (
@@ -851,10 +841,13 @@ def _prune_inefficient_jumps(assembly):
         ):
             # delete _sym_x JUMP
             changed = True
-            del assembly[i : i + 2]
+            i += 2
         else:
+            out.append(assembly[i])
             i += 1
 
+    out.extend(assembly[i:])
+    assembly[:] = out
     return changed
 
 
@@ -862,6 +855,7 @@ def _optimize_inefficient_jumps(assembly):
     # optimize sequences `_sym_common JUMPI _sym_x JUMP _sym_common JUMPDEST`
     # to `ISZERO _sym_x JUMPI _sym_common JUMPDEST`
     changed = False
+    out = []
     i = 0
     while i < len(assembly) - 6:
         if (
@@ -873,13 +867,13 @@ def _optimize_inefficient_jumps(assembly):
             and assembly[i + 5] == "JUMPDEST"
         ):
             changed = True
-            assembly[i] = "ISZERO"
-            assembly[i + 1] = assembly[i + 2]
-            assembly[i + 2] = "JUMPI"
-            del assembly[i + 3 : i + 4]
+            i = _rewrite(assembly, i, 4, ["ISZERO", assembly[i + 2], "JUMPI"])
         else:
+            out.append(assembly[i])
             i += 1
 
+    out.extend(assembly[i:])
+    assembly[:] = out
     return changed
 
 
@@ -890,6 +884,24 @@ def _merge_jumpdests(assembly):
     # (Usually a chain of JUMPs is created by a nested block,
     # or some nested if statements.)
     changed = False
+
+    # the positions of each symbol, so that a symbol can be replaced
+    # without scanning the whole assembly
+    uses: dict[str, list[int]] = {}
+    for i, item in enumerate(assembly):
+        if is_symbol(item):
+            uses.setdefault(item, []).append(i)
+
+    def _replace_symbol(i, old, new):
+        # replace all instances of `old` with `new`, except at `i`
+        positions = uses.pop(old)
+        replaced = [j for j in positions if j != i]
+        uses[old] = [j for j in positions if j == i]
+        for j in replaced:
+            assembly[j] = new
+        uses.setdefault(new, []).extend(replaced)
+        return len(replaced) > 0
+
     i = 0
     while i < len(assembly) - 3:
         if is_symbol(assembly[i]) and assembly[i + 1] == "JUMPDEST":
@@ -900,19 +912,13 @@ def _merge_jumpdests(assembly):
                 # (except for _sym_x JUMPDEST - don't want duplicate labels)
                 new_symbol = assembly[i + 2]
                 if new_symbol != current_symbol:
-                    for j in range(len(assembly)):
-                        if assembly[j] == current_symbol and i != j:
-                            assembly[j] = new_symbol
-                            changed = True
+                    changed |= _replace_symbol(i, current_symbol, new_symbol)
             elif is_symbol(assembly[i + 2]) and assembly[i + 3] == "JUMP":
                 # _sym_x JUMPDEST _sym_y JUMP
                 # replace all instances of _sym_x with _sym_y
                 # (except for _sym_x JUMPDEST - don't want duplicate labels)
                 new_symbol = assembly[i + 2]
-                for j in range(len(assembly)):
-                    if assembly[j] == current_symbol and i != j:
-                        assembly[j] = new_symbol
-                        changed = True
+                changed |= _replace_symbol(i, current_symbol, new_symbol)
 
         i += 1
 
@@ -936,6 +942,7 @@ _RETURNS_ZERO_OR_ONE = {
 def _merge_iszero(assembly):
     changed = False
 
+    out = []
     i = 0
     # list of opcodes that return 0 or 1
     while i < len(assembly) - 2:
@@ -946,9 +953,14 @@ def _merge_iszero(assembly):
         ):
             changed = True
             # drop the extra iszeros
-            del assembly[i + 1 : i + 3]
+            i = _rewrite(assembly, i, 3, [assembly[i]])
         else:
+            out.append(assembly[i])
             i += 1
+    out.extend(assembly[i:])
+    assembly[:] = out
+
+    out = []
     i = 0
     while i < len(assembly) - 3:
         # ISZERO ISZERO could map truthy to 1,
@@ -959,9 +971,12 @@ def _merge_iszero(assembly):
             and assembly[i + 3] == "JUMPI"
         ):
             changed = True
-            del assembly[i : i + 2]
+            i += 2
         else:
+            out.append(assembly[i])
             i += 1
+    out.extend(assembly[i:])
+    assembly[:] = out
 
     return changed
 
@@ -993,40 +1008,43 @@ def _prune_unused_jumpdests(assembly):
                     used_jumpdests.add(t)
 
     # delete jumpdests that aren't used
+    out = []
     i = 0
     while i < len(assembly) - 2:
         if is_symbol(assembly[i]) and assembly[i] not in used_jumpdests:
             changed = True
-            del assembly[i : i + 2]
+            i += 2
         else:
+            out.append(assembly[i])
             i += 1
 
+    out.extend(assembly[i:])
+    assembly[:] = out
     return changed
 
 
 def _stack_peephole_opts(assembly):
     changed = False
+    out = []
     i = 0
     while i < len(assembly) - 2:
         if assembly[i : i + 3] == ["DUP1", "SWAP2", "SWAP1"]:
             changed = True
-            del assembly[i + 2]
-            assembly[i] = "SWAP1"
-            assembly[i + 1] = "DUP2"
+            i = _rewrite(assembly, i, 3, ["SWAP1", "DUP2"])
             continue
         # usually generated by with statements that return their input like
         # (with x (...x))
         if assembly[i : i + 3] == ["DUP1", "SWAP1", "POP"]:
             # DUP1 SWAP1 POP == no-op
             changed = True
-            del assembly[i : i + 3]
+            i += 3
             continue
         # usually generated by nested with statements that don't return like
         # (with x (with y ...))
         if assembly[i : i + 3] == ["SWAP1", "POP", "POP"]:
             # SWAP1 POP POP == POP POP
             changed = True
-            del assembly[i]
+            i += 1
             continue
         if (
             isinstance(assembly[i], str)
@@ -1034,15 +1052,18 @@ def _stack_peephole_opts(assembly):
             and assembly[i] == assembly[i + 1]
         ):
             changed = True
-            del assembly[i : i + 2]
+            i += 2
         if assembly[i] == "SWAP1" and assembly[i + 1].lower() in COMMUTATIVE_OPS:
             changed = True
-            del assembly[i]
+            i += 1
         if assembly[i] == "DUP1" and assembly[i + 1] == "SWAP1":
             changed = True
-            del assembly[i + 1]
+            i = _rewrite(assembly, i, 2, [assembly[i]])
+        out.append(assembly[i])
         i += 1
 
+    out.extend(assembly[i:])
+    assembly[:] = out
     return changed
 
 
@@ -1162,21 +1183,237 @@ def _relocate_segments(assembly):
     assembly.extend(data_segments)
 
 
+# integer-coded assembly. both code generators build their assembly as a
+# list of `Instruction`s (which is convenient for the peephole passes), and
+# then encode it with `encode_assembly()`, so that the assembler (and the
+# cached `CompilerData.assembly` phases) work on small ints rather than
+# re-parsing strings. the textual assembly is only rendered on demand.
+_ASM_OPCODE = 0  # arg: opcode byte
+_ASM_BYTE = 1  # arg: immediate byte
+_ASM_PUSH_SYMBOL = 2  # arg: symbol
+_ASM_LABEL = 3  # arg: symbol (location of the following JUMPDEST)
+_ASM_PUSH_MEM_SYMBOL = 4  # arg: memory symbol
+_ASM_PUSH_OFST = 5  # arg: (symbol, offset, index of the symbol's source)
+_ASM_DEBUG = 6  # arg: None
+_ASM_RUNTIME = 7  # arg: runtime segment (`EncodedAssembly`)
+_ASM_DATA = 8  # arg: data segment
+
+_NO_SOURCE = -1
+
+_JUMP = OPCODES["JUMP"][0]
+_JUMPI = OPCODES["JUMPI"][0]
+_JUMPDEST = OPCODES["JUMPDEST"][0]
+
+
+def _add_stack_opcodes(table: dict[str, int]) -> dict[str, int]:
+    # PUSH<n>, DUP<n> and SWAP<n> are encodable independently of the evm
+    # version (i.e. PUSH0 before shanghai).
+    table.update((f"PUSH{n}", PUSH_OFFSET + n) for n in range(33))
+    table.update((f"DUP{n}", DUP_OFFSET + n) for n in range(1, 17))
+    table.update((f"SWAP{n}", SWAP_OFFSET + n) for n in range(1, 17))
+    return table
+
+
+@functools.lru_cache(maxsize=None)
+def _opcode_bytes(evm_version: int) -> dict[str, int]:
+    # mnemonic -> opcode byte, for the active evm version (`evm_version`
+    # is only the cache key).
+    return _add_stack_opcodes({k: v[0] for k, v in get_opcodes().items() if v[0] is not None})
+
+
+@functools.lru_cache(maxsize=None)
+def _opcode_names() -> dict[int, str]:
+    # opcode byte -> mnemonic, for rendering. aliases (e.g. DIFFICULTY and
+    # PREVRANDAO) map to the first name, `EncodedAssembly` keeps the others.
+    ret: dict[int, str] = {}
+    table = _add_stack_opcodes({k: v[0] for k, v in OPCODES.items() if v[0] is not None})
+    for name, value in table.items():
+        ret.setdefault(value, name)
+    return ret
+
+
+@dataclass
+class EncodedAssembly:
+    """
+    A segment of integer-coded assembly.
+
+    Attributes
+    ----------
+    kinds : bytearray
+        The kind (`_ASM_*`) of each item.
+    args : list
+        The argument of each item, e.g. the opcode byte, or the symbol.
+    source_ixs : array
+        For each item, the index into `sources` of its source information,
+        or -1 if it has none.
+    sources : list
+        The distinct source information (AST node and error message) of
+        the items, as `Instruction`s.
+    names : dict
+        The mnemonic of the opcodes which are not spelled the way
+        `_opcode_names()` renders them, by item index.
+    header : RuntimeHeader, optional
+        The header of a runtime segment.
+    """
+
+    kinds: bytearray = field(default_factory=bytearray)
+    args: list = field(default_factory=list)
+    source_ixs: array = field(default_factory=lambda: array("i"))
+    sources: list = field(default_factory=list)
+    names: dict[int, str] = field(default_factory=dict)
+    header: Optional[RuntimeHeader] = None
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def decode(self) -> list:
+        """
+        Render the items back into a list of mnemonics, symbols and ints
+        (e.g. for `-f asm`).
+        """
+        opcode_names = _opcode_names()
+        ret: list = []
+        for i, (kind, arg) in enumerate(zip(self.kinds, self.args)):
+            if kind == _ASM_OPCODE:
+                ret.append(self.names.get(i) or opcode_names[arg])
+            elif kind == _ASM_PUSH_OFST:
+                symbol, ofst, _ = arg
+                ret.extend(["_OFST", symbol, ofst])
+            elif kind == _ASM_DEBUG:
+                ret.append("DEBUG")
+            elif kind == _ASM_RUNTIME:
+                ret.append([arg.header, *arg.decode()])
+            elif kind == _ASM_DATA:
+                ret.append(list(arg))
+            else:
+                # bytes and symbols
+                ret.append(arg)
+        return ret
+
+
+def encode_assembly(assembly: list, header: Optional[RuntimeHeader] = None) -> EncodedAssembly:
+    """
+    Encode a segment of assembly (and, recursively, its runtime segment).
+    An `_OFST <symbol> <offset>` triple is encoded as a single item.
+    """
+    opcodes = _opcode_bytes(get_active_evm_version())
+
+    ret = EncodedAssembly(header=header)
+    kinds, args = ret.kinds, ret.args
+    # (ast node, error message) -> index into `ret.sources`
+    source_ixs: dict[tuple, int] = {}
+
+    def _source_ix(item):
+        if not isinstance(item, Instruction):
+            return _NO_SOURCE
+        if item == "DEBUG":
+            # carries `pc_debugger`, don't share it
+            ret.sources.append(item)
+            return len(ret.sources) - 1
+        if item.ast_source is None and item.error_msg is None:
+            return _NO_SOURCE
+        key = (id(item.ast_source), item.error_msg)
+        if key not in source_ixs:
+            source_ixs[key] = len(ret.sources)
+            ret.sources.append(item)
+        return source_ixs[key]
+
+    arg: Any
+    i = 0
+    while i < len(assembly):
+        item = assembly[i]
+        source_ix = _source_ix(item)
+
+        if isinstance(item, int):
+            kind, arg = _ASM_BYTE, item
+        elif isinstance(item, list) and isinstance(item[0], RuntimeHeader):
+            kind, arg = _ASM_RUNTIME, encode_assembly(item[1:], header=item[0])
+        elif isinstance(item, list) and isinstance(item[0], DataHeader):
+            kind, arg = _ASM_DATA, item
+        elif not isinstance(item, str):  # pragma: no cover
+            raise ValueError(f"Weird symbol in assembly: {type(item)} {item}")
+        elif item == "DEBUG":
+            kind, arg = _ASM_DEBUG, None
+        elif is_symbol(item):
+            if is_symbol_map_indicator(assembly[i + 1]):
+                kind = _ASM_LABEL
+            else:
+                kind = _ASM_PUSH_SYMBOL
+            arg = str(item)
+        elif is_mem_sym(item):
+            kind, arg = _ASM_PUSH_MEM_SYMBOL, str(item)
+        elif is_ofst(item):
+            # [_OFST, _sym_foo, bar] -> PUSH2 (foo+bar)
+            # [_OFST, _mem_foo, bar] -> PUSHN (foo+bar)
+            symbol, ofst = assembly[i + 1], assembly[i + 2]
+            assert is_symbol(symbol) or is_mem_sym(symbol)
+            assert isinstance(ofst, int)
+            kind, arg = _ASM_PUSH_OFST, (str(symbol), ofst, _source_ix(symbol))
+            i += 2
+        else:
+            kind = _ASM_OPCODE
+            arg = opcodes.get(item)
+            if arg is None:
+                arg = opcodes.get(item.upper())
+            if arg is None:  # pragma: no cover
+                raise ValueError(f"Weird symbol in assembly: {type(item)} {item}")
+            if _opcode_names()[arg] != item:
+                ret.names[len(kinds)] = str(item)
+
+        kinds.append(kind)
+        args.append(arg)
+        ret.source_ixs.append(source_ix)
+        i += 1
+
+    return ret
+
+
+@dataclass
+class AssembledCode:
+    """
+    The result of assembling a segment of assembly.
+
+    Attributes
+    ----------
+    bytecode : bytes
+        The bytecode, including the compiler metadata (if any).
+    pc_maps : dict
+        Breakpoints, jump types, AST nodes and error messages by pc.
+    symbol_map : dict
+        The location of each symbol.
+    code_len : int
+        The length of the bytecode, excluding the compiler metadata.
+    """
+
+    bytecode: bytes
+    pc_maps: dict
+    symbol_map: dict
+    code_len: int
+
+
 # TODO: change API to split assembly_to_evm and assembly_to_source/symbol_maps
 def assembly_to_evm(assembly, pc_ofst=0, compiler_metadata=None):
-    bytecode, source_maps, _ = assembly_to_evm_with_symbol_map(
-        assembly, pc_ofst=pc_ofst, compiler_metadata=compiler_metadata
-    )
-    return bytecode, source_maps
+    ret = assemble(assembly, compiler_metadata=compiler_metadata)
+    return ret.bytecode, ret.pc_maps
 
 
 def assembly_to_evm_with_symbol_map(assembly, pc_ofst=0, compiler_metadata=None):
+    ret = assemble(assembly, compiler_metadata=compiler_metadata)
+    return ret.bytecode, ret.pc_maps, ret.symbol_map
+
+
+def _push_n(x, n):
+    # PUSH<n> x, as bytecode
+    assert 0 <= x < 256**n
+    return (((PUSH_OFFSET + n) << (8 * n)) + x).to_bytes(n + 1, "big")
+
+
+def assemble(assembly, compiler_metadata=None):
     """
     Assembles assembly into EVM
 
-    assembly: list of asm instructions
-    pc_ofst: when constructing the source map, the amount to offset all
-             pcs by (no effect until we add deploy code source map)
+    assembly: encoded assembly (or a list of asm instructions, which is
+              encoded first)
     compiler_metadata: any compiler metadata to add. pass `None` to indicate
                        no metadata to be added (should always be `None` for
                        runtime code). the value is opaque, and will be passed
@@ -1193,6 +1430,11 @@ def assembly_to_evm_with_symbol_map(assembly, pc_ofst=0, compiler_metadata=None)
     pc = 0
     symbol_map = {}
 
+    if not isinstance(assembly, EncodedAssembly):
+        assembly = encode_assembly(assembly)
+    kinds, args = assembly.kinds, assembly.args
+    sources, source_ixs = assembly.sources, assembly.source_ixs
+
     runtime_code, runtime_code_start, runtime_code_end = None, None, None
 
     # to optimize the size of deploy code - we want to use the smallest
@@ -1202,22 +1444,23 @@ def assembly_to_evm_with_symbol_map(assembly, pc_ofst=0, compiler_metadata=None)
     # and use that to calculate mem_ofst_size.
     mem_ofst_size, ctor_mem_size = None, None
     max_mem_ofst = 0
-    for i, item in enumerate(assembly):
-        if isinstance(item, list) and isinstance(item[0], RuntimeHeader):
+    for kind, arg in zip(kinds, args):
+        if kind == _ASM_RUNTIME:
             assert runtime_code is None, "Multiple subcodes"
 
             assert ctor_mem_size is None
-            ctor_mem_size = item[0].ctor_mem_size
+            ctor_mem_size = arg.header.ctor_mem_size
 
-            runtime_code, runtime_map = assembly_to_evm(item[1:])
+            runtime = assemble(arg)
+            runtime_code, runtime_map = runtime.bytecode, runtime.pc_maps
 
             runtime_code_start, runtime_code_end = _runtime_code_offsets(
                 ctor_mem_size, len(runtime_code)
             )
             assert runtime_code_end - runtime_code_start == len(runtime_code)
 
-        if is_ofst(item) and is_mem_sym(assembly[i + 1]):
-            max_mem_ofst = max(assembly[i + 2], max_mem_ofst)
+        elif kind == _ASM_PUSH_OFST and is_mem_sym(arg[0]):
+            max_mem_ofst = max(arg[1], max_mem_ofst)
 
     if runtime_code_end is not None:
         mem_ofst_size = calc_mem_ofst_size(runtime_code_end + max_mem_ofst)
@@ -1227,65 +1470,74 @@ def assembly_to_evm_with_symbol_map(assembly, pc_ofst=0, compiler_metadata=None)
 
     # go through the code, resolving symbolic locations
     # (i.e. JUMPDEST locations) to actual code locations
-    for i, item in enumerate(assembly):
-        note_line_num(line_number_map, pc, item)
-        if item == "DEBUG":
-            continue  # skip debug
-
-        # update pc_jump_map
-        if item == "JUMP":
-            last = assembly[i - 1]
-            if is_symbol(last) and last.startswith("_sym_internal"):
-                if last.endswith("cleanup"):
-                    # exit an internal function
-                    line_number_map["pc_jump_map"][pc] = "o"
+    for i, kind in enumerate(kinds):
+        arg = args[i]
+        if (source_ix := source_ixs[i]) != _NO_SOURCE:
+            note_line_num(line_number_map, pc, sources[source_ix])
+
+        if kind == _ASM_OPCODE:
+            # update pc_jump_map
+            if arg == _JUMP:
+                if kinds[i - 1] == _ASM_PUSH_SYMBOL and args[i - 1].startswith("_sym_internal"):
+                    if args[i - 1].endswith("cleanup"):
+                        # exit an internal function
+                        line_number_map["pc_jump_map"][pc] = "o"
+                    else:
+                        # enter an internal function
+                        line_number_map["pc_jump_map"][pc] = "i"
                 else:
-                    # enter an internal function
-                    line_number_map["pc_jump_map"][pc] = "i"
-            else:
-                # everything else
+                    # everything else
+                    line_number_map["pc_jump_map"][pc] = "-"
+            elif arg in (_JUMPI, _JUMPDEST):
                 line_number_map["pc_jump_map"][pc] = "-"
-        elif item in ("JUMPI", "JUMPDEST"):
-            line_number_map["pc_jump_map"][pc] = "-"
+            pc += 1
 
-        # update pc
-        if is_symbol(item):
-            if is_symbol_map_indicator(assembly[i + 1]):
-                # Don't increment pc as the symbol itself doesn't go into code
-                if item in symbol_map:
-                    raise CompilerPanic(f"duplicate jumpdest {item}")
+        elif kind == _ASM_BYTE:
+            pc += 1
 
-                symbol_map[item] = pc
-            else:
-                pc += SYMBOL_SIZE + 1  # PUSH2 highbits lowbits
-        elif is_mem_sym(item):
+        elif kind == _ASM_LABEL:
+            # Don't increment pc as the symbol itself doesn't go into code
+            if arg in symbol_map:
+                raise CompilerPanic(f"duplicate jumpdest {arg}")
+
+            symbol_map[arg] = pc
+
+        elif kind == _ASM_PUSH_SYMBOL:
+            pc += SYMBOL_SIZE + 1  # PUSH2 highbits lowbits
+
+        elif kind == _ASM_PUSH_MEM_SYMBOL:
             # PUSH<n> item
             pc += mem_ofst_size + 1
-        elif is_ofst(item):
-            assert is_symbol(assembly[i + 1]) or is_mem_sym(assembly[i + 1])
-            assert isinstance(assembly[i + 2], int)
-            # [_OFST, _sym_foo, bar] -> PUSH2 (foo+bar)
-            # [_OFST, _mem_foo, bar] -> PUSHN (foo+bar)
-            pc -= 1
-        elif isinstance(item, list) and isinstance(item[0], RuntimeHeader):
+
+        elif kind == _ASM_PUSH_OFST:
+            symbol, _, symbol_source_ix = arg
+            # the symbol is located at the PUSH opcode
+            if symbol_source_ix != _NO_SOURCE:
+                note_line_num(line_number_map, pc - 1, sources[symbol_source_ix])
+            if is_mem_sym(symbol):
+                pc += mem_ofst_size + 1
+            else:
+                pc += SYMBOL_SIZE + 1
+
+        elif kind == _ASM_RUNTIME:
             # we are in initcode
-            symbol_map[item[0].label] = pc
+            symbol_map[arg.header.label] = pc
             # add source map for all items in the runtime map
             t = adjust_pc_maps(runtime_map, pc)
             for key in line_number_map:
                 line_number_map[key].update(t[key])
-            immutables_len = item[0].immutables_len
+            immutables_len = arg.header.immutables_len
             pc += len(runtime_code)
             # grab lengths of data sections from the runtime
-            for t in item:
-                if isinstance(t, list) and isinstance(t[0], DataHeader):
-                    data_section_lengths.append(_length_of_data(t))
+            for runtime_kind, runtime_arg in zip(arg.kinds, arg.args):
+                if runtime_kind == _ASM_DATA:
+                    data_section_lengths.append(_length_of_data(runtime_arg))
 
-        elif isinstance(item, list) and isinstance(item[0], DataHeader):
-            symbol_map[item[0].label] = pc
-            pc += _length_of_data(item)
-        else:
-            pc += 1
+        elif kind == _ASM_DATA:
+            symbol_map[arg[0].label] = pc
+            pc += _length_of_data(arg)
+
+        # _ASM_DEBUG does not go into code
 
     bytecode_suffix = b""
     if compiler_metadata is not None:
@@ -1318,53 +1570,34 @@ def assembly_to_evm_with_symbol_map(assembly, pc_ofst=0, compiler_metadata=None)
 
     # now that all symbols have been resolved, generate bytecode
     # using the symbol map
-    to_skip = 0
-    for i, item in enumerate(assembly):
-        if to_skip > 0:
-            to_skip -= 1
-            continue
-
-        if item in ("DEBUG",):
-            continue  # skippable opcodes
+    for kind, arg in zip(kinds, args):
+        if kind == _ASM_OPCODE or kind == _ASM_BYTE:
+            ret.append(arg)
 
-        elif is_symbol(item):
+        elif kind == _ASM_PUSH_SYMBOL:
             # push a symbol to stack
-            if not is_symbol_map_indicator(assembly[i + 1]):
-                bytecode, _ = assembly_to_evm(PUSH_N(symbol_map[item], n=SYMBOL_SIZE))
-                ret.extend(bytecode)
+            ret.extend(_push_n(symbol_map[arg], SYMBOL_SIZE))
 
-        elif is_mem_sym(item):
-            bytecode, _ = assembly_to_evm(PUSH_N(symbol_map[item], n=mem_ofst_size))
-            ret.extend(bytecode)
+        elif kind == _ASM_PUSH_MEM_SYMBOL:
+            ret.extend(_push_n(symbol_map[arg], mem_ofst_size))
 
-        elif is_ofst(item):
+        elif kind == _ASM_PUSH_OFST:
             # _OFST _sym_foo 32
-            ofst = symbol_map[assembly[i + 1]] + assembly[i + 2]
-            n = mem_ofst_size if is_mem_sym(assembly[i + 1]) else SYMBOL_SIZE
-            bytecode, _ = assembly_to_evm(PUSH_N(ofst, n))
-            ret.extend(bytecode)
-            to_skip = 2
+            symbol, ofst, _ = arg
+            n = mem_ofst_size if is_mem_sym(symbol) else SYMBOL_SIZE
+            ret.extend(_push_n(symbol_map[symbol] + ofst, n))
 
-        elif isinstance(item, int):
-            ret.append(item)
-        elif isinstance(item, str) and item.upper() in get_opcodes():
-            ret.append(get_opcodes()[item.upper()][0])
-        elif item[:4] == "PUSH":
-            ret.append(PUSH_OFFSET + int(item[4:]))
-        elif item[:3] == "DUP":
-            ret.append(DUP_OFFSET + int(item[3:]))
-        elif item[:4] == "SWAP":
-            ret.append(SWAP_OFFSET + int(item[4:]))
-        elif isinstance(item, list) and isinstance(item[0], RuntimeHeader):
+        elif kind == _ASM_RUNTIME:
             ret.extend(runtime_code)
-        elif isinstance(item, list) and isinstance(item[0], DataHeader):
-            ret.extend(_data_to_evm(item, symbol_map))
-        else:  # pragma: no cover
-            # unreachable
-            raise ValueError(f"Weird symbol in assembly: {type(item)} {item}")
 
+        elif kind == _ASM_DATA:
+            ret.extend(_data_to_evm(arg, symbol_map))
+
+        # labels and DEBUG do not go into code
+
+    code_len = len(ret)
     ret.extend(bytecode_suffix)
 
     line_number_map["breakpoints"] = list(line_number_map["breakpoints"])
     line_number_map["pc_breakpoints"] = list(line_number_map["pc_breakpoints"])
-    return bytes(ret), line_number_map, symbol_map
+    return AssembledCode(bytes(ret), line_number_map, symbol_map, code_len)
@@ -2,6 +2,7 @@ from vyper import ast as vy_ast
 from vyper.exceptions import InvalidLiteral, UnfoldableNode, VyperException
 from vyper.semantics.analysis.base import VarInfo
 from vyper.semantics.analysis.common import VyperNodeVisitorBase
+from vyper.semantics.analysis.dependencies import DeclarationGraph
 from vyper.semantics.namespace import get_namespace
 
 
@@ -22,37 +23,31 @@ class ConstantFolder(VyperNodeVisitorBase):
         module = self._module_ast
         const_var_decls = module.get_children(vy_ast.VariableDecl, {"is_constant": True})
 
-        while True:
-            n_processed = 0
+        # fold the constants in the order of their dependencies on each
+        # other. constants which are part of a cycle are left for last,
+        # the cycle is reported by the module analyzer.
+        graph = DeclarationGraph(const_var_decls, get_namespace())
+        sorted_decls, remaining = graph.toposort()
 
-            for c in const_var_decls.copy():
-                # visit the entire constant node in case its type annotation
-                # has unfolded constants in it.
-                self.visit(c)
+        for c in sorted_decls + remaining:
+            # visit the entire constant node in case its type annotation
+            # has unfolded constants in it.
+            self.visit(c)
 
-                assert c.value is not None  # guaranteed by VariableDecl.validate()
-                try:
-                    val = c.value.get_folded_value()
-                except UnfoldableNode:
-                    # not foldable, maybe it depends on other constants
-                    # so try again later
-                    continue
-
-                # note that if a constant is redefined, its value will be
-                # overwritten, but it is okay because the error is handled
-                # downstream
-                name = c.target.id
-                self._constants[name] = val
-
-                n_processed += 1
-                const_var_decls.remove(c)
-
-            if n_processed == 0:
-                # this condition means that there are some constant vardecls
-                # whose values are not foldable. this can happen for struct
-                # and interface constants for instance. these are valid constant
-                # declarations, but we just can't fold them at this stage.
-                break
+            assert c.value is not None  # guaranteed by VariableDecl.validate()
+            try:
+                val = c.value.get_folded_value()
+            except UnfoldableNode:
+                # this can happen for struct and interface constants for
+                # instance. these are valid constant declarations, but we
+                # just can't fold them at this stage.
+                continue
+
+            # note that if a constant is redefined, its value will be
+            # overwritten, but it is okay because the error is handled
+            # downstream
+            name = c.target.id
+            self._constants[name] = val
 
     def visit(self, node):
         if node.has_folded_value:
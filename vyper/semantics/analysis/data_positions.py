@@ -22,6 +22,8 @@ def set_data_positions(
     vyper_module : vy_ast.Module
         Top-level Vyper AST node that has already been annotated with type data.
     """
+    _reset_positions(vyper_module)
+
     if storage_layout_overrides is not None:
         # allocate code layout with no overrides
         _allocate_layout_r(vyper_module, no_storage=True)
@@ -38,6 +40,23 @@ def set_data_positions(
         _allocate_layout_r(vyper_module)
 
 
+def _reset_positions(vyper_module: vy_ast.Module) -> None:
+    # imported modules can be shared between compilations (cf.
+    # `ModuleCache`), clear positions allocated by a previous compilation.
+    module_t = vyper_module._metadata["type"]
+    module_ts = [module_t]
+    for info in module_t.reachable_imports:
+        if isinstance(info.parsed, vy_ast.Module):
+            module_ts.append(info.parsed._metadata["type"])
+
+    for t in module_ts:
+        for varinfo in t.variables.values():
+            varinfo.position = None
+        for fn_t in t.functions.values():
+            if hasattr(fn_t, "reentrancy_key_position"):
+                del fn_t.reentrancy_key_position
+
+
 _T = TypeVar("_T")
 _K = TypeVar("_K")
 
@@ -0,0 +1,135 @@
+import heapq
+from typing import Container, Optional
+
+from vyper import ast as vy_ast
+from vyper.exceptions import StructureException
+
+
+def _declared_name(node: vy_ast.VyperNode) -> Optional[str]:
+    if isinstance(node, vy_ast.VariableDecl):
+        return node.target.id
+    if isinstance(node, (vy_ast.FlagDef, vy_ast.StructDef, vy_ast.InterfaceDef, vy_ast.EventDef)):
+        return node.name
+    # functions are referenced through `self`, never by name
+    return None
+
+
+def _signature_exprs(node: vy_ast.FunctionDef) -> list:
+    ret = [arg.annotation for arg in node.args.args]
+    ret.extend(node.args.defaults)
+    ret.append(node.returns)
+    return ret
+
+
+def _referenced_names(node: vy_ast.VyperNode) -> set[str]:
+    # the expressions of a declaration which can refer to other
+    # declarations. note that e.g. struct member names and function
+    # bodies are left out, they do not need to be resolved to analyze
+    # the declaration itself.
+    exprs: list
+    if isinstance(node, vy_ast.VariableDecl):
+        exprs = [node.annotation, node.value]
+    elif isinstance(node, (vy_ast.StructDef, vy_ast.EventDef)):
+        exprs = [n.annotation for n in node.body if isinstance(n, vy_ast.AnnAssign)]
+    elif isinstance(node, vy_ast.InterfaceDef):
+        exprs = []
+        for fn in node.body:
+            if isinstance(fn, vy_ast.FunctionDef):
+                exprs.extend(_signature_exprs(fn))
+    elif isinstance(node, vy_ast.FunctionDef):
+        exprs = _signature_exprs(node)
+    else:
+        exprs = []
+
+    ret = set()
+    for expr in exprs:
+        if expr is None:
+            continue
+        for name_node in expr.get_descendants(vy_ast.Name, include_self=True):
+            ret.add(name_node.id)
+    return ret
+
+
+class DeclarationGraph:
+    """
+    Dependency graph between top-level declarations, built from the
+    names which each declaration refers to.
+
+    Names which are already in `namespace` (e.g. builtin types) refer to
+    the existing definitions, a declaration which reuses one of them is
+    reported as a namespace collision when it is visited.
+    """
+
+    def __init__(self, nodes: list[vy_ast.VyperNode], namespace: Container[str] = ()):
+        self.nodes = nodes
+
+        declared: dict[str, list[int]] = {}
+        for i, node in enumerate(nodes):
+            name = _declared_name(node)
+            if name is not None and name not in namespace:
+                declared.setdefault(name, []).append(i)
+
+        # indices of the declarations which each declaration depends on
+        self._deps: list[list[int]] = []
+        for node in nodes:
+            deps: set[int] = set()
+            for name in _referenced_names(node):
+                deps.update(declared.get(name, ()))
+            self._deps.append(sorted(deps))
+
+    def toposort(self) -> tuple[list[vy_ast.VyperNode], list[vy_ast.VyperNode]]:
+        """
+        Sort the declarations so that each one comes after the declarations
+        it depends on. Declarations which do not depend on each other stay
+        in source order.
+
+        Returns
+        -------
+        tuple
+            The sorted declarations, and the declarations which are part
+            of a cycle or depend on one, in source order.
+        """
+        n_deps = [len(deps) for deps in self._deps]
+        dependents: list[list[int]] = [[] for _ in self.nodes]
+        for i, deps in enumerate(self._deps):
+            for j in deps:
+                dependents[j].append(i)
+
+        ready = [i for i, n in enumerate(n_deps) if n == 0]
+        heapq.heapify(ready)
+
+        ret = []
+        while ready:
+            i = heapq.heappop(ready)
+            ret.append(self.nodes[i])
+            for j in dependents[i]:
+                n_deps[j] -= 1
+                if n_deps[j] == 0:
+                    heapq.heappush(ready, j)
+
+        remaining = [node for i, node in enumerate(self.nodes) if n_deps[i] > 0]
+        return ret, remaining
+
+    def find_cycle(self, remaining: list[vy_ast.VyperNode]) -> list[vy_ast.VyperNode]:
+        """
+        Return a cycle among the declarations left unsorted by `toposort()`,
+        as a path which starts and ends with the same declaration.
+        """
+        index = {id(node): i for i, node in enumerate(self.nodes)}
+        unsorted = set(index[id(node)] for node in remaining)
+
+        path: list[int] = []
+        seen: dict[int, int] = {}
+        i = index[id(remaining[0])]
+        while i not in seen:
+            seen[i] = len(path)
+            path.append(i)
+            # an unsorted declaration always has an unsorted dependency
+            i = next(j for j in self._deps[i] if j in unsorted)
+
+        return [self.nodes[j] for j in path[seen[i] :]] + [self.nodes[i]]
+
+
+def cycle_exception(cycle: list[vy_ast.VyperNode]) -> StructureException:
+    path = " -> ".join(f"`{_declared_name(node)}`" for node in cycle)
+    return StructureException(f"Cyclic reference between declarations: {path}", *cycle[:-1])
@@ -1,10 +1,15 @@
 import contextlib
+import os
+import pickle
+import tempfile
+import warnings
 from dataclasses import dataclass, field
 from pathlib import Path, PurePath
-from typing import Any, Iterator
+from typing import Any, Hashable, Iterator, Optional
 
 import vyper.builtins.interfaces
 from vyper import ast as vy_ast
+from vyper.ast import binary as ast_binary
 from vyper.compiler.input_bundle import (
     ABIInput,
     CompilerInput,
@@ -22,7 +27,8 @@ from vyper.exceptions import (
     tag_exceptions,
 )
 from vyper.semantics.analysis.base import ImportInfo
-from vyper.utils import safe_relpath, sha256sum
+from vyper.utils import get_long_version, safe_relpath, sha256sum
+from vyper.warnings import recording_warnings, replay_warnings
 
 """
 collect import statements and validate the import graph.
@@ -71,12 +77,114 @@ class _ImportGraph:
             self.pop_path(module_ast)
 
 
+class ModuleCache:
+    """
+    A cache of imported modules, which can be shared between compilations
+    (e.g. between the targets of a single `vyper` invocation, or between
+    the requests made to a long-running compiler process).
+
+    Modules are stored together with all the analysis metadata which
+    was added to them, so a module which is imported by several targets
+    is only parsed and analyzed once. Entries are invalidated when the
+    sha256sum of the file changes, or when any of the module's (transitive)
+    imports resolve to a different file.
+
+    Entries are partitioned by a `context`, which should cover everything
+    (besides the file itself) that analysis depends on, e.g. the search
+    paths and the compiler settings.
+    """
+
+    def __init__(self):
+        self._modules: dict[tuple, tuple[FileInput, vy_ast.Module]] = {}
+        self._key_of: dict[vy_ast.Module, tuple] = {}
+        # warnings emitted while parsing each module
+        self._parse_warnings: dict[vy_ast.Module, list[warnings.WarningMessage]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "modules": len(self._modules)}
+
+    def get(self, key: tuple, file: FileInput) -> Optional[vy_ast.Module]:
+        entry = self._modules.get(key)
+        if entry is None:
+            return None
+
+        cached_file, module_ast = entry
+        if cached_file.sha256sum != file.sha256sum or cached_file.path != file.path:
+            # the file changed underneath us
+            self._remove(key)
+            return None
+
+        return module_ast
+
+    def put(
+        self,
+        key: tuple,
+        file: FileInput,
+        module_ast: vy_ast.Module,
+        parse_warnings: list[warnings.WarningMessage],
+    ) -> None:
+        self._remove(key)
+        self._modules[key] = (file, module_ast)
+        self._key_of[module_ast] = key
+        self._parse_warnings[module_ast] = parse_warnings
+
+    def replay_warnings(self, module_ast: vy_ast.Module) -> None:
+        # re-emit the warnings that parsing this module would emit. (warnings
+        # from analysis are replayed by `analyze_module()`.)
+        replay_warnings(self._parse_warnings.get(module_ast, []))
+
+    def _remove(self, key: tuple) -> None:
+        if key in self._modules:
+            _, module_ast = self._modules.pop(key)
+            del self._key_of[module_ast]
+            del self._parse_warnings[module_ast]
+
+    def discard(self, module_ast: vy_ast.Module) -> None:
+        """
+        Remove a module, and any modules it (transitively) imports, from
+        the cache. Used when analysis fails, since a failed analysis can
+        leave modules partially annotated.
+        """
+        to_visit = [module_ast]
+        visited = set()
+        while len(to_visit) > 0:
+            m = to_visit.pop()
+            if m in visited:
+                continue
+            visited.add(m)
+
+            key = self._key_of.get(m)
+            if key is not None:
+                self._remove(key)
+
+            for s in m.get_children((vy_ast.Import, vy_ast.ImportFrom)):
+                info = s._metadata.get("import_info")
+                if info is not None and isinstance(info.parsed, vy_ast.Module):
+                    to_visit.append(info.parsed)
+
+    def clear(self) -> None:
+        self._modules.clear()
+        self._key_of.clear()
+        self._parse_warnings.clear()
+
+
 class ImportAnalyzer:
-    def __init__(self, input_bundle: InputBundle, graph: _ImportGraph):
+    def __init__(
+        self,
+        input_bundle: InputBundle,
+        graph: _ImportGraph,
+        module_cache: Optional[ModuleCache] = None,
+        cache_context: Hashable = None,
+    ):
         self.input_bundle = input_bundle
         self.graph = graph
         self._ast_of: dict[int, vy_ast.Module] = {}
 
+        self.module_cache = module_cache
+        self.cache_context = cache_context
+
         self.seen: set[vy_ast.Module] = set()
 
         self._integrity_sum = None
@@ -170,18 +278,26 @@ class ImportAnalyzer:
 
         self.graph.imported_modules[path] = node
 
-        err = None
+        file = self._find_import(path, level, module_str)
 
-        try:
-            path_vy = path.with_suffix(".vy")
-            file = self._load_file(path_vy, level)
-            assert isinstance(file, FileInput)  # mypy hint
+        if isinstance(file, ABIInput):
+            return file, file.abi
 
-            module_ast = self._ast_from_file(file)
-            self.resolve_imports(module_ast)
+        assert isinstance(file, FileInput)  # mypy hint
+        module_ast = self._ast_from_file(file)
+        # note: the language does not yet allow recursion for vyi files,
+        # but resolving their imports is harmless.
+        self.resolve_imports(module_ast)
+
+        return file, module_ast
 
-            return file, module_ast
+    def _find_import(self, path: PurePath, level: int, module_str: str) -> CompilerInput:
+        err = None
 
+        try:
+            file = self._load_file(path.with_suffix(".vy"), level)
+            assert isinstance(file, FileInput)  # mypy hint
+            return file
         except FileNotFoundError as e:
             # escape `e` from the block scope, it can make things
             # easier to debug.
@@ -190,21 +306,14 @@ class ImportAnalyzer:
         try:
             file = self._load_file(path.with_suffix(".vyi"), level)
             assert isinstance(file, FileInput)  # mypy hint
-            module_ast = self._ast_from_file(file)
-            self.resolve_imports(module_ast)
-
-            # language does not yet allow recursion for vyi files
-            # self.resolve_imports(module_ast)
-
-            return file, module_ast
-
+            return file
         except FileNotFoundError:
             pass
 
         try:
             file = self._load_file(path.with_suffix(".json"), level)
             assert isinstance(file, ABIInput)  # mypy hint
-            return file, file.abi
+            return file
         except FileNotFoundError:
             pass
 
@@ -234,12 +343,93 @@ class ImportAnalyzer:
         # two ASTs produced from the same source
         ast_of = self._ast_of
         if file.source_id not in ast_of:
-            ast_of[file.source_id] = _parse_ast(file)
+            ast_of[file.source_id] = self._parse_or_fetch(file)
 
         return ast_of[file.source_id]
 
+    def _parse_or_fetch(self, file: FileInput) -> vy_ast.Module:
+        if self.module_cache is None:
+            return _parse_ast(file)
 
-def _parse_ast(file: FileInput) -> vy_ast.Module:
+        key = (
+            self.cache_context,
+            tuple(self.absolute_search_paths),
+            file.resolved_path,
+            file.source_id,
+        )
+
+        module_ast = self.module_cache.get(key, file)
+        if module_ast is not None:
+            loaded: list[vy_ast.Module] = []
+            if self._is_fresh(module_ast, loaded):
+                self.module_cache.hits += 1
+                # replay warnings in the order that parsing would emit them
+                for m in [module_ast, *loaded]:
+                    self.module_cache.replay_warnings(m)
+                return module_ast
+
+            # roll back, the imports will be resolved from scratch
+            for m in loaded:
+                self.seen.discard(m)
+                del self._ast_of[m.source_id]
+
+        self.module_cache.misses += 1
+        with recording_warnings() as parse_warnings:
+            module_ast = _parse_ast(file)
+        self.module_cache.put(key, file, module_ast, parse_warnings)
+        return module_ast
+
+    def _is_fresh(self, module_ast: vy_ast.Module, loaded: list[vy_ast.Module]) -> bool:
+        """
+        Check that the imports of a cached module still resolve to the
+        same files, i.e. that none of its (transitive) dependencies changed.
+        Fresh modules are marked as seen, their imports don't need to be
+        resolved again. Modules which are newly loaded into this compilation
+        are appended to `loaded`.
+        """
+        if module_ast in self.seen:
+            return True
+
+        with self.graph.enter_path(module_ast):
+            for node in module_ast.get_children((vy_ast.Import, vy_ast.ImportFrom)):
+                info = node._metadata.get("import_info")
+                if info is None:
+                    # import resolution did not finish
+                    return False
+
+                module_str = info.qualified_module_name
+                if _is_builtin(module_str):
+                    continue
+
+                level = node.level if isinstance(node, vy_ast.ImportFrom) else 0
+                path = _import_to_path(level, module_str)
+                try:
+                    file = self._find_import(path, level, module_str)
+                except ModuleNotFound:
+                    return False
+
+                if file != info.compiler_input:
+                    return False
+
+                if not isinstance(file, FileInput):
+                    continue
+
+                if file.source_id in self._ast_of:
+                    # already loaded by this compilation
+                    if self._ast_of[file.source_id] is not info.parsed:
+                        return False
+                    continue
+
+                self._ast_of[file.source_id] = info.parsed
+                loaded.append(info.parsed)
+                if not self._is_fresh(info.parsed, loaded):
+                    return False
+
+        self.seen.add(module_ast)
+        return True
+
+
+def _module_path(file: FileInput) -> PurePath:
     module_path = file.resolved_path  # for error messages
     try:
         # try to get a relative path, to simplify the error message
@@ -251,11 +441,14 @@ def _parse_ast(file: FileInput) -> vy_ast.Module:
         # we couldn't get a relative path (cf. docs for Path.relative_to),
         # use the resolved path given to us by the InputBundle
         pass
+    return module_path
 
+
+def _parse_ast(file: FileInput) -> vy_ast.Module:
     ret = vy_ast.parse_to_ast(
         file.source_code,
         source_id=file.source_id,
-        module_path=module_path.as_posix(),
+        module_path=_module_path(file).as_posix(),
         resolved_path=file.resolved_path.as_posix(),
     )
     return ret
@@ -326,7 +519,7 @@ def _load_builtin_import(level: int, module_str: str) -> tuple[CompilerInput, vy
             hint = f"try renaming `{module_prefix}` to `I{module_prefix}`"
         raise ModuleNotFound(module_str, hint=hint) from e
 
-    interface_ast = _parse_ast(file)
+    interface_ast = _builtin_ast(file, input_bundle)
 
     # no recursion needed since builtins don't have any imports
 
@@ -334,9 +527,117 @@ def _load_builtin_import(level: int, module_str: str) -> tuple[CompilerInput, vy
     return file, interface_ast
 
 
-def resolve_imports(module_ast: vy_ast.Module, input_bundle: InputBundle):
+# builtin interfaces are shipped pre-parsed, so that fresh processes (e.g.
+# worker processes) don't need to parse them. the parsed modules are
+# encoded with `vyper.ast.binary` and pickled into a file next to the .vyi
+# files, which is generated on first use (if the package directory is
+# writeable), and regenerated when it is stale. modules are only decoded
+# when they are imported. note this file is trusted the same way as the
+# package itself.
+BUILTINS_ARTIFACT_NAME = "_interfaces.pickle"
+
+# sha256sum of source code => encoded module. None until loaded
+_builtins_artifact: Optional[dict[str, bytes]] = None
+_builtins_artifact_generated = False
+
+
+def _builtins_artifact_path() -> Path:
+    return Path(vyper.builtins.interfaces.__path__[0]) / BUILTINS_ARTIFACT_NAME
+
+
+def _builtins_artifact_version() -> str:
+    return f"{get_long_version()}+ast{ast_binary.FORMAT_VERSION}"
+
+
+def _load_builtins_artifact() -> dict[str, bytes]:
+    global _builtins_artifact
+    if _builtins_artifact is not None:
+        return _builtins_artifact
+
+    ret: dict[str, bytes] = {}
+    try:
+        with _builtins_artifact_path().open("rb") as f:
+            version, modules = pickle.load(f)
+        if version == _builtins_artifact_version():
+            ret = modules
+    except Exception:
+        # missing or corrupted, treat it as empty
+        pass
+
+    _builtins_artifact = ret
+    return ret
+
+
+def _generate_builtins_artifact(input_bundle: InputBundle, builtins_path: PurePath) -> None:
+    global _builtins_artifact, _builtins_artifact_generated
+    # only try once per process
+    _builtins_artifact_generated = True
+
+    modules = {}
+    builtins_dir = Path(vyper.builtins.interfaces.__path__[0])
+    for vyi_path in sorted(builtins_dir.glob("*.vyi")):
+        # load each interface with a fresh input bundle, the same way
+        # `_load_builtin_import()` does, so that the source ids match
+        fresh_bundle = FilesystemInputBundle(list(input_bundle.search_paths))
+        file = fresh_bundle.load_file(builtins_path / vyi_path.name)
+        assert isinstance(file, FileInput)  # mypy hint
+        modules[file.sha256sum] = ast_binary.dumps(_parse_ast(file))
+
+    try:
+        data = pickle.dumps(
+            (_builtins_artifact_version(), modules), protocol=pickle.HIGHEST_PROTOCOL
+        )
+        # write to a temporary file and rename, so that concurrently
+        # running processes never see a partially written file
+        artifact_path = _builtins_artifact_path()
+        fd, tmp_path = tempfile.mkstemp(dir=artifact_path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            # mkstemp creates the file readable by the owner only
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, artifact_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    except Exception:
+        # e.g. the package directory is read-only, carry on without it
+        pass
+
+    _builtins_artifact = modules
+
+
+def _builtin_ast(file: FileInput, input_bundle: InputBundle) -> vy_ast.Module:
+    artifact = _load_builtins_artifact()
+    if file.sha256sum not in artifact and not _builtins_artifact_generated:
+        _generate_builtins_artifact(input_bundle, PurePath(file.path).parent)
+        artifact = _load_builtins_artifact()
+
+    data = artifact.get(file.sha256sum)
+    module_ast = None
+    if data is not None:
+        try:
+            module_ast = ast_binary.loads(data)
+        except Exception:
+            # corrupted
+            pass
+    if not isinstance(module_ast, vy_ast.Module) or module_ast.source_id != file.source_id:
+        return _parse_ast(file)
+
+    # the paths depend on the working directory, fix them up
+    module_ast.path = _module_path(file).as_posix()
+    module_ast.resolved_path = file.resolved_path.as_posix()
+    return module_ast
+
+
+def resolve_imports(
+    module_ast: vy_ast.Module,
+    input_bundle: InputBundle,
+    module_cache: Optional[ModuleCache] = None,
+    cache_context: Hashable = None,
+):
     graph = _ImportGraph()
-    analyzer = ImportAnalyzer(input_bundle, graph)
+    analyzer = ImportAnalyzer(input_bundle, graph, module_cache, cache_context)
     analyzer.resolve_imports(module_ast)
 
     return analyzer
@@ -1,4 +1,4 @@
-from typing import Any, Callable, Optional
+from typing import Any, Callable, Iterable, Optional
 
 
 def levenshtein_norm(source: str, target: str) -> float:
@@ -73,12 +73,90 @@ def levenshtein(source: str, target: str) -> int:
     return matrix[len(source)][len(target)]
 
 
+class BKTree:
+    """
+    A BK-tree (Burkhard-Keller tree) of strings, for finding the strings
+    within a given Levenshtein distance of a key without computing the
+    distance to each string.
+
+    Each child of a node is keyed by its distance to the node. By the
+    triangle inequality, the strings within `r` of the key can only be in
+    the subtrees whose distance to the node is within `r` of the distance
+    between the key and the node.
+    """
+
+    def __init__(self, words: Iterable[str]):
+        # a node is [word, index, children]
+        self._root: Optional[list] = None
+        self._words: set[str] = set()
+        for i, word in enumerate(words):
+            self._add(word, i)
+
+    def __contains__(self, word: str) -> bool:
+        return word in self._words
+
+    def _add(self, word: str, index: int) -> None:
+        if word in self._words:
+            return
+        self._words.add(word)
+
+        new_node = [word, index, {}]
+        if self._root is None:
+            self._root = new_node
+            return
+
+        node = self._root
+        while True:
+            d = levenshtein(word, node[0])
+            child = node[2].get(d)
+            if child is None:
+                node[2][d] = new_node
+                return
+            node = child
+
+    def search(self, key: str, max_distance: int) -> list[tuple[str, int]]:
+        """
+        Return the (word, index) pairs of the words within `max_distance`
+        of `key`, where `index` is the position of the word in the words
+        the tree was built from.
+        """
+        ret = []
+        stack = [self._root] if self._root is not None else []
+        while stack:
+            word, index, children = stack.pop()
+            d = levenshtein(key, word)
+            if d <= max_distance:
+                ret.append((word, index))
+            for child_d, child in children.items():
+                if d - max_distance <= child_d <= d + max_distance:
+                    stack.append(child)
+        return ret
+
+
 def get_levenshtein_error_suggestions(*args, **kwargs) -> Callable:
     return lambda: _get_levenshtein_error_suggestions(*args, **kwargs)
 
 
+def _candidates(
+    key: str, namespace: dict[str, Any], threshold: float, index: Optional[BKTree]
+) -> list[str]:
+    # the keys of `namespace` which may be within `threshold`, in the
+    # order of `namespace`. the keys in `index` are assumed to come first.
+    if index is None or threshold >= 1.0:
+        return list(namespace)
+
+    # for a word `w` within the threshold, `d <= threshold * max(len(key), len(w))`
+    # and `d >= len(w) - len(key)`, hence `d <= threshold * len(key) / (1 - threshold)`.
+    # (rounded up, the candidates are checked against the threshold anyway)
+    max_distance = int(threshold * len(key) / (1 - threshold)) + 1
+    found = sorted(index.search(key, max_distance), key=lambda k: k[1])
+    ret = [word for word, _ in found if word in namespace]
+    ret.extend(i for i in namespace if i not in index)
+    return ret
+
+
 def _get_levenshtein_error_suggestions(
-    key: str, namespace: dict[str, Any], threshold: float
+    key: str, namespace: dict[str, Any], threshold: float, index: Optional[BKTree] = None
 ) -> Optional[str]:
     """
     Generate an error message snippet for the suggested closest values in the provided namespace
@@ -94,6 +172,8 @@ def _get_levenshtein_error_suggestions(
     :param key: A string of the identifier being accessed
     :param namespace: A dictionary of the possible identifiers
     :param threshold: A floating value between 0.0 and 1.0
+    :param index: An optional BK-tree of the first keys of the namespace, in the same
+        order. Only the keys close to the given key are checked among these.
 
     :return: The error message snippet if the Levenshtein value is below the threshold,
         or an empty string.
@@ -102,7 +182,8 @@ def _get_levenshtein_error_suggestions(
     if key is None or key == "":
         return None
 
-    distances = sorted([(i, levenshtein_norm(key, i)) for i in namespace], key=lambda k: k[1])
+    candidates = _candidates(key, namespace, threshold, index)
+    distances = sorted([(i, levenshtein_norm(key, i)) for i in candidates], key=lambda k: k[1])
     if len(distances) > 0 and distances[0][1] <= threshold:
         if len(distances) > 1 and distances[1][1] <= threshold:
             return f"Did you mean '{distances[0][0]}', or maybe '{distances[1][0]}'?"
@@ -1,10 +1,12 @@
 # CMC 2024-02-03 TODO: rename me to function.py
 
 import contextlib
+import os
 from typing import Optional
 
 from vyper import ast as vy_ast
 from vyper.ast.validation import validate_call_args
+from vyper.compiler import settings
 from vyper.exceptions import (
     CallViolation,
     ExceptionList,
@@ -30,6 +32,7 @@ from vyper.semantics.analysis.base import (
     VarInfo,
 )
 from vyper.semantics.analysis.common import VyperNodeVisitorBase
+from vyper.semantics.analysis.parallel import analyze_functions_parallel, can_analyze_in_parallel
 from vyper.semantics.analysis.utils import (
     get_common_types,
     get_exact_type_from_node,
@@ -69,13 +72,21 @@ def analyze_functions(vy_module: vy_ast.Module) -> None:
     """Analyzes a vyper ast and validates the function bodies"""
     err_list = ExceptionList()
 
-    for node in vy_module.get_children(vy_ast.FunctionDef):
-        _analyze_function_r(vy_module, node, err_list)
-
+    fn_nodes = list(vy_module.get_children(vy_ast.FunctionDef))
     for node in vy_module.get_children(vy_ast.VariableDecl):
         if not node.is_public:
             continue
-        _analyze_function_r(vy_module, node._expanded_getter, err_list)
+        fn_nodes.append(node._expanded_getter)
+
+    jobs = settings.VYPER_ANALYSIS_JOBS
+    if jobs == 0:
+        jobs = os.cpu_count() or 1
+
+    if jobs > 1 and can_analyze_in_parallel():
+        analyze_functions_parallel(vy_module, fn_nodes, err_list, jobs, analyze_function)
+    else:
+        for node in fn_nodes:
+            _analyze_function_r(vy_module, node, err_list)
 
     err_list.raise_if_not_empty()
 
@@ -90,16 +101,21 @@ def _analyze_function_r(
             assert isinstance(call_t.ast_def, vy_ast.FunctionDef)  # help mypy
             _analyze_function_r(vy_module, call_t.ast_def, err_list)
 
-    namespace = get_namespace()
-
     try:
-        with namespace.enter_scope():
-            analyzer = FunctionAnalyzer(vy_module, node, namespace)
-            analyzer.analyze()
+        analyze_function(vy_module, node)
     except VyperException as e:
         err_list.append(e)
 
 
+def analyze_function(vy_module: vy_ast.Module, node: vy_ast.FunctionDef) -> None:
+    """Analyzes a single function body, its callees must already be analyzed"""
+    namespace = get_namespace()
+
+    with namespace.enter_scope():
+        analyzer = FunctionAnalyzer(vy_module, node, namespace)
+        analyzer.analyze()
+
+
 # finds the terminus node for a list of nodes.
 # raises an exception if any nodes are unreachable
 def find_terminating_node(node_list: list) -> Optional[vy_ast.VyperNode]:
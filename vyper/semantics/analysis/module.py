@@ -31,6 +31,7 @@ from vyper.semantics.analysis.base import (
 )
 from vyper.semantics.analysis.common import VyperNodeVisitorBase
 from vyper.semantics.analysis.constant_folding import constant_fold
+from vyper.semantics.analysis.dependencies import DeclarationGraph, cycle_exception
 from vyper.semantics.analysis.getters import generate_public_variable_getters
 from vyper.semantics.analysis.local import ExprVisitor, analyze_functions, check_module_uses
 from vyper.semantics.analysis.utils import (
@@ -45,6 +46,7 @@ from vyper.semantics.types.function import ContractFunctionT
 from vyper.semantics.types.module import ModuleT
 from vyper.semantics.types.utils import type_from_annotation
 from vyper.utils import OrderedSet
+from vyper.warnings import recording_warnings, replay_warnings
 
 
 def analyze_module(module_ast: vy_ast.Module) -> ModuleT:
@@ -53,19 +55,36 @@ def analyze_module(module_ast: vy_ast.Module) -> ModuleT:
     add all module-level objects to the namespace, type-check/validate
     semantics and annotate with type and analysis info
     """
-    return _analyze_module_r(module_ast, module_ast.is_interface)
+    global _seen_modules
+    _seen_modules = set()
+    try:
+        return _analyze_module_r(module_ast, module_ast.is_interface)
+    finally:
+        _seen_modules = None
+
+
+# modules visited by the current call to `analyze_module()`
+_seen_modules: Optional[set[vy_ast.Module]] = None
 
 
 def _analyze_module_r(module_ast: vy_ast.Module, is_interface: bool = False):
+    first_visit = _seen_modules is not None and module_ast not in _seen_modules
+    if _seen_modules is not None:
+        _seen_modules.add(module_ast)
+
     if "type" in module_ast._metadata:
         # we don't need to analyse again, skip out
         assert isinstance(module_ast._metadata["type"], ModuleT)
+        if first_visit:
+            # the module was analyzed by a previous compilation (cf.
+            # `ModuleCache`), emit the same warnings as a cold analysis.
+            replay_warnings(module_ast._metadata.get("warnings", []))
         return module_ast._metadata["type"]
 
     # validate semantics and annotate AST with type/semantics information
     namespace = get_namespace()
 
-    with namespace.enter_scope():
+    with namespace.enter_scope(), recording_warnings() as caught_warnings:
         analyzer = ModuleAnalyzer(module_ast, namespace, is_interface)
         analyzer.analyze_module_body()
 
@@ -82,6 +101,16 @@ def _analyze_module_r(module_ast: vy_ast.Module, is_interface: bool = False):
             analyzer.validate_initialized_modules()
             analyzer.validate_used_modules()
 
+    # keep the warnings which were emitted by this module (and not by
+    # its imports), so they can be replayed when the analyzed module is
+    # reused by another compilation (cf. `ModuleCache`).
+    from_imports: set[int] = set()
+    for info in ret.reachable_imports:
+        if isinstance(info.parsed, vy_ast.Module):
+            from_imports.update(id(w.message) for w in info.parsed._metadata.get("warnings", []))
+    own_warnings = [w for w in caught_warnings if id(w.message) not in from_imports]
+    module_ast._metadata["warnings"] = own_warnings
+
     return ret
 
 
@@ -179,14 +208,14 @@ class ModuleAnalyzer(VyperNodeVisitorBase):
         # handle ownership decls, mutate ModuleInfo.ownership
         self._visit_nodes_linear((vy_ast.UsesDecl, vy_ast.InitializesDecl))
 
-        # handle some node types using a dependency resolution routine
-        # which loops, swallowing exceptions until all nodes are processed
+        # handle some node types in the order of their dependencies
+        # on each other
         type_decls = (vy_ast.FlagDef, vy_ast.StructDef, vy_ast.InterfaceDef, vy_ast.EventDef)
-        self._visit_nodes_looping(type_decls)
+        self._visit_nodes_sorted(type_decls)
 
         # handle functions
         # run before exports for exception handling priority
-        self._visit_nodes_looping((vy_ast.VariableDecl, vy_ast.FunctionDef))
+        self._visit_nodes_sorted((vy_ast.VariableDecl, vy_ast.FunctionDef))
 
         # mutates _exposed_functions
         self._visit_nodes_linear(vy_ast.ExportsDecl)
@@ -213,35 +242,35 @@ class ModuleAnalyzer(VyperNodeVisitorBase):
             self.visit(node)
             self._to_visit.remove(node)
 
-    # visit nodes which may have dependencies on each other
-    def _visit_nodes_looping(self, node_type):
+    # visit nodes which may have dependencies on each other, in
+    # dependency order
+    def _visit_nodes_sorted(self, node_type):
         nodes = [n for n in self._to_visit if isinstance(n, node_type)]
 
-        # keep trying to process all the nodes until we finish or can
-        # no longer progress. this makes it so we don't need to
-        # calculate a dependency tree between top-level items.
+        graph = DeclarationGraph(nodes, self.namespace)
+        sorted_nodes, remaining = graph.toposort()
+
+        # each node is visited exactly once. errors are collected, so
+        # that independent errors are all reported at once.
         # note that the nodes processed here should not mutate ModuleAnalyzer
         # state, otherwise ModuleAnalyzer state can end up invalid!
-        while len(nodes) > 0:
-            count = len(nodes)
-            err_list = ExceptionList()
-            for node in nodes.copy():
-                try:
-                    self.visit(node)
-                    nodes.remove(node)
-                    self._to_visit.remove(node)
-                except (InvalidLiteral, InvalidType) as e:
-                    # these exceptions cannot be caused by another statement
-                    # not yet being parsed, so we raise them immediately
-                    raise e from None
-                except VyperException as e:
-                    err_list.append(e)
-
-            # Only raise if no nodes were successfully processed. This allows
-            # module level logic to parse regardless of the ordering of code
-            # elements.
-            if count == len(nodes):
-                err_list.raise_if_not_empty()
+        err_list = ExceptionList()
+        for node in sorted_nodes:
+            try:
+                self.visit(node)
+                self._to_visit.remove(node)
+            except (InvalidLiteral, InvalidType) as e:
+                # these exceptions cannot be caused by another declaration
+                # failing, so we raise them immediately
+                raise e from None
+            except VyperException as e:
+                err_list.append(e)
+
+        if len(remaining) > 0:
+            # the remaining nodes are part of a cycle, or depend on one
+            err_list.append(cycle_exception(graph.find_cycle(remaining)))
+
+        err_list.raise_if_not_empty()
 
     def validate_used_modules(self):
         # check all `uses:` modules are actually used
@@ -0,0 +1,281 @@
+# not an entry point!
+# utility functions for analysing function bodies in worker processes.
+#
+# function bodies are independent of each other once the module namespace
+# is built, except that a function must be analysed after the functions
+# it calls (a caller reads the variable accesses of its callees). functions
+# are grouped into levels by call depth, and each level is analysed in a
+# pool of forked worker processes, which inherit the analysed module.
+# workers send back the annotations of the nodes of the function and the
+# variable accesses of the function, which are merged into the AST of the
+# parent process. errors and warnings are reported in the same order as in
+# a serial run.
+
+import gc
+import io
+import itertools
+import multiprocessing
+import pickle
+import warnings
+from typing import Any, Callable, Optional
+
+from vyper import ast as vy_ast
+from vyper.compiler.parallel import imap_ordered
+from vyper.exceptions import ExceptionList, VyperException
+from vyper.semantics.analysis.base import VarAccess
+from vyper.semantics.types.function import ContractFunctionT
+
+AnalyzeFn = Callable[[vy_ast.Module, vy_ast.FunctionDef], None]
+
+_CHUNKS_PER_JOB = 4
+
+
+def can_analyze_in_parallel() -> bool:
+    # workers rely on inheriting the state of the parent process
+    return "fork" in multiprocessing.get_all_start_methods()
+
+
+def _analysis_order(fn_nodes: list[vy_ast.FunctionDef]) -> tuple[list, dict]:
+    # the order in which `_analyze_function_r()` analyses functions (callees
+    # first), and the level of each function in the call graph
+    order: list[vy_ast.FunctionDef] = []
+    levels: dict[int, int] = {}
+
+    def _visit(node):
+        func_t = node._metadata["func_type"]
+        if id(node) in levels or func_t.analysed:
+            return levels.get(id(node), -1)
+
+        # guard against cycles, they are reported by module analysis
+        levels[id(node)] = -1
+
+        level = 0
+        for call_t in func_t.called_functions:
+            if isinstance(call_t, ContractFunctionT):
+                level = max(level, _visit(call_t.ast_def) + 1)
+
+        levels[id(node)] = level
+        order.append(node)
+        return level
+
+    for node in fn_nodes:
+        _visit(node)
+
+    return order, levels
+
+
+def _function_nodes(fn_node: vy_ast.FunctionDef) -> list[vy_ast.VyperNode]:
+    # all nodes which can be annotated while analysing a function,
+    # including folded values. note: this follows the fields of each node
+    # rather than `_children`, which is not populated for generated nodes
+    # (e.g. getters).
+    ret = []
+    seen = set()
+    stack: list[vy_ast.VyperNode] = [fn_node]
+    while stack:
+        node = stack.pop()
+        if id(node) in seen:
+            continue
+        seen.add(id(node))
+        ret.append(node)
+
+        for field_name in node.get_fields():
+            value = getattr(node, field_name, None)
+            if isinstance(value, list):
+                stack.extend(i for i in value if isinstance(i, vy_ast.VyperNode))
+            elif isinstance(value, vy_ast.VyperNode):
+                stack.append(value)
+
+        if node.has_folded_value:
+            stack.append(node.get_folded_value())
+    return ret
+
+
+class _Pickler(pickle.Pickler):
+    # objects which existed in the parent process when the worker was
+    # forked are sent back by reference (their id, which is the same in
+    # both processes), except for those in `by_value`, which the worker
+    # may have modified.
+    def __init__(self, file, registry: dict[int, Any], by_value: set[int]):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self._registry = registry
+        self._by_value = by_value
+
+    def persistent_id(self, obj):
+        k = id(obj)
+        if k in self._registry and self._registry[k] is obj and k not in self._by_value:
+            return k
+        return None
+
+
+class _Unpickler(pickle.Unpickler):
+    def __init__(self, file, registry: dict[int, Any]):
+        super().__init__(file)
+        self._registry = registry
+
+    def persistent_load(self, pid):
+        return self._registry[pid]
+
+
+# metadata entries which cache the results of type checking. they are
+# recomputed on demand, so they are not worth sending back.
+_CACHED_METADATA = ("possible_types_from_node_", "possible_int_mask_", "writes_r")
+
+# state of the current level, inherited by the worker processes.
+# (vyper module, functions of the level, analyse function, registry)
+_worker_state: Optional[tuple] = None
+
+
+def _analyze_in_worker(vy_module, fn_node, analyze_fn, by_value: set[int]) -> tuple:
+    nodes = _function_nodes(fn_node)
+    old_metadata = [dict(node._metadata) for node in nodes]
+
+    exc: Optional[VyperException] = None
+    with warnings.catch_warnings(record=True) as caught_warnings:
+        # record everything, the parent process applies the filter
+        warnings.simplefilter("always")
+        try:
+            analyze_fn(vy_module, fn_node)
+        except VyperException as e:
+            exc = e
+
+    caught = [(w.category, str(w.message), w.filename, w.lineno) for w in caught_warnings]
+
+    if exc is not None and callable(exc._hint):
+        # hints can be lazily computed, force them before shipping
+        # the exception to the parent process
+        exc._hint = exc.hint
+
+    func_t = fn_node._metadata["func_type"]
+    accesses = (func_t._variable_reads, func_t._variable_writes, func_t._used_modules)
+    by_value.update(id(s) for s in accesses)
+
+    # the annotations added to each node
+    annotations = []
+    for node, old in zip(nodes, old_metadata):
+        new = {
+            k: v
+            for k, v in node._metadata.items()
+            if (k not in old or old[k] is not v) and not k.startswith(_CACHED_METADATA)
+        }
+        info = getattr(node, "_expr_info", None)
+        if info is not None:
+            by_value.update((id(info), id(info._reads), id(info._writes)))
+        if new or info is not None:
+            annotations.append((node, new, info))
+
+    return annotations, accesses, exc, caught
+
+
+def _analyze_task(start: int, stop: int) -> bytes:
+    assert _worker_state is not None  # sanity
+    vy_module, fn_nodes, analyze_fn, registry = _worker_state
+
+    by_value: set[int] = set()
+    results = [
+        _analyze_in_worker(vy_module, fn_node, analyze_fn, by_value)
+        for fn_node in fn_nodes[start:stop]
+    ]
+
+    f = io.BytesIO()
+    try:
+        _Pickler(f, registry, by_value).dump(results)
+    except Exception:
+        # can't send an exception object back, send its message instead
+        for i, (annotations, accesses, exc, caught) in enumerate(results):
+            if exc is not None:
+                results[i] = (annotations, accesses, VyperException(str(exc)), caught)
+        f = io.BytesIO()
+        _Pickler(f, registry, by_value).dump(results)
+
+    return f.getvalue()
+
+
+def analyze_functions_parallel(
+    vy_module: vy_ast.Module,
+    fn_nodes: list[vy_ast.FunctionDef],
+    err_list: ExceptionList,
+    jobs: int,
+    analyze_fn: AnalyzeFn,
+) -> None:
+    """
+    Analyse function bodies in `jobs` worker processes. Equivalent to
+    calling `_analyze_function_r()` on each of `fn_nodes`.
+    """
+    global _worker_state
+
+    order, levels = _analysis_order(fn_nodes)
+
+    errors: dict[int, VyperException] = {}
+    warnings_registry: dict = {}
+
+    for level in range(max(levels.values(), default=-1) + 1):
+        tasks = [node for node in order if levels[id(node)] == level]
+
+        # the constructor may modify immutables (module-level state), keep
+        # it in this process.
+        local = [n for n in tasks if n._metadata["func_type"].is_constructor]
+        tasks = [n for n in tasks if n not in local]
+        if len(tasks) < 2:
+            local, tasks = local + tasks, []
+
+        for node in local:
+            try:
+                analyze_fn(vy_module, node)
+            except VyperException as e:
+                errors[id(node)] = e
+
+        if not tasks:
+            continue
+
+        # the ids of all objects in this process, which stay alive (and
+        # keep their ids) until the workers are done.
+        registry = {id(obj): obj for obj in gc.get_objects()}
+        # sentinels are not tracked by the garbage collector
+        registry[id(VarAccess.SUBSCRIPT_ACCESS)] = VarAccess.SUBSCRIPT_ACCESS
+        _worker_state = (vy_module, tasks, analyze_fn, registry)
+
+        # a few chunks per worker, to balance the load
+        chunk_size = -(-len(tasks) // (jobs * _CHUNKS_PER_JOB))
+        task_args = [(i, i + chunk_size) for i in range(0, len(tasks), chunk_size)]
+
+        # keep the garbage collector of the workers away from the objects
+        # inherited from this process, so that their memory stays shared
+        gc.freeze()
+
+        ctx = multiprocessing.get_context("fork")
+        results = imap_ordered(jobs, _analyze_task, task_args, mp_context=ctx)
+        try:
+            chunks = (_Unpickler(io.BytesIO(r), registry).load() for r in results)
+            for fn_node, result in zip(tasks, itertools.chain.from_iterable(chunks)):
+                annotations, accesses, exc, caught = result
+
+                for node, new_metadata, info in annotations:
+                    node._metadata.update(new_metadata)
+                    if info is not None:
+                        node._expr_info = info
+
+                func_t = fn_node._metadata["func_type"]
+                func_t.mark_analysed()
+                reads, writes, used_modules = accesses
+                func_t.mark_variable_reads(reads)
+                func_t.mark_variable_writes(writes)
+                for module_info in used_modules:
+                    func_t.mark_used_module(module_info)
+
+                for category, message, filename, lineno in caught:
+                    warnings.warn_explicit(
+                        message, category, filename, lineno, registry=warnings_registry
+                    )
+
+                if exc is not None:
+                    errors[id(fn_node)] = exc
+        finally:
+            # cancel any pending work
+            results.close()
+            gc.unfreeze()
+            _worker_state = None
+
+    for node in order:
+        if id(node) in errors:
+            err_list.append(errors[id(node)])
@@ -1,5 +1,7 @@
+import functools
 import itertools
-from typing import Any, Callable, Iterable, List
+import operator
+from typing import Any, Callable, Iterable, List, Optional
 
 from vyper import ast as vy_ast
 from vyper.exceptions import (
@@ -50,6 +52,58 @@ def _validate_op(node, types_list, validation_fn_name):
     raise err_list[0]
 
 
+# the possible integer types of an expression are kept as a bitset (a
+# lattice under intersection) so that integer-heavy expressions like large
+# literal arrays can be type-checked without comparing every pair of types.
+# bits are ordered so that the highest bit is the widest type, with unsigned
+# before signed (uint256, int256, uint248, ...), which is the same order in
+# which possible integer types are sorted.
+def _int_type_bit(typ: IntegerT) -> int:
+    return 1 << ((typ.bits // 8 - 1) * 2 + (not typ.is_signed))
+
+
+# masks of the signed (resp. unsigned) types with at least `n` bytes
+_SIGNED_FROM = [sum(1 << (2 * (m - 1)) for m in range(max(n, 1), 33)) for n in range(34)]
+_UNSIGNED_FROM = [mask << 1 for mask in _SIGNED_FROM]
+
+
+def _int_mask(types_list: Iterable) -> Optional[int]:
+    # return the bitset of a list of types, or None if it contains
+    # anything other than integer types
+    ret = 0
+    for t in types_list:
+        if t.__class__ is not IntegerT:
+            return None
+        ret |= _int_type_bit(t)
+    return ret
+
+
+def _int_literal_mask(value: int) -> int:
+    # bitset of the integer types which can represent `value`
+    signed_bytes = -(-((value if value >= 0 else ~value).bit_length() + 1) // 8)
+    ret = _SIGNED_FROM[min(signed_bytes, 33)]
+    if value >= 0:
+        unsigned_bytes = max(-(-value.bit_length() // 8), 1)
+        ret |= _UNSIGNED_FROM[min(unsigned_bytes, 33)]
+    return ret
+
+
+@functools.lru_cache(maxsize=None)
+def _types_from_int_mask(mask: int) -> tuple[IntegerT, ...]:
+    ret = []
+    for i in reversed(range(mask.bit_length())):
+        if mask >> i & 1:
+            ret.append(IntegerT(is_signed=not i & 1, bits=(i // 2 + 1) * 8))
+    return tuple(ret)
+
+
+@functools.lru_cache(maxsize=None)
+def _literal_candidate_types(node_class: type) -> tuple:
+    return tuple(
+        t for t in types.PRIMITIVE_TYPES.values() if issubclass(node_class, t._valid_literal)
+    )
+
+
 def uses_state(var_accesses: Iterable[VarAccess]) -> bool:
     return any(s.variable.is_state_variable() for s in var_accesses)
 
@@ -170,9 +224,24 @@ class _ExprAnalyser:
                 ret.sort(key=lambda k: (k.bits, not k.is_signed), reverse=True)
 
             node._metadata[k] = ret
+            node._metadata[f"possible_int_mask_{include_type_exprs}"] = _int_mask(ret)
 
         return node._metadata[k].copy()
 
+    def get_possible_int_mask(self, node, include_type_exprs=False) -> Optional[int]:
+        """
+        Find the possible types for a given node as a bitset of integer
+        types, or None if the node can have a non-integer type.
+        """
+        if "type" in node._metadata:
+            return _int_mask([node._metadata["type"]])
+
+        k = f"possible_int_mask_{include_type_exprs}"
+        if k not in node._metadata:
+            self.get_possible_types_from_node(node, include_type_exprs=include_type_exprs)
+
+        return node._metadata[k]
+
     def _find_fn(self, node):
         # look for a type-check method for each class in the given class mro
         for name in [i.__name__ for i in type(node).mro()]:
@@ -298,26 +367,25 @@ class _ExprAnalyser:
 
     def types_from_Constant(self, node):
         # literal value (integer, string, etc)
-        types_list = []
-        for t in types.PRIMITIVE_TYPES.values():
-            try:
-                # clarity and perf note: will be better to construct a
-                # map from node types to valid vyper types
-                if not isinstance(node, t._valid_literal):
+        if isinstance(node, vy_ast.Int):
+            # the integer types are determined by the bounds of the value
+            types_list = list(_types_from_int_mask(_int_literal_mask(node.value)))
+        else:
+            types_list = []
+            for t in _literal_candidate_types(type(node)):
+                try:
+                    # special handling for bytestrings since their
+                    # class objects are in the type map, not the type itself
+                    # (worth rethinking this design at some point.)
+                    if t in (BytesT, StringT):
+                        t = t.from_literal(node)
+
+                    # any more validation which needs to occur
+                    t.validate_literal(node)
+                    types_list.append(t)
+                except VyperException:
                     continue
 
-                # special handling for bytestrings since their
-                # class objects are in the type map, not the type itself
-                # (worth rethinking this design at some point.)
-                if t in (BytesT, StringT):
-                    t = t.from_literal(node)
-
-                # any more validation which needs to occur
-                t.validate_literal(node)
-                types_list.append(t)
-            except VyperException:
-                continue
-
         if types_list:
             return types_list
 
@@ -510,10 +578,20 @@ def get_common_types(*nodes: vy_ast.VyperNode, filter_fn: Callable = None) -> Li
     list
         List of zero or more `BaseType` objects.
     """
-    common_types = _ExprAnalyser().get_possible_types_from_node(nodes[0])
+    analyser = _ExprAnalyser()
+
+    int_masks = [analyser.get_possible_int_mask(node) for node in nodes]
+    if None not in int_masks:
+        # fast path: all of the nodes are integers, intersect the bitsets
+        common_types = list(_types_from_int_mask(functools.reduce(operator.and_, int_masks)))
+        if filter_fn is not None:
+            common_types = [i for i in common_types if filter_fn(i)]
+        return common_types
+
+    common_types = analyser.get_possible_types_from_node(nodes[0])
 
     for item in nodes[1:]:
-        new_types = _ExprAnalyser().get_possible_types_from_node(item)
+        new_types = analyser.get_possible_types_from_node(item)
 
         tmp = []
         for c in common_types:
@@ -584,9 +662,16 @@ def validate_expected_type(node, expected_type):
             # fail block
             pass
 
-    given_types = _ExprAnalyser().get_possible_types_from_node(node)
+    analyser = _ExprAnalyser()
+    given_types = analyser.get_possible_types_from_node(node)
+    given_mask = analyser.get_possible_int_mask(node)
+    expected_mask = _int_mask(expected_type)
 
-    if isinstance(node, vy_ast.List):
+    if given_mask is not None and expected_mask is not None:
+        # fast path for integers
+        if given_mask & expected_mask:
+            return
+    elif isinstance(node, vy_ast.List):
         # special case - for literal arrays we individually validate each item
         for expected in expected_type:
             if not isinstance(expected, (DArrayT, SArrayT)):
@@ -1,8 +1,16 @@
 import contextlib
+from functools import lru_cache
 
 from vyper.ast.identifiers import validate_identifier
 from vyper.exceptions import CompilerPanic, NamespaceCollision, UndeclaredDefinition
-from vyper.semantics.analysis.levenshtein_utils import get_levenshtein_error_suggestions
+from vyper.semantics.analysis.levenshtein_utils import BKTree, get_levenshtein_error_suggestions
+
+
+@lru_cache(maxsize=1)
+def _builtins_index(names: tuple[str, ...]) -> BKTree:
+    # the builtin names are the same for each namespace, so the index
+    # for suggestions is only built once
+    return BKTree(names)
 
 
 class Namespace(dict):
@@ -13,6 +21,8 @@ class Namespace(dict):
     ----------
     _scopes : List[Set]
         List of sets containing the key names for each scope
+    _builtin_names : Tuple[str]
+        Names of the builtin types, constants and functions
     """
 
     def __new__(cls, *args, **kwargs):
@@ -33,6 +43,9 @@ class Namespace(dict):
         self.update(environment.get_constant_vars())
         self.update({k: VarInfo(b) for (k, b) in get_builtin_functions().items()})
 
+        # builtins are never removed, so they always come first
+        self._builtin_names = tuple(self)
+
     def __eq__(self, other):
         return self is other
 
@@ -45,7 +58,8 @@ class Namespace(dict):
 
     def __getitem__(self, key):
         if key not in self:
-            hint = get_levenshtein_error_suggestions(key, self, 0.2)
+            index = _builtins_index(self._builtin_names)
+            hint = get_levenshtein_error_suggestions(key, self, 0.2, index=index)
             raise UndeclaredDefinition(f"'{key}' has not been declared.", hint=hint)
         return super().__getitem__(key)
 
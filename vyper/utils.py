@@ -4,12 +4,13 @@ import decimal
 import enum
 import functools
 import hashlib
+import json
 import os
 import sys
 import time
 import traceback
 import warnings
-from typing import Generic, Iterable, Iterator, List, Set, TypeVar, Union
+from typing import Any, Callable, Generic, Iterable, Iterator, List, Set, TypeVar, Union
 
 from vyper.exceptions import CompilerPanic, DecimalOverrideException
 
@@ -703,3 +704,129 @@ def all2(iterator):
     except StopIteration:
         return False
     return bool(s) and all(iterator)
+
+
+class LazyJSON:
+    """
+    A JSON value which is only generated while it is being encoded.
+
+    `fn(*args)` returns the value, which may itself contain further
+    `LazyJSON` values. Encoding with `iterencode_json()` expands them one
+    at a time, so large outputs (e.g. an AST) can be written out without
+    building the whole document in memory.
+    """
+
+    __slots__ = ("fn", "args")
+
+    def __init__(self, fn: Callable, *args: Any):
+        self.fn = fn
+        self.args = args
+
+    def expand(self) -> Any:
+        return self.fn(*self.args)
+
+    def materialize(self) -> Any:
+        """
+        Return the fully generated value, with no `LazyJSON` values left.
+        """
+        return _materialize(self.expand())
+
+    def __reduce__(self):
+        # pickled (e.g. to send it across processes) as the plain value
+        return (_identity, (self.materialize(),))
+
+
+def _identity(value):
+    return value
+
+
+def _materialize(value):
+    if isinstance(value, LazyJSON):
+        return value.materialize()
+    if isinstance(value, dict):
+        return {k: _materialize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_materialize(v) for v in value]
+    return value
+
+
+class _LazyJSONEncoder(json.JSONEncoder):
+    def __init__(self, *, fallback=None, **kwargs):
+        super().__init__(**kwargs)
+        self._fallback = fallback
+
+    def default(self, o):
+        if isinstance(o, LazyJSON):
+            return o.expand()
+        if self._fallback is not None:
+            return self._fallback(o)
+        return super().default(o)
+
+
+# number of `LazyJSON` levels which are expanded one value at a time by
+# `iterencode_json()`. values nested any deeper (e.g. AST nodes below the
+# statements of a function) are encoded in one go by the C encoder.
+_JSON_STREAM_DEPTH = 3
+
+
+def iterencode_json(value: Any, default: Callable = None, **kwargs: Any) -> Iterator[str]:
+    """
+    Encode `value` the same way as `json.dumps(value, **kwargs)`, but yield
+    the output in chunks, expanding any `LazyJSON` values on the way.
+    """
+    encoder = _LazyJSONEncoder(fallback=default, **kwargs)
+    if encoder.indent is not None:
+        # the C encoder does not support indentation, so the whole value
+        # is encoded in python
+        return encoder.iterencode(value)
+    return _iterencode_json(value, encoder, _JSON_STREAM_DEPTH)
+
+
+def _iterencode_json(value, encoder, depth):
+    if isinstance(value, LazyJSON):
+        if depth == 0:
+            yield encoder.encode(value)
+            return
+        value = value.expand()
+        depth -= 1
+
+    if isinstance(value, dict):
+        items = sorted(value.items()) if encoder.sort_keys else value.items()
+        yield "{"
+        for i, (k, v) in enumerate(items):
+            if i > 0:
+                yield encoder.item_separator
+            # non-string keys are converted the same way as by `json.dumps()`
+            key = k if isinstance(k, str) else json.dumps(k)
+            yield encoder.encode(key) + encoder.key_separator
+            yield from _iterencode_json(v, encoder, depth)
+        yield "}"
+    elif isinstance(value, (list, tuple)):
+        yield "["
+        for i, v in enumerate(value):
+            if i > 0:
+                yield encoder.item_separator
+            yield from _iterencode_json(v, encoder, depth)
+        yield "]"
+    else:
+        yield encoder.encode(value)
+
+
+_JSON_WRITE_SIZE = 1 << 16
+
+
+def dump_json(value: Any, f, **kwargs: Any) -> None:
+    """
+    Write `value` to the file `f` as JSON, without holding the encoded
+    document in memory. Arguments are the same as for `iterencode_json()`.
+    """
+    buf: list[str] = []
+    size = 0
+    for chunk in iterencode_json(value, **kwargs):
+        buf.append(chunk)
+        size += len(chunk)
+        if size >= _JSON_WRITE_SIZE:
+            f.write("".join(buf))
+            buf.clear()
+            size = 0
+    f.write("".join(buf))
@@ -4,8 +4,10 @@
 from typing import Optional
 
 from vyper.codegen.ir_node import IRnode
+from vyper.compiler.profiling import profile_phase
 from vyper.compiler.settings import OptimizationLevel, Settings
 from vyper.exceptions import CompilerPanic
+from vyper.ir.compile_ir import EncodedAssembly
 from vyper.venom.analysis.analysis import IRAnalysesCache
 from vyper.venom.context import IRContext
 from vyper.venom.function import IRFunction
@@ -28,6 +30,7 @@ from vyper.venom.passes import (
     StoreElimination,
     StoreExpansionPass,
 )
+from vyper.venom.passes.base_pass import IRPass
 from vyper.venom.venom_to_assembly import VenomCompiler
 
 DEFAULT_OPT_LEVEL = OptimizationLevel.default()
@@ -37,7 +40,7 @@ def generate_assembly_experimental(
     runtime_code: IRContext,
     deploy_code: Optional[IRContext] = None,
     optimize: OptimizationLevel = DEFAULT_OPT_LEVEL,
-) -> list[str]:
+) -> EncodedAssembly:
     # note: VenomCompiler is sensitive to the order of these!
     if deploy_code is not None:
         functions = [deploy_code, runtime_code]
@@ -48,55 +51,61 @@ def generate_assembly_experimental(
     return compiler.generate_evm(optimize == OptimizationLevel.NONE)
 
 
+def _run_pass(pass_cls: type[IRPass], ac: IRAnalysesCache, fn: IRFunction) -> None:
+    with profile_phase(f"venom.{pass_cls.__name__}"):
+        pass_cls(ac, fn).run_pass()
+
+
 def _run_passes(fn: IRFunction, optimize: OptimizationLevel, ac: IRAnalysesCache) -> None:
     # Run passes on Venom IR
     # TODO: Add support for optimization levels
 
-    FloatAllocas(ac, fn).run_pass()
+    _run_pass(FloatAllocas, ac, fn)
 
-    SimplifyCFGPass(ac, fn).run_pass()
+    _run_pass(SimplifyCFGPass, ac, fn)
 
-    MakeSSA(ac, fn).run_pass()
+    _run_pass(MakeSSA, ac, fn)
     # run algebraic opts before mem2var to reduce some pointer arithmetic
-    AlgebraicOptimizationPass(ac, fn).run_pass()
-    StoreElimination(ac, fn).run_pass()
-    Mem2Var(ac, fn).run_pass()
-    MakeSSA(ac, fn).run_pass()
-    SCCP(ac, fn).run_pass()
-
-    SimplifyCFGPass(ac, fn).run_pass()
-    StoreElimination(ac, fn).run_pass()
-    AlgebraicOptimizationPass(ac, fn).run_pass()
-    LoadElimination(ac, fn).run_pass()
-    SCCP(ac, fn).run_pass()
-    StoreElimination(ac, fn).run_pass()
-
-    SimplifyCFGPass(ac, fn).run_pass()
-    MemMergePass(ac, fn).run_pass()
-
-    LowerDloadPass(ac, fn).run_pass()
+    _run_pass(AlgebraicOptimizationPass, ac, fn)
+    _run_pass(StoreElimination, ac, fn)
+    _run_pass(Mem2Var, ac, fn)
+    _run_pass(MakeSSA, ac, fn)
+    _run_pass(SCCP, ac, fn)
+
+    _run_pass(SimplifyCFGPass, ac, fn)
+    _run_pass(StoreElimination, ac, fn)
+    _run_pass(AlgebraicOptimizationPass, ac, fn)
+    _run_pass(LoadElimination, ac, fn)
+    _run_pass(SCCP, ac, fn)
+    _run_pass(StoreElimination, ac, fn)
+
+    _run_pass(SimplifyCFGPass, ac, fn)
+    _run_pass(MemMergePass, ac, fn)
+
+    _run_pass(LowerDloadPass, ac, fn)
     # NOTE: MakeSSA is after algebraic optimization it currently produces
     #       smaller code by adding some redundant phi nodes. This is not a
     #       problem for us, but we need to be aware of it, and should be
     #       removed when the dft pass is fixed to produce the smallest code
     #       without making the code generation more expensive by running
     #       MakeSSA again.
-    MakeSSA(ac, fn).run_pass()
-    BranchOptimizationPass(ac, fn).run_pass()
+    _run_pass(MakeSSA, ac, fn)
+    _run_pass(BranchOptimizationPass, ac, fn)
 
-    AlgebraicOptimizationPass(ac, fn).run_pass()
-    RemoveUnusedVariablesPass(ac, fn).run_pass()
+    _run_pass(AlgebraicOptimizationPass, ac, fn)
+    _run_pass(RemoveUnusedVariablesPass, ac, fn)
 
-    StoreExpansionPass(ac, fn).run_pass()
+    _run_pass(StoreExpansionPass, ac, fn)
 
     if optimize == OptimizationLevel.CODESIZE:
-        ReduceLiteralsCodesize(ac, fn).run_pass()
+        _run_pass(ReduceLiteralsCodesize, ac, fn)
 
-    DFTPass(ac, fn).run_pass()
+    _run_pass(DFTPass, ac, fn)
 
 
 def _run_global_passes(ctx: IRContext, optimize: OptimizationLevel, ir_analyses: dict) -> None:
-    FunctionInlinerPass(ir_analyses, ctx, optimize).run_pass()
+    with profile_phase("venom.FunctionInlinerPass"):
+        FunctionInlinerPass(ir_analyses, ctx, optimize).run_pass()
 
 
 def run_passes_on(ctx: IRContext, optimize: OptimizationLevel) -> None:
@@ -116,7 +125,8 @@ def run_passes_on(ctx: IRContext, optimize: OptimizationLevel) -> None:
 
 def generate_ir(ir: IRnode, settings: Settings) -> IRContext:
     # Convert "old" IR to "new" IR
-    ctx = ir_node_to_venom(ir)
+    with profile_phase("venom.ir_node_to_venom"):
+        ctx = ir_node_to_venom(ir)
 
     optimize = settings.optimize
     assert optimize is not None  # help mypy
@@ -4,8 +4,10 @@ from vyper.exceptions import CompilerPanic, StackTooDeep
 from vyper.ir.compile_ir import (
     PUSH,
     DataHeader,
+    EncodedAssembly,
     Instruction,
     RuntimeHeader,
+    encode_assembly,
     mksymbol,
     optimize_assembly,
 )
@@ -147,7 +149,7 @@ class VenomCompiler:
         self.visited_instructions = OrderedSet()
         self.visited_basicblocks = OrderedSet()
 
-    def generate_evm(self, no_optimize: bool = False) -> list[str]:
+    def generate_evm(self, no_optimize: bool = False) -> EncodedAssembly:
         self.visited_instructions = OrderedSet()
         self.visited_basicblocks = OrderedSet()
         self.label_counter = 0
@@ -204,7 +206,7 @@ class VenomCompiler:
         if no_optimize is False:
             optimize_assembly(top_asm)
 
-        return top_asm
+        return encode_assembly(top_asm)
 
     def _stack_reorder(
         self, assembly: list, stack: StackModel, stack_ops: list[IROperand], dry_run: bool = False
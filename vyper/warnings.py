@@ -1,6 +1,6 @@
 import contextlib
 import warnings
-from typing import Optional
+from typing import Iterator, Optional
 
 from vyper.exceptions import _BaseVyperException
 
@@ -25,6 +25,24 @@ def warnings_filter(warnings_control: Optional[str]):
         yield
 
 
+@contextlib.contextmanager
+def recording_warnings() -> Iterator[list[warnings.WarningMessage]]:
+    # record the warnings emitted in the block, and re-emit them on exit.
+    # the caller can hold onto the records to replay them later, e.g.
+    # when the result of the block is cached.
+    caught_warnings: list[warnings.WarningMessage] = []
+    try:
+        with warnings.catch_warnings(record=True) as caught_warnings:
+            yield caught_warnings
+    finally:
+        replay_warnings(caught_warnings)
+
+
+def replay_warnings(records: list[warnings.WarningMessage]) -> None:
+    for w in records:
+        warnings.warn_explicit(w.message, w.category, w.filename, w.lineno)
+
+
 def set_warnings_filter(warnings_control: Optional[str]):
     if warnings_control == "error":
         warnings_filter = "error"